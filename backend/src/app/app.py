@@ -1,13 +1,46 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from .config import Config
+from .container import Container
+from .middleware import RequestMetricsMiddleware
+from .request_metrics import RequestMetrics
 from .routers.auth import router as auth_router
+from .routers.metrics import router as metrics_router
+from .routers.tasks import router as tasks_router
 
-
-app = FastAPI()
+logger = logging.getLogger(__name__)
 
 routers = [
     auth_router,
+    tasks_router,
+    metrics_router,
 ]
 
-for router in routers:
-    app.include_router(router)
+
+def create_app(config: Config | None = None) -> FastAPI:
+    """
+    Builds the application without touching the environment or the database: the config is read
+    (from the environment and .env unless one is given) and the container with its engines is created
+    on lifespan startup. Serve it with `uvicorn app.app:create_app --factory`.
+    """
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app_config = config or Config()
+        if "secret_key" not in app_config.model_fields_set and app_config.repository_backend != "memory":
+            logger.warning("SECRET_KEY is not set; tokens are signed with a random key of this process "
+                           "and stop validating when it restarts")
+        container = Container(app_config)
+        await container.start()
+        app.state.container = container
+        yield
+        await container.dispose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.request_metrics = RequestMetrics()
+    app.add_middleware(RequestMetricsMiddleware, metrics=app.state.request_metrics)
+    for router in routers:
+        app.include_router(router)
+    return app
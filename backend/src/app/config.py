@@ -1,10 +1,82 @@
+import secrets
+from typing import Literal
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Config(BaseSettings):
     sqlalchemy_db_url: str
+    # "memory" keeps everything in process memory, for single-node deployments, load tests and tests
+    repository_backend: Literal["sqlalchemy", "memory"] = "sqlalchemy"
+    # Random per process when not set, which the app warns about on startup: tokens then do not survive
+    # a restart (main.py shares one generated key between its workers)
+    secret_key: str = Field(default_factory=lambda: secrets.token_urlsafe(32))
+
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_pre_ping: bool = False
+    db_pool_recycle: int = -1
+    # Read replicas, e.g. DB_REPLICA_URLS='["postgresql+asyncpg://replica1/db"]'. Reads are spread over the healthy
+    # ones; a user's reads stay on the primary for db_read_your_writes_seconds after their writes in the same worker.
+    db_replica_urls: list[str] = []
+    db_replica_health_check_seconds: float = 5
+    db_read_your_writes_seconds: float = 5
+    # asyncpg statement cache size; 0 also disables server-side prepares for psycopg (e.g. behind pgbouncer)
+    db_prepared_statement_cache_size: int | None = None
+
+    # bcrypt work factor for new hashes; users on another cost are rehashed on their next login
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31)
+    password_executor: Literal["thread", "process"] = "thread"
+    password_executor_workers: int = 4
+    password_max_concurrency: int = 4
+    # Password operations waiting beyond this are shed with 503 and Retry-After; None ("none" in the environment)
+    # queues without limit
+    password_max_queue: int | None = 64
+
+    # Per-client token buckets on registration and Basic-auth checks, answered with 429 and Retry-After
+    # when empty; a rate of None ("none" in the environment) disables the limit. Clients are keyed by their address.
+    register_rate_limit_per_second: float | None = Field(default=1, gt=0)
+    register_rate_limit_burst: int = Field(default=10, ge=1)
+    basic_auth_rate_limit_per_second: float | None = Field(default=10, gt=0)
+    basic_auth_rate_limit_burst: int = Field(default=50, ge=1)
+    rate_limit_max_clients: int = 100_000
+
+    credential_cache_max_size: int = 10_000
+    credential_cache_ttl_seconds: float = 60
+
+    access_token_ttl_seconds: int = 3600
+
+    # Bloom filter of usernames that rejects unknown users without a DB query. It learns about users
+    # registered by other worker processes or hosts only when it is reloaded from the database, so it is
+    # only safe with a single instance; the launcher turns it off when it starts several workers.
+    username_filter_enabled: bool = False
+    username_filter_capacity: int = 1_000_000
+    username_filter_false_positive_rate: float = Field(default=0.01, gt=0, lt=1)
+    username_filter_reload_seconds: float = 300
 
-    model_config = SettingsConfigDict(env_file=".env")
+    # Both backends invalidate only within one worker process, so the launcher turns the cache off
+    # when it starts several workers
+    task_cache_backend: Literal["none", "memory", "shared"] = "memory"
+    task_cache_max_entries: int = 10_000
+    task_cache_max_bytes: int = 64 * 1024 * 1024
+    task_cache_ttl_seconds: float = 30
 
+    # Server started by main.py. Every worker process builds its own container and engine on startup,
+    # so pooled connections are never shared between processes; 0 workers means one per CPU core.
+    server_host: str = "127.0.0.1"
+    server_port: int = 8000
+    server_workers: int = Field(default=1, ge=0)
+    server_loop: Literal["auto", "asyncio", "uvloop"] = "auto"
+    server_http: Literal["auto", "h11", "httptools"] = "auto"
+    server_backlog: int = 2048
+    # Keep longer than the idle timeout of the load balancer in front, so it never reuses a closed connection
+    server_keep_alive_seconds: int = 5
+    # On SIGTERM, in-flight requests get this long to finish before connections are closed
+    server_graceful_shutdown_seconds: int = 30
+    server_limit_concurrency: int | None = None
+    # Proxies trusted to set X-Forwarded-For, which decides the client address used by the rate limits
+    server_forwarded_allow_ips: str = "127.0.0.1"
 
-config = Config()
+    model_config = SettingsConfigDict(env_file=".env", env_parse_none_str="none")
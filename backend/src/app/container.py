@@ -0,0 +1,142 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.replicas import Replica, ReplicaRouter
+from app.repositories.cache import SharedCacheClientLocal, TaskCache, TaskCacheLRU, TaskCacheShared
+from app.repositories.tasks import TaskRepository, TaskRepositoryCached, TaskRepositoryInMemory, TaskRepositorySQLAlchemy
+from app.repositories.users import UserRepository, UserRepositoryInMemory, UserRepositorySQLAlchemy
+from app.services.tasks import TaskService, TaskServiceImpl
+from app.services.users import UserService, UserServiceImpl
+from app.services.utils.credential_cache import CredentialCache
+from app.services.utils.password_manager import PasswordManagerBcrypt, PasswordManagerPool, create_password_manager_pool
+from app.services.utils.rate_limiter import RateLimiter
+from app.services.utils.token_manager import TokenManager, TokenManagerHMAC
+from app.services.utils.username_filter import UsernameFilter
+
+logger = logging.getLogger(__name__)
+
+
+class Container:
+    """
+    Holds the objects that live as long as the application: the engine, repositories and services.
+
+    It is created once per worker process on startup, started (which loads the username filter)
+    and disposed on shutdown; FastAPI dependencies only hand out the shared instances.
+    """
+    config: Config
+    engine: AsyncEngine | None
+    session_maker: async_sessionmaker[AsyncSession] | None
+    replica_router: ReplicaRouter | None
+    password_manager: PasswordManagerPool
+    credential_cache: CredentialCache
+    token_manager: TokenManager
+    username_filter: UsernameFilter | None
+    register_rate_limiter: RateLimiter | None
+    basic_auth_rate_limiter: RateLimiter | None
+    user_repo: UserRepository
+    task_cache: TaskCache | None
+    task_repo: TaskRepository
+    user_service: UserService
+    task_service: TaskService
+
+    def __init__(self, config: Config):
+        self.config = config
+
+        secret_key = config.secret_key.encode("utf-8")
+        self.password_manager = create_password_manager_pool(PasswordManagerBcrypt(config.bcrypt_rounds),
+                                                             executor_type=config.password_executor,
+                                                             workers=config.password_executor_workers,
+                                                             max_concurrency=config.password_max_concurrency,
+                                                             max_queue=config.password_max_queue)
+        self.credential_cache = CredentialCache(secret_key,
+                                                max_size=config.credential_cache_max_size,
+                                                ttl_seconds=config.credential_cache_ttl_seconds)
+        self.token_manager = TokenManagerHMAC(secret_key, ttl_seconds=config.access_token_ttl_seconds)
+        self.username_filter = None
+        if config.username_filter_enabled:
+            self.username_filter = UsernameFilter(config.username_filter_capacity,
+                                                  config.username_filter_false_positive_rate)
+        self._username_filter_reload_task: asyncio.Task | None = None
+        self._replica_health_check_task: asyncio.Task | None = None
+        self.register_rate_limiter = create_rate_limiter(config.register_rate_limit_per_second,
+                                                         config.register_rate_limit_burst,
+                                                         config.rate_limit_max_clients)
+        self.basic_auth_rate_limiter = create_rate_limiter(config.basic_auth_rate_limit_per_second,
+                                                           config.basic_auth_rate_limit_burst,
+                                                           config.rate_limit_max_clients)
+
+        if config.repository_backend == "memory":
+            self.engine = None
+            self.session_maker = None
+            self.replica_router = None
+            self.task_cache = None
+            self.user_repo = UserRepositoryInMemory()
+            self.task_repo = TaskRepositoryInMemory(self.user_repo)
+        else:
+            self.engine = create_engine(config)
+            self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+            self.replica_router = ReplicaRouter(self.session_maker,
+                                                [Replica(create_engine(config, url)) for url in config.db_replica_urls],
+                                                read_your_writes_seconds=config.db_read_your_writes_seconds)
+            self.task_cache = create_task_cache(config)
+            self.user_repo = UserRepositorySQLAlchemy(self.session_maker, self.replica_router)
+            self.task_repo = TaskRepositorySQLAlchemy(self.session_maker, self.replica_router)
+            if self.task_cache is not None:
+                self.task_repo = TaskRepositoryCached(self.task_repo, self.task_cache)
+        self.user_service = UserServiceImpl(self.user_repo, self.password_manager, self.credential_cache,
+                                            self.username_filter)
+        self.task_service = TaskServiceImpl(self.task_repo)
+
+    async def start(self) -> None:
+        if self.replica_router is not None and self.replica_router.replicas:
+            await self.replica_router.check_health()
+            self._replica_health_check_task = asyncio.create_task(self._check_replicas_periodically())
+        if self.username_filter is not None:
+            await self.username_filter.reload(self.user_repo.stream_usernames())
+            self._username_filter_reload_task = asyncio.create_task(self._reload_username_filter_periodically())
+
+    async def dispose(self) -> None:
+        if self._username_filter_reload_task is not None:
+            self._username_filter_reload_task.cancel()
+        if self._replica_health_check_task is not None:
+            self._replica_health_check_task.cancel()
+        self.password_manager.shutdown()
+        if self.engine is not None:
+            await self.engine.dispose()
+        if self.replica_router is not None:
+            for replica in self.replica_router.replicas:
+                await replica.engine.dispose()
+
+    async def _reload_username_filter_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.username_filter_reload_seconds)
+            try:
+                await self.username_filter.reload(self.user_repo.stream_usernames())
+            except Exception:
+                logger.exception("Reloading the username filter failed; keeping the previous contents")
+
+    async def _check_replicas_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.db_replica_health_check_seconds)
+            await self.replica_router.check_health()
+
+
+def create_task_cache(config: Config) -> TaskCache | None:
+    if config.task_cache_backend == "memory":
+        return TaskCacheLRU(max_entries=config.task_cache_max_entries,
+                            max_bytes=config.task_cache_max_bytes,
+                            ttl_seconds=config.task_cache_ttl_seconds)
+    if config.task_cache_backend == "shared":
+        return TaskCacheShared(SharedCacheClientLocal(max_entries=config.task_cache_max_entries),
+                               ttl_seconds=config.task_cache_ttl_seconds)
+    return None
+
+
+def create_rate_limiter(rate_per_second: float | None, burst: int, max_clients: int) -> RateLimiter | None:
+    if rate_per_second is None:
+        return None
+    return RateLimiter(rate_per_second, burst, max_clients)
@@ -1,18 +1,67 @@
+import math
 from typing import Annotated
 
-from fastapi import Depends, HTTPException
-from fastapi.security import HTTPBasicCredentials, HTTPBasic
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBasicCredentials, HTTPBasic, HTTPBearer
 
-from app.repositories.sqlalchemy_db.engine import engine
-from app.repositories.users import UserRepositorySQLAlchemy
-from app.schemas.user import UserAuth, User
-from app.services.exceptions import AuthenticationError
-from app.services.users import UserServiceImpl, UserService
-from app.services.utils.password_manager import PasswordManagerBcrypt
+from app.container import Container
+from app.request_metrics import RequestMetrics
+from app.schemas.user import UserAuth, User, UserIdentity
+from app.services.exceptions import AuthenticationError, InvalidTokenError, OverloadedError
+from app.services.tasks import TaskService
+from app.services.users import UserService
+from app.services.utils.rate_limiter import RateLimiter
+from app.services.utils.token_manager import TokenManager
 
 
-def get_user_service() -> UserService:
-    return UserServiceImpl(UserRepositorySQLAlchemy(engine), PasswordManagerBcrypt())
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+def get_request_metrics(request: Request) -> RequestMetrics:
+    return request.app.state.request_metrics
+
+
+def get_user_service(container: Annotated[Container, Depends(get_container)]) -> UserService:
+    return container.user_service
+
+
+def get_task_service(container: Annotated[Container, Depends(get_container)]) -> TaskService:
+    return container.task_service
+
+
+def get_token_manager(container: Annotated[Container, Depends(get_container)]) -> TokenManager:
+    return container.token_manager
+
+
+def get_register_rate_limiter(container: Annotated[Container, Depends(get_container)]) -> RateLimiter | None:
+    return container.register_rate_limiter
+
+
+def get_basic_auth_rate_limiter(container: Annotated[Container, Depends(get_container)]) -> RateLimiter | None:
+    return container.basic_auth_rate_limiter
+
+
+def get_client_key(request: Request) -> str:
+    return request.client.host if request.client is not None else "unknown"
+
+
+def check_rate_limit(rate_limiter: RateLimiter | None, client_key: str) -> None:
+    if rate_limiter is None:
+        return
+    wait = rate_limiter.acquire(client_key)
+    if wait > 0:
+        raise HTTPException(429, detail="Too many requests", headers={"Retry-After": str(math.ceil(wait))})
+
+
+def make_overloaded_exception(error: OverloadedError) -> HTTPException:
+    return HTTPException(503, detail="Server is overloaded",
+                         headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))})
+
+
+def limit_registration_rate(client_key: Annotated[str, Depends(get_client_key)],
+                            rate_limiter: Annotated[RateLimiter | None, Depends(get_register_rate_limiter)]) -> None:
+    check_rate_limit(rate_limiter, client_key)
 
 
 def get_user_auth(credentials: Annotated[HTTPBasicCredentials, Depends(HTTPBasic())]) -> UserAuth:
@@ -20,9 +69,40 @@ def get_user_auth(credentials: Annotated[HTTPBasicCredentials, Depends(HTTPBasic
 
 
 async def get_user(user_auth: Annotated[UserAuth, Depends(get_user_auth)],
-                   user_service: Annotated[UserService, Depends(get_user_service)]) -> User:
+                   user_service: Annotated[UserService, Depends(get_user_service)],
+                   client_key: Annotated[str, Depends(get_client_key)],
+                   rate_limiter: Annotated[RateLimiter | None, Depends(get_basic_auth_rate_limiter)]) -> User:
+    cached_user = user_service.get_recently_authenticated_user(user_auth)
+    if cached_user is not None:
+        return cached_user
+    # The limit protects password checks, so credentials accepted from the cache do not draw from it
+    check_rate_limit(rate_limiter, client_key)
     try:
         user = await user_service.authenticate_and_get_user(user_auth)
         return user
     except AuthenticationError:
         raise HTTPException(401)
+    except OverloadedError as error:
+        raise make_overloaded_exception(error)
+
+
+def get_user_by_token(credentials: Annotated[HTTPAuthorizationCredentials, Depends(HTTPBearer())],
+                      token_manager: Annotated[TokenManager, Depends(get_token_manager)]) -> UserIdentity:
+    try:
+        return token_manager.validate_token(credentials.credentials)
+    except InvalidTokenError:
+        raise HTTPException(401, headers={"WWW-Authenticate": "Bearer"})
+
+
+async def get_current_user(
+        basic_credentials: Annotated[HTTPBasicCredentials | None, Depends(HTTPBasic(auto_error=False))],
+        bearer_credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(HTTPBearer(auto_error=False))],
+        user_service: Annotated[UserService, Depends(get_user_service)],
+        token_manager: Annotated[TokenManager, Depends(get_token_manager)],
+        client_key: Annotated[str, Depends(get_client_key)],
+        rate_limiter: Annotated[RateLimiter | None, Depends(get_basic_auth_rate_limiter)]) -> UserIdentity:
+    if bearer_credentials is not None:
+        return get_user_by_token(bearer_credentials, token_manager)
+    if basic_credentials is not None:
+        return await get_user(get_user_auth(basic_credentials), user_service, client_key, rate_limiter)
+    raise HTTPException(401, headers={"WWW-Authenticate": "Basic, Bearer"})
@@ -0,0 +1,62 @@
+import json
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.request_metrics import RequestMetrics, RequestStats, bind_request_stats, unbind_request_stats
+
+logger = logging.getLogger("app.requests")
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestMetricsMiddleware:
+    """
+    Times every HTTP request, records it in RequestMetrics under its route template
+    and writes one structured log line with the request's database and password-hashing costs.
+    """
+    app: ASGIApp
+    metrics: RequestMetrics
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = bind_request_stats(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            unbind_request_stats(token)
+            # The route template rather than the raw path keeps label cardinality bounded.
+            route = scope.get("route")
+            route_path = getattr(route, "path", UNMATCHED_ROUTE)
+            self.metrics.observe_request(scope["method"], route_path, status_code, duration, stats)
+            logger.info(json.dumps({
+                "method": scope["method"],
+                "route": route_path,
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round(duration * 1e3, 3),
+                "db_queries": stats.db_queries,
+                "db_ms": round(stats.db_seconds * 1e3, 3),
+                "db_connection_wait_ms": round(stats.db_connection_wait_seconds * 1e3, 3),
+                "password_hash_calls": stats.password_hash_calls,
+                "password_hash_ms": round(stats.password_hash_seconds * 1e3, 3),
+            }))
@@ -0,0 +1,212 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from app.schemas.metrics import TaskCacheStats
+from app.schemas.task import Task
+
+
+TASK_SIZE_OVERHEAD = 200
+
+_task_list_adapter = TypeAdapter(list[Task])
+
+
+class TaskCache(ABC):
+    @abstractmethod
+    async def get_or_load(self, owner_id: str, key: str, load: Callable[[], Awaitable[list[Task]]]) -> list[Task]:
+        """
+        Returns the cached task list of the owner stored under the key, or loads and caches it on a miss.
+        A list loaded while the owner is being invalidated is not cached.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            key (str): Identifies the list among other lists of the same owner (e.g. filter and page).
+            load (Callable[[], Awaitable[list[Task]]]): Reads the list from the underlying repository.
+
+        Returns:
+            list[Task]: The task list.
+        """
+        pass
+
+    @abstractmethod
+    async def invalidate_owner(self, owner_id: str) -> None:
+        """
+        Drops all cached task lists of the owner.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+        """
+        pass
+
+    @abstractmethod
+    def get_stats(self) -> TaskCacheStats:
+        pass
+
+
+class TaskCacheLRU(TaskCache):
+    """
+    In-process LRU cache bounded by the number of entries and by the estimated size of the cached tasks.
+
+    Invalidation only reaches this process, so with several workers stale lists may be
+    served by other workers for up to ttl_seconds; use TaskCacheShared there.
+    """
+    max_entries: int
+    max_bytes: int
+    ttl_seconds: float
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], tuple[list[Task], int, float]] = OrderedDict()
+        self._keys_by_owner: dict[str, set[str]] = {}
+        self._versions: dict[str, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    async def get_or_load(self, owner_id: str, key: str, load: Callable[[], Awaitable[list[Task]]]) -> list[Task]:
+        entry = self._entries.get((owner_id, key))
+        if entry is not None and entry[2] > self._clock():
+            self._entries.move_to_end((owner_id, key))
+            self._hits += 1
+            return list(entry[0])
+        self._misses += 1
+        version = self._versions.get(owner_id, 0)
+        tasks = await load()
+        if self._versions.get(owner_id, 0) == version:
+            self._put(owner_id, key, tasks)
+        return tasks
+
+    async def invalidate_owner(self, owner_id: str) -> None:
+        self._versions[owner_id] = self._versions.get(owner_id, 0) + 1
+        for key in list(self._keys_by_owner.get(owner_id, ())):
+            self._remove(owner_id, key)
+
+    def get_stats(self) -> TaskCacheStats:
+        return TaskCacheStats(backend="memory", hits=self._hits, misses=self._misses, evictions=self._evictions,
+                              entries=len(self._entries), bytes=self._bytes)
+
+    def _put(self, owner_id: str, key: str, tasks: list[Task]) -> None:
+        size = _estimate_size(tasks)
+        if size > self.max_bytes:
+            return
+        self._remove(owner_id, key)
+        self._entries[(owner_id, key)] = (list(tasks), size, self._clock() + self.ttl_seconds)
+        self._keys_by_owner.setdefault(owner_id, set()).add(key)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            evicted_owner_id, evicted_key = next(iter(self._entries))
+            self._remove(evicted_owner_id, evicted_key)
+            self._evictions += 1
+
+    def _remove(self, owner_id: str, key: str) -> None:
+        entry = self._entries.pop((owner_id, key), None)
+        if entry is None:
+            return
+        self._bytes -= entry[1]
+        keys = self._keys_by_owner[owner_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_owner[owner_id]
+
+
+class SharedCacheClient(ABC):
+    """
+    The minimal key-value interface of a cache shared by all workers (e.g. Redis or Memcached).
+    """
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        pass
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        pass
+
+
+class SharedCacheClientLocal(SharedCacheClient):
+    """
+    In-process stand-in for a shared cache, for single-node setups and tests.
+    """
+    max_entries: int
+
+    def __init__(self, max_entries: int, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._values: OrderedDict[str, tuple[bytes, float | None]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._set(key, value, self._clock() + ttl_seconds)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self._set(key, str(value).encode("ascii"), None)
+        return value
+
+    def _set(self, key: str, value: bytes, expires_at: float | None) -> None:
+        self._values[key] = (value, expires_at)
+        self._values.move_to_end(key)
+        while len(self._values) > self.max_entries:
+            self._values.popitem(last=False)
+
+
+class TaskCacheShared(TaskCache):
+    """
+    Keeps task lists in a SharedCacheClient under keys that contain a per-owner version,
+    so invalidating an owner is a single increment that is seen by all workers.
+    """
+    client: SharedCacheClient
+    ttl_seconds: float
+
+    def __init__(self, client: SharedCacheClient, ttl_seconds: float):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self._hits = 0
+        self._misses = 0
+
+    async def get_or_load(self, owner_id: str, key: str, load: Callable[[], Awaitable[list[Task]]]) -> list[Task]:
+        version = int(await self.client.get(_version_key(owner_id)) or 0)
+        entry_key = f"tasks:{owner_id}:{version}:{key}"
+        cached_value = await self.client.get(entry_key)
+        if cached_value is not None:
+            self._hits += 1
+            return _task_list_adapter.validate_json(cached_value)
+        self._misses += 1
+        tasks = await load()
+        await self.client.set(entry_key, _task_list_adapter.dump_json(tasks), self.ttl_seconds)
+        return tasks
+
+    async def invalidate_owner(self, owner_id: str) -> None:
+        await self.client.incr(_version_key(owner_id))
+
+    def get_stats(self) -> TaskCacheStats:
+        return TaskCacheStats(backend="shared", hits=self._hits, misses=self._misses, evictions=0, entries=0, bytes=0)
+
+
+def _version_key(owner_id: str) -> str:
+    return f"tasks:{owner_id}:version"
+
+
+def _estimate_size(tasks: list[Task]) -> int:
+    return sum(len(task.id or "") + len(task.content) + len(task.owner_id) + TASK_SIZE_OVERHEAD for task in tasks)
@@ -1,18 +1,134 @@
 import asyncio
+import time
+from typing import Any
 
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
 import sqlalchemy as sa
 
-from app.config import config
+from app.config import Config
+from app.request_metrics import record_db_connection_wait, record_db_query
+from app.schemas.metrics import DbPoolStats
 
 
-engine = create_async_engine(config.sqlalchemy_db_url)
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that also records how many checkouts happened,
+    how long they waited for a connection and how many of them timed out.
+    """
+    checkouts: int
+    timeouts: int
+    total_checkout_wait_seconds: float
+    max_checkout_wait_seconds: float
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.total_checkout_wait_seconds += waited
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, waited)
+            record_db_connection_wait(waited)
+
+    def get_stats(self) -> DbPoolStats:
+        return DbPoolStats(size=self.size(),
+                           checked_out=self.checkedout(),
+                           idle=self.checkedin(),
+                           overflow=max(self.overflow(), 0),
+                           max_overflow=self._max_overflow,
+                           checkouts=self.checkouts,
+                           timeouts=self.timeouts,
+                           total_checkout_wait_seconds=self.total_checkout_wait_seconds,
+                           max_checkout_wait_seconds=self.max_checkout_wait_seconds)
+
+
+def create_engine(config: Config, db_url: str | None = None) -> AsyncEngine:
+    url = make_url(db_url or config.sqlalchemy_db_url)
+    if url.get_backend_name() == "sqlite":
+        engine = _create_sqlite_engine(url, config)
+        sa.event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    else:
+        engine = _create_pooled_engine(url, config)
+
+    sa.event.listen(engine.sync_engine, "before_cursor_execute", _start_query_timer)
+    sa.event.listen(engine.sync_engine, "after_cursor_execute", _record_query)
+    sa.event.listen(engine.sync_engine, "handle_error", _record_failed_query)
+    return engine
+
+
+def _create_sqlite_engine(url: URL, config: Config) -> AsyncEngine:
+    if url.database in (None, "", ":memory:"):
+        return create_async_engine(url)
+    return _create_pooled_engine(url, config)
+
+
+def _create_pooled_engine(url: URL, config: Config) -> AsyncEngine:
+    connect_args = {}
+    if config.db_prepared_statement_cache_size is not None:
+        if url.get_driver_name() == "asyncpg":
+            url = url.update_query_dict({"prepared_statement_cache_size": str(config.db_prepared_statement_cache_size)})
+        elif url.get_driver_name() == "psycopg" and config.db_prepared_statement_cache_size == 0:
+            connect_args["prepare_threshold"] = None
+
+    return create_async_engine(url,
+                               poolclass=InstrumentedAsyncQueuePool,
+                               pool_size=config.db_pool_size,
+                               max_overflow=config.db_max_overflow,
+                               pool_timeout=config.db_pool_timeout,
+                               pool_pre_ping=config.db_pool_pre_ping,
+                               pool_recycle=config.db_pool_recycle,
+                               connect_args=connect_args)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Kept on the statement's execution context, which is dropped with the statement whether it succeeds or not
+    context.query_started = time.perf_counter()
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    # The hooks run inside SQLAlchemy's greenlet, which carries the request's context
+    # variables, so the query lands on the RequestStats of the request that issued it.
+    record_db_query(time.perf_counter() - context.query_started)
+
+
+def _record_failed_query(exception_context: sa.engine.ExceptionContext) -> None:
+    started = getattr(exception_context.execution_context, "query_started", None)
+    if started is not None:
+        record_db_query(time.perf_counter() - started)
+
+
+def get_pool_stats(engine: AsyncEngine) -> DbPoolStats | None:
+    if not isinstance(engine.pool, InstrumentedAsyncQueuePool):
+        return None
+    return engine.pool.get_stats()
 
 
 async def check_conn() -> None:
+    engine = create_engine(Config())
     async with AsyncSession(engine) as session:
         await session.execute(sa.text("SELECT 1"))
         print("CONN SUCCESSFUL")
+    await engine.dispose()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+import sqlalchemy as sa
+import sqlalchemy.orm as so
+
+from .base import Base
+from app.schemas.task import Task
+
+
+class TaskModel(Base):
+    __tablename__ = "tasks"
+    __table_args__ = (
+        sa.Index("ix_tasks_owner_id_is_completed_id", "owner_id", "is_completed", "id"),
+    )
+
+    id: so.Mapped[str] = so.mapped_column(primary_key=True, default=lambda: str(uuid4()))
+    content: so.Mapped[str]
+    is_completed: so.Mapped[bool] = so.mapped_column(default=False)
+    owner_id: so.Mapped[str] = so.mapped_column(sa.ForeignKey("users.id", ondelete="CASCADE"))
+
+    def to_task(self) -> Task:
+        return Task(id=self.id,
+                    content=self.content,
+                    is_completed=self.is_completed,
+                    owner_id=self.owner_id)
+
+
+# Full-text search index over tasks.content, kept in sync by the database itself.
+# SQLite: an external-content FTS5 table keyed by tasks.rowid and maintained by triggers, so Core
+# bulk statements and ON DELETE CASCADE are covered too. The owner_id column is indexed as well,
+# which lets a MATCH narrow the candidates to one owner. VACUUM may renumber the rowids of tasks,
+# after which the index has to be rebuilt with INSERT INTO tasks_fts(tasks_fts) VALUES('rebuild').
+# PostgreSQL: a GIN expression index on the tsvector of the content.
+TASKS_FTS_TABLE = "tasks_fts"
+TASKS_TSVECTOR_CONFIG = "simple"
+
+SQLITE_TASKS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts "
+    "USING fts5(content, owner_id, content='tasks', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_after_insert AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, content, owner_id) VALUES (new.rowid, new.content, new.owner_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_after_delete AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content, owner_id) VALUES ('delete', old.rowid, old.content, old.owner_id); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_after_update AFTER UPDATE OF content, owner_id ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, content, owner_id) VALUES ('delete', old.rowid, old.content, old.owner_id); "
+    "INSERT INTO tasks_fts(rowid, content, owner_id) VALUES (new.rowid, new.content, new.owner_id); "
+    "END",
+]
+POSTGRESQL_TASKS_FTS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_tasks_content_tsv ON tasks "
+    f"USING gin (to_tsvector('{TASKS_TSVECTOR_CONFIG}'::regconfig, content))",
+]
+
+for statement in SQLITE_TASKS_FTS_DDL:
+    sa.event.listen(TaskModel.__table__, "after_create", sa.DDL(statement).execute_if(dialect="sqlite"))
+sa.event.listen(TaskModel.__table__, "after_drop",
+                sa.DDL("DROP TABLE IF EXISTS tasks_fts").execute_if(dialect="sqlite"))
+for statement in POSTGRESQL_TASKS_FTS_DDL:
+    sa.event.listen(TaskModel.__table__, "after_create", sa.DDL(statement).execute_if(dialect="postgresql"))
@@ -12,6 +12,7 @@ class UserModel(Base):
     id: so.Mapped[str] = so.mapped_column(primary_key=True, default=lambda: str(uuid4()))
     username: so.Mapped[str] = so.mapped_column(unique=True, index=True)
     password_hash: so.Mapped[str]
+    tasks_version: so.Mapped[int] = so.mapped_column(default=0, server_default="0")
 
     def to_user(self) -> User:
         return User(id=self.id,
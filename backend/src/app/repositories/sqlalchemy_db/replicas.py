@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.schemas.metrics import ReplicaRouterStats, ReplicaStats
+
+logger = logging.getLogger(__name__)
+
+
+class Replica:
+    name: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker[AsyncSession]
+    healthy: bool
+    reads: int
+    failed_checks: int
+
+    def __init__(self, engine: AsyncEngine):
+        self.name = engine.url.render_as_string(hide_password=True)
+        self.engine = engine
+        self.session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        self.healthy = True
+        self.reads = 0
+        self.failed_checks = 0
+
+
+class ReplicaRouter:
+    """
+    Decides where a repository call runs: writes always go to the primary, reads go round-robin
+    to the replicas that passed their last health check, or to the primary when none did.
+
+    A key (the user a call is about) that was written within read_your_writes_seconds keeps
+    reading from the primary, so a user sees their own changes despite replication lag.
+    Writes are only known to the worker process that made them.
+    """
+    primary: async_sessionmaker[AsyncSession]
+    replicas: list[Replica]
+    read_your_writes_seconds: float
+
+    def __init__(self, primary: async_sessionmaker[AsyncSession], replicas: list[Replica] | None = None,
+                 read_your_writes_seconds: float = 5, clock: Callable[[], float] = time.monotonic):
+        self.primary = primary
+        self.replicas = replicas or []
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._clock = clock
+        self._next_replica = 0
+        # key -> time of its last write, oldest first, so expired keys are dropped from the front
+        self._written_at: OrderedDict[str, float] = OrderedDict()
+        self._primary_reads = 0
+        self._pinned_reads = 0
+
+    def read_session(self, key: str | None = None) -> AsyncSession:
+        if not self.replicas:
+            return self.primary()
+        if key is not None and self._was_written_recently(key):
+            self._pinned_reads += 1
+            return self.primary()
+        replica = self._choose_replica()
+        if replica is None:
+            self._primary_reads += 1
+            return self.primary()
+        replica.reads += 1
+        return replica.session_maker()
+
+    def record_write(self, key: str) -> None:
+        if not self.replicas:
+            return
+        self._written_at.pop(key, None)
+        self._written_at[key] = self._clock()
+
+    async def check_health(self, timeout: float = 2) -> None:
+        for replica in self.replicas:
+            try:
+                await asyncio.wait_for(_ping(replica.engine), timeout)
+                if not replica.healthy:
+                    logger.info("Replica %s is healthy again", replica.name)
+                replica.healthy = True
+            except Exception:
+                if replica.healthy:
+                    logger.warning("Replica %s failed its health check; reading from the others", replica.name,
+                                   exc_info=True)
+                replica.healthy = False
+                replica.failed_checks += 1
+
+    def get_stats(self) -> ReplicaRouterStats:
+        return ReplicaRouterStats(primary_reads=self._primary_reads,
+                                  pinned_reads=self._pinned_reads,
+                                  pinned_keys=len(self._written_at),
+                                  replicas=[ReplicaStats(name=replica.name,
+                                                         healthy=replica.healthy,
+                                                         reads=replica.reads,
+                                                         failed_checks=replica.failed_checks)
+                                            for replica in self.replicas])
+
+    def _was_written_recently(self, key: str) -> bool:
+        expired_before = self._clock() - self.read_your_writes_seconds
+        while self._written_at and next(iter(self._written_at.values())) <= expired_before:
+            self._written_at.popitem(last=False)
+        return key in self._written_at
+
+    def _choose_replica(self) -> Replica | None:
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next_replica]
+            self._next_replica = (self._next_replica + 1) % len(self.replicas)
+            if replica.healthy:
+                return replica
+        return None
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(sa.text("SELECT 1"))
@@ -1,6 +1,24 @@
+import re
 from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from typing import AsyncIterator
+from uuid import uuid4
 
-from app.schemas.task import Task
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+
+from app.schemas.task import Task, TaskKey, TaskRecord
+from .cache import TaskCache
+from .exceptions import NotFoundError, ConstraintViolationError
+from .sqlalchemy_db.models.tasks import TASKS_FTS_TABLE, TASKS_TSVECTOR_CONFIG, TaskModel
+from .sqlalchemy_db.models.users import UserModel
+from .sqlalchemy_db.replicas import ReplicaRouter
+from .users import UserRepositoryInMemory
+
+
+STREAM_BATCH_SIZE = 500
+SEARCH_TERM_PATTERN = re.compile(r"[^\W_]+")
 
 
 class TaskRepository(ABC):
@@ -36,7 +54,7 @@ class TaskRepository(ABC):
         pass
 
     @abstractmethod
-    def delete_task_by_id(self, task_id: str) -> None:
+    def delete_task_by_id(self, task_id: str) -> Task:
         """
         Deletes the task with the specified task_id from the repository.
         Raises an exception if the task with the given ID is not found in the repository.
@@ -46,19 +64,646 @@ class TaskRepository(ABC):
 
         Raises:
             NotFoundError: If task with given task_id does not exist in the repository.
+
+        Returns:
+            Task: The deleted task.
+        """
+        pass
+
+    @abstractmethod
+    def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        """
+        Creates all the given tasks in the repository in a single transaction.
+
+        Args:
+            tasks (list[Task]): Task objects with null ids (they will be replaced if presented).
+
+        Raises:
+            ConstraintViolationError: If something wrong with input data (e.g. not-existing owner_id).
+                                      No task is created in this case.
+
+        Returns:
+            list[Task]: The new Task objects with repository-given IDs, in the same order.
         """
         pass
 
     @abstractmethod
-    def get_tasks_by_owner_id(self, owner_id: str) -> list[Task]:
+    def set_tasks_complete_status(self, owner_id: str, task_ids: list[str], is_completed: bool) -> list[str]:
         """
-        Retrieves all tasks associated with the user specified by owner_id.
-        Raises an exception if the user with the given ID is not found in the repository.
+        Sets the complete status of all the tasks with the given IDs that belong to the user
+        specified by owner_id in a single statement.
 
         Args:
-            owner_id (str): The ID of the user who owns the tasks. Must exist in the repository.
+            owner_id (str): The ID of the user who owns the tasks.
+            task_ids (list[str]): IDs of the tasks to be updated.
+            is_completed (bool): The new complete status.
+
+        Returns:
+            list[str]: IDs of the updated tasks. IDs that were not found are left out.
+        """
+        pass
+
+    @abstractmethod
+    def delete_tasks_by_ids(self, owner_id: str, task_ids: list[str]) -> list[str]:
+        """
+        Deletes all the tasks with the given IDs that belong to the user specified by owner_id
+        in a single statement.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            task_ids (list[str]): IDs of the tasks to be deleted.
+
+        Returns:
+            list[str]: IDs of the deleted tasks. IDs that were not found are left out.
+        """
+        pass
+
+    @abstractmethod
+    def get_task_by_id(self, task_id: str) -> Task:
+        """
+        Fetches the task with the specified task_id from the repository.
+
+        Args:
+            task_id (str): The task`s ID.
+
+        Raises:
+            NotFoundError: If task with given task_id does not exist in the repository.
+
+        Returns:
+            Task: The Task object with the given ID.
+        """
+        pass
+
+    @abstractmethod
+    def get_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                              after: TaskKey | None = None, limit: int | None = None) -> list[Task]:
+        """
+        Retrieves tasks associated with the user specified by owner_id,
+        ordered by complete status (uncompleted first) and then by ID.
+        Returns an empty list if the user with the given ID is not found in the repository.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            is_completed (bool | None): If given, only tasks with this complete status are returned.
+            after (TaskKey | None): If given, only tasks that come after the task with this
+                                    (is_completed, id) key in the above order are returned.
+            limit (int | None): If given, at most this many tasks are returned.
 
         Returns:
             list[Task]: A list of Task objects owned by the user with the specified owner_id.
         """
         pass
+
+    @abstractmethod
+    def get_versioned_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                        after: TaskKey | None = None,
+                                        limit: int | None = None) -> tuple[int, list[Task]]:
+        """
+        Same as get_tasks_by_owner_id, but also returns the version of the user`s task list
+        (see get_tasks_version), read before the tasks in the same transaction,
+        so the tasks are never older than the returned version.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            is_completed (bool | None): If given, only tasks with this complete status are returned.
+            after (TaskKey | None): If given, only tasks that come after the task with this
+                                    (is_completed, id) key are returned.
+            limit (int | None): If given, at most this many tasks are returned.
+
+        Returns:
+            tuple[int, list[Task]]: The version of the task list and the matching tasks.
+        """
+        pass
+
+    @abstractmethod
+    def stream_tasks_by_owner_id(self, owner_id: str) -> AsyncIterator[TaskRecord]:
+        """
+        Yields all tasks associated with the user specified by owner_id one by one, in the same order
+        as get_tasks_by_owner_id, without loading all of them into memory at once.
+
+        This is the bulk-read path, so the tasks come as lightweight records with only the listed fields.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+
+        Returns:
+            AsyncIterator[TaskRecord]: The user`s tasks.
+        """
+        pass
+
+    @abstractmethod
+    def count_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None) -> int:
+        """
+        Counts the tasks associated with the user specified by owner_id.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            is_completed (bool | None): If given, only tasks with this complete status are counted.
+
+        Returns:
+            int: The number of matching tasks.
+        """
+        pass
+
+    @abstractmethod
+    def get_tasks_version(self, owner_id: str) -> int:
+        """
+        Returns the version of the user`s task list. Every write that changes any of the user`s tasks
+        increments it, so an unchanged version means an unchanged task list.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+
+        Returns:
+            int: The current version, 0 for users without any writes (or not existing users).
+        """
+        pass
+
+    @abstractmethod
+    def search_tasks_by_owner_id(self, owner_id: str, query: str, offset: int = 0,
+                                 limit: int | None = None) -> list[Task]:
+        """
+        Finds the tasks of the user specified by owner_id whose content contains every word of the query,
+        best matches first. Words are compared case-insensitively; punctuation in the query is ignored.
+
+        Args:
+            owner_id (str): The ID of the user who owns the tasks.
+            query (str): Free text to search for.
+            offset (int): The number of best matches to skip.
+            limit (int | None): The maximum number of tasks to return, or None for all of them.
+
+        Returns:
+            list[Task]: The matching tasks; empty if the query has no words.
+        """
+        pass
+
+
+class TaskRepositorySQLAlchemy(TaskRepository):
+    session_maker: async_sessionmaker[AsyncSession]
+    replica_router: ReplicaRouter
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession], replica_router: ReplicaRouter | None = None):
+        self.session_maker = session_maker
+        self.replica_router = replica_router or ReplicaRouter(session_maker)
+
+    async def add_task(self, task: Task) -> Task:
+        # The key is generated here, so the INSERT needs neither RETURNING nor a SELECT to read it back
+        added_task = task.model_copy(update={"id": str(uuid4())})
+        async with self.session_maker() as session:
+            try:
+                await session.execute(sa.insert(TaskModel).values(**added_task.model_dump()))
+                await _bump_tasks_version(session, added_task.owner_id)
+                await session.commit()
+                self.replica_router.record_write(added_task.owner_id)
+                return added_task
+            except IntegrityError:
+                raise ConstraintViolationError
+
+    async def update_task(self, updated_task: Task) -> None:
+        async with self.session_maker() as session:
+            query = (sa.update(TaskModel)
+                     .where(TaskModel.id == updated_task.id)
+                     .values(content=updated_task.content, is_completed=updated_task.is_completed)
+                     .returning(TaskModel.owner_id))
+            owner_id = await session.scalar(query)
+            if owner_id is None:
+                raise NotFoundError
+            await _bump_tasks_version(session, owner_id)
+            await session.commit()
+            self.replica_router.record_write(owner_id)
+
+    async def delete_task_by_id(self, task_id: str) -> Task:
+        async with self.session_maker() as session:
+            query = sa.delete(TaskModel).where(TaskModel.id == task_id).returning(TaskModel)
+            task_model = await session.scalar(query)
+            if not task_model:
+                raise NotFoundError
+            await _bump_tasks_version(session, task_model.owner_id)
+            await session.commit()
+            self.replica_router.record_write(task_model.owner_id)
+            return task_model.to_task()
+
+    async def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        added_tasks = [task.model_copy(update={"id": str(uuid4())}) for task in tasks]
+        if not added_tasks:
+            return []
+        async with self.session_maker() as session:
+            query = sa.insert(TaskModel).values([
+                {"id": task.id, "content": task.content, "is_completed": task.is_completed, "owner_id": task.owner_id}
+                for task in added_tasks
+            ])
+            try:
+                await session.execute(query)
+                for owner_id in {task.owner_id for task in added_tasks}:
+                    await _bump_tasks_version(session, owner_id)
+                await session.commit()
+            except IntegrityError:
+                raise ConstraintViolationError
+        for owner_id in {task.owner_id for task in added_tasks}:
+            self.replica_router.record_write(owner_id)
+        return added_tasks
+
+    async def set_tasks_complete_status(self, owner_id: str, task_ids: list[str], is_completed: bool) -> list[str]:
+        async with self.session_maker() as session:
+            query = (sa.update(TaskModel)
+                     .where(TaskModel.owner_id == owner_id, TaskModel.id.in_(task_ids))
+                     .values(is_completed=is_completed)
+                     .returning(TaskModel.id))
+            updated_ids = list(await session.scalars(query))
+            if updated_ids:
+                await _bump_tasks_version(session, owner_id)
+            await session.commit()
+            self.replica_router.record_write(owner_id)
+            return updated_ids
+
+    async def delete_tasks_by_ids(self, owner_id: str, task_ids: list[str]) -> list[str]:
+        async with self.session_maker() as session:
+            query = (sa.delete(TaskModel)
+                     .where(TaskModel.owner_id == owner_id, TaskModel.id.in_(task_ids))
+                     .returning(TaskModel.id))
+            deleted_ids = list(await session.scalars(query))
+            if deleted_ids:
+                await _bump_tasks_version(session, owner_id)
+            await session.commit()
+            self.replica_router.record_write(owner_id)
+            return deleted_ids
+
+    async def get_task_by_id(self, task_id: str) -> Task:
+        # Stays on the primary: the owner is not known up front, and the task is usually about to be changed
+        async with self.session_maker() as session:
+            task_model = await session.get(TaskModel, task_id)
+            if not task_model:
+                raise NotFoundError
+            return task_model.to_task()
+
+    async def get_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                    after: TaskKey | None = None, limit: int | None = None) -> list[Task]:
+        async with self.replica_router.read_session(owner_id) as session:
+            return await _select_tasks(session, owner_id, is_completed, after, limit)
+
+    async def get_versioned_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                              after: TaskKey | None = None,
+                                              limit: int | None = None) -> tuple[int, list[Task]]:
+        # One session, so both reads hit the same database, and the version is read first:
+        # a write committed in between can only make the tasks newer than the version
+        async with self.replica_router.read_session(owner_id) as session:
+            version = await _select_tasks_version(session, owner_id)
+            return version, await _select_tasks(session, owner_id, is_completed, after, limit)
+
+    async def stream_tasks_by_owner_id(self, owner_id: str) -> AsyncIterator[TaskRecord]:
+        # Plain column rows instead of ORM entities: no identity map, attribute instrumentation
+        # or pydantic validation per row, and the owner_id column is not even read
+        async with self.replica_router.read_session(owner_id) as session:
+            query = (_filter_by_owner(sa.select(TaskModel.id, TaskModel.content, TaskModel.is_completed),
+                                      owner_id, None)
+                     .order_by(TaskModel.is_completed, TaskModel.id)
+                     .execution_options(yield_per=STREAM_BATCH_SIZE))
+            result = await session.stream(query)
+            async for rows in result.partitions():
+                for row in rows:
+                    yield TaskRecord(*row)
+
+    async def count_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None) -> int:
+        async with self.replica_router.read_session(owner_id) as session:
+            query = _filter_by_owner(sa.select(sa.func.count()).select_from(TaskModel), owner_id, is_completed)
+            return await session.scalar(query)
+
+    async def get_tasks_version(self, owner_id: str) -> int:
+        # Stays on the primary: a version read from a lagging replica could still match the ETag
+        # of a client that has just written, and answer 304 with its old list
+        async with self.session_maker() as session:
+            return await _select_tasks_version(session, owner_id)
+
+    async def search_tasks_by_owner_id(self, owner_id: str, query: str, offset: int = 0,
+                                       limit: int | None = None) -> list[Task]:
+        terms = get_search_terms(query)
+        if not terms:
+            return []
+        async with self.replica_router.read_session(owner_id) as session:
+            dialect = session.bind.dialect.name
+            if dialect == "sqlite":
+                search_query = _search_sqlite(owner_id, terms)
+            elif dialect == "postgresql":
+                search_query = _search_postgresql(owner_id, terms)
+            else:
+                search_query = _search_like(owner_id, terms)
+            task_models = await session.scalars(search_query.offset(offset).limit(limit))
+            return [task_model.to_task() for task_model in task_models]
+
+
+class TaskRepositoryInMemory(TaskRepository):
+    """
+    Keeps tasks in a dict indexed by ID plus, for every owner, a list of task keys sorted
+    the same way as the SQL index (is_completed, id), so pages and filters are found by bisection.
+
+    No method awaits between reading and writing the indexes,
+    so every call is atomic with respect to other coroutines.
+    """
+    user_repo: UserRepositoryInMemory
+
+    def __init__(self, user_repo: UserRepositoryInMemory, tasks: list[Task] | None = None):
+        self.user_repo = user_repo
+        self._tasks_by_id: dict[str, Task] = {}
+        self._keys_by_owner: dict[str, list[TaskKey]] = {}
+        self._task_ids_by_term: dict[str, dict[str, set[str]]] = {}
+        self._versions: dict[str, int] = {}
+        for task in tasks or []:
+            self._insert(task)
+
+    async def add_task(self, task: Task) -> Task:
+        if not self.user_repo.has_user_id(task.owner_id):
+            raise ConstraintViolationError
+        added_task = task.model_copy(update={"id": str(uuid4())})
+        self._insert(added_task)
+        self._bump_version(added_task.owner_id)
+        return added_task
+
+    async def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        if not all(self.user_repo.has_user_id(task.owner_id) for task in tasks):
+            raise ConstraintViolationError
+        added_tasks = [task.model_copy(update={"id": str(uuid4())}) for task in tasks]
+        for task in added_tasks:
+            self._insert(task)
+        for owner_id in {task.owner_id for task in added_tasks}:
+            self._bump_version(owner_id)
+        return added_tasks
+
+    async def update_task(self, updated_task: Task) -> None:
+        task = self._tasks_by_id.get(updated_task.id)
+        if task is None:
+            raise NotFoundError
+        self._remove(task)
+        self._insert(task.model_copy(update={"content": updated_task.content,
+                                             "is_completed": updated_task.is_completed}))
+        self._bump_version(task.owner_id)
+
+    async def set_tasks_complete_status(self, owner_id: str, task_ids: list[str], is_completed: bool) -> list[str]:
+        updated_ids = []
+        for task_id in dict.fromkeys(task_ids):
+            task = self._tasks_by_id.get(task_id)
+            if task is None or task.owner_id != owner_id:
+                continue
+            self._remove(task)
+            self._insert(task.model_copy(update={"is_completed": is_completed}))
+            updated_ids.append(task_id)
+        if updated_ids:
+            self._bump_version(owner_id)
+        return updated_ids
+
+    async def delete_task_by_id(self, task_id: str) -> Task:
+        task = self._tasks_by_id.get(task_id)
+        if task is None:
+            raise NotFoundError
+        self._remove(task)
+        self._bump_version(task.owner_id)
+        return task
+
+    async def delete_tasks_by_ids(self, owner_id: str, task_ids: list[str]) -> list[str]:
+        deleted_ids = []
+        for task_id in dict.fromkeys(task_ids):
+            task = self._tasks_by_id.get(task_id)
+            if task is None or task.owner_id != owner_id:
+                continue
+            self._remove(task)
+            deleted_ids.append(task_id)
+        if deleted_ids:
+            self._bump_version(owner_id)
+        return deleted_ids
+
+    async def get_task_by_id(self, task_id: str) -> Task:
+        task = self._tasks_by_id.get(task_id)
+        if task is None:
+            raise NotFoundError
+        return task
+
+    async def get_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                    after: TaskKey | None = None, limit: int | None = None) -> list[Task]:
+        keys = self._keys_by_owner.get(owner_id, [])
+        start, end = self._find_range(keys, is_completed)
+        if after is not None:
+            start = max(start, bisect_right(keys, after))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._tasks_by_id[task_id] for _, task_id in keys[start:end]]
+
+    async def get_versioned_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                              after: TaskKey | None = None,
+                                              limit: int | None = None) -> tuple[int, list[Task]]:
+        return self._versions.get(owner_id, 0), await self.get_tasks_by_owner_id(owner_id, is_completed, after, limit)
+
+    async def stream_tasks_by_owner_id(self, owner_id: str) -> AsyncIterator[TaskRecord]:
+        for task in await self.get_tasks_by_owner_id(owner_id):
+            yield TaskRecord.from_task(task)
+
+    async def count_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None) -> int:
+        start, end = self._find_range(self._keys_by_owner.get(owner_id, []), is_completed)
+        return end - start
+
+    async def get_tasks_version(self, owner_id: str) -> int:
+        return self._versions.get(owner_id, 0)
+
+    async def search_tasks_by_owner_id(self, owner_id: str, query: str, offset: int = 0,
+                                       limit: int | None = None) -> list[Task]:
+        terms = get_search_terms(query)
+        task_ids_by_term = self._task_ids_by_term.get(owner_id, {})
+        if not terms or any(term not in task_ids_by_term for term in terms):
+            return []
+        task_ids = set.intersection(*(task_ids_by_term[term] for term in terms))
+
+        tasks = sorted((self._tasks_by_id[task_id] for task_id in task_ids),
+                       key=lambda task: (len(task.content), task.id))
+        end = None if limit is None else offset + limit
+        return tasks[offset:end]
+
+    def _insert(self, task: Task) -> None:
+        self._tasks_by_id[task.id] = task
+        insort(self._keys_by_owner.setdefault(task.owner_id, []), (task.is_completed, task.id))
+        task_ids_by_term = self._task_ids_by_term.setdefault(task.owner_id, {})
+        for term in set(get_search_terms(task.content)):
+            task_ids_by_term.setdefault(term, set()).add(task.id)
+
+    def _remove(self, task: Task) -> None:
+        del self._tasks_by_id[task.id]
+        keys = self._keys_by_owner[task.owner_id]
+        del keys[bisect_left(keys, (task.is_completed, task.id))]
+        task_ids_by_term = self._task_ids_by_term[task.owner_id]
+        for term in set(get_search_terms(task.content)):
+            task_ids_by_term[term].discard(task.id)
+            if not task_ids_by_term[term]:
+                del task_ids_by_term[term]
+
+    def _bump_version(self, owner_id: str) -> None:
+        self._versions[owner_id] = self._versions.get(owner_id, 0) + 1
+
+    @staticmethod
+    def _find_range(keys: list[TaskKey], is_completed: bool | None) -> tuple[int, int]:
+        if is_completed is None:
+            return 0, len(keys)
+        first_completed = bisect_left(keys, (True, ""))
+        return (first_completed, len(keys)) if is_completed else (0, first_completed)
+
+
+class TaskRepositoryCached(TaskRepository):
+    """
+    Serves task lists of the wrapped repository from a TaskCache.
+    Every write drops the cached lists of the affected owner.
+    """
+    task_repo: TaskRepository
+    cache: TaskCache
+
+    def __init__(self, task_repo: TaskRepository, cache: TaskCache):
+        self.task_repo = task_repo
+        self.cache = cache
+
+    async def add_task(self, task: Task) -> Task:
+        added_task = await self.task_repo.add_task(task)
+        await self.cache.invalidate_owner(added_task.owner_id)
+        return added_task
+
+    async def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        added_tasks = await self.task_repo.add_tasks(tasks)
+        for owner_id in {task.owner_id for task in added_tasks}:
+            await self.cache.invalidate_owner(owner_id)
+        return added_tasks
+
+    async def update_task(self, updated_task: Task) -> None:
+        await self.task_repo.update_task(updated_task)
+        await self.cache.invalidate_owner(updated_task.owner_id)
+
+    async def set_tasks_complete_status(self, owner_id: str, task_ids: list[str], is_completed: bool) -> list[str]:
+        updated_ids = await self.task_repo.set_tasks_complete_status(owner_id, task_ids, is_completed)
+        if updated_ids:
+            await self.cache.invalidate_owner(owner_id)
+        return updated_ids
+
+    async def delete_task_by_id(self, task_id: str) -> Task:
+        deleted_task = await self.task_repo.delete_task_by_id(task_id)
+        await self.cache.invalidate_owner(deleted_task.owner_id)
+        return deleted_task
+
+    async def delete_tasks_by_ids(self, owner_id: str, task_ids: list[str]) -> list[str]:
+        deleted_ids = await self.task_repo.delete_tasks_by_ids(owner_id, task_ids)
+        if deleted_ids:
+            await self.cache.invalidate_owner(owner_id)
+        return deleted_ids
+
+    async def get_task_by_id(self, task_id: str) -> Task:
+        return await self.task_repo.get_task_by_id(task_id)
+
+    async def get_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                    after: TaskKey | None = None, limit: int | None = None) -> list[Task]:
+        _, tasks = await self.get_versioned_tasks_by_owner_id(owner_id, is_completed, after, limit)
+        return tasks
+
+    async def get_versioned_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                              after: TaskKey | None = None,
+                                              limit: int | None = None) -> tuple[int, list[Task]]:
+        # The key holds the stored version of the task list, so an entry never outlives a write,
+        # even one made by another process, and its tasks always match the version returned with them
+        version = await self.task_repo.get_tasks_version(owner_id)
+
+        async def load() -> list[Task]:
+            loaded_version, tasks = await self.task_repo.get_versioned_tasks_by_owner_id(
+                owner_id, is_completed, after, limit
+            )
+            if loaded_version != version:
+                raise _TasksVersionChanged(loaded_version, tasks)
+            return tasks
+
+        try:
+            return version, await self.cache.get_or_load(owner_id, f"{version}:{is_completed}:{after}:{limit}", load)
+        except _TasksVersionChanged as changed:
+            # Written (or read from another replica) between the two reads: returned without caching
+            return changed.version, changed.tasks
+
+    def stream_tasks_by_owner_id(self, owner_id: str) -> AsyncIterator[TaskRecord]:
+        return self.task_repo.stream_tasks_by_owner_id(owner_id)
+
+    async def count_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None) -> int:
+        return await self.task_repo.count_tasks_by_owner_id(owner_id, is_completed)
+
+    async def get_tasks_version(self, owner_id: str) -> int:
+        return await self.task_repo.get_tasks_version(owner_id)
+
+    async def search_tasks_by_owner_id(self, owner_id: str, query: str, offset: int = 0,
+                                       limit: int | None = None) -> list[Task]:
+        return await self.task_repo.search_tasks_by_owner_id(owner_id, query, offset, limit)
+
+
+class _TasksVersionChanged(Exception):
+    def __init__(self, version: int, tasks: list[Task]):
+        self.version = version
+        self.tasks = tasks
+
+
+def get_search_terms(text: str) -> list[str]:
+    # Approximates the default tokenizers of the FTS indexes: runs of letters and digits, case-folded
+    return SEARCH_TERM_PATTERN.findall(text.casefold())
+
+
+async def _select_tasks(session: AsyncSession, owner_id: str, is_completed: bool | None,
+                        after: TaskKey | None, limit: int | None) -> list[Task]:
+    query = (_filter_by_owner(sa.select(TaskModel), owner_id, is_completed)
+             .order_by(TaskModel.is_completed, TaskModel.id)
+             .limit(limit))
+    if after is not None:
+        query = query.where(sa.tuple_(TaskModel.is_completed, TaskModel.id) > sa.tuple_(*after))
+    task_models = await session.scalars(query)
+    return [task_model.to_task() for task_model in task_models]
+
+
+async def _select_tasks_version(session: AsyncSession, owner_id: str) -> int:
+    query = sa.select(UserModel.tasks_version).where(UserModel.id == owner_id)
+    return await session.scalar(query) or 0
+
+
+async def _bump_tasks_version(session: AsyncSession, owner_id: str) -> None:
+    query = (sa.update(UserModel)
+             .where(UserModel.id == owner_id)
+             .values(tasks_version=UserModel.tasks_version + 1))
+    await session.execute(query)
+
+
+def _search_sqlite(owner_id: str, terms: list[str]) -> sa.Select:
+    # Every term is quoted, so FTS5 query syntax in user input is matched literally.
+    # The owner_id column of the index narrows the match to the owner's tasks inside FTS5.
+    quoted_terms = " ".join(_quote_fts5_phrase(term) for term in terms)
+    match = f"owner_id : {_quote_fts5_phrase(owner_id)} AND content : ({quoted_terms})"
+    tasks_fts = sa.table(TASKS_FTS_TABLE, sa.column("rowid"))
+    # bm25() reads the whole doclist of every term to compute its IDF, which costs tens of milliseconds
+    # for common words at millions of tasks. Every result contains all the terms anyway,
+    # so shorter content is ranked first, which is what bm25 mostly amounts to here.
+    return (sa.select(TaskModel)
+            .select_from(tasks_fts)
+            .join(TaskModel, sa.literal_column("tasks.rowid") == tasks_fts.c.rowid)
+            .where(sa.literal_column(TASKS_FTS_TABLE).op("MATCH")(match), TaskModel.owner_id == owner_id)
+            .order_by(sa.func.length(TaskModel.content), TaskModel.id))
+
+
+def _quote_fts5_phrase(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _search_postgresql(owner_id: str, terms: list[str]) -> sa.Select:
+    # The expression must match the one of the GIN index ix_tasks_content_tsv for the index to be used
+    config = sa.literal_column(f"'{TASKS_TSVECTOR_CONFIG}'::regconfig")
+    document = sa.func.to_tsvector(config, TaskModel.content)
+    ts_query = sa.func.plainto_tsquery(config, " ".join(terms))
+    return (sa.select(TaskModel)
+            .where(TaskModel.owner_id == owner_id, document.op("@@")(ts_query))
+            .order_by(sa.func.ts_rank(document, ts_query).desc(), TaskModel.id))
+
+
+def _search_like(owner_id: str, terms: list[str]) -> sa.Select:
+    # Unindexed fallback for other databases: scans the owner's tasks
+    return (sa.select(TaskModel)
+            .where(TaskModel.owner_id == owner_id,
+                   *(TaskModel.content.ilike(f"%{term}%") for term in terms))
+            .order_by(TaskModel.id))
+
+
+def _filter_by_owner(query: sa.Select, owner_id: str, is_completed: bool | None) -> sa.Select:
+    query = query.where(TaskModel.owner_id == owner_id)
+    if is_completed is not None:
+        query = query.where(TaskModel.is_completed == is_completed)
+    return query
@@ -1,12 +1,19 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
+from uuid import uuid4
 
 import sqlalchemy as sa
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
 
 from app.schemas.user import User, UserAuth
 from .exceptions import NotFoundError, ConstraintViolationError
 from .sqlalchemy_db.models.users import UserModel
+from .sqlalchemy_db.replicas import ReplicaRouter
+
+# Modular crypt format of bcrypt: "$2b$" + two-digit cost + "$" + salt and hash
+BCRYPT_HASH_PATTERN = "$2_$__$%"
+USERNAME_STREAM_BATCH_SIZE = 5000
 
 
 class UserRepository(ABC):
@@ -42,15 +49,56 @@ class UserRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def stream_usernames(self) -> AsyncIterator[str]:
+        """
+        Yields the usernames of all users one by one without loading all of them into memory at once.
+
+        Returns:
+            AsyncIterator[str]: The usernames in no particular order.
+        """
+        pass
+
+    @abstractmethod
+    def update_password_hash(self, user_id: str, password_hash: str) -> User:
+        """
+        Replaces the stored password hash of a user, e.g. after rehashing it with a new work factor.
+
+        Args:
+            user_id (str): The ID of the user to update.
+            password_hash (str): The new password hash.
+
+        Raises:
+            NotFoundError: When there is no user with the given ID.
+
+        Returns:
+            User: The updated user.
+        """
+        pass
+
+    @abstractmethod
+    def count_users_by_password_hash_cost(self) -> dict[int, int]:
+        """
+        Counts users per bcrypt work factor, read from the "$2b$NN$" prefix of their password hashes.
+
+        Hashes in any other format are not counted.
+
+        Returns:
+            dict[int, int]: The number of users for each work factor.
+        """
+        pass
+
 
 class UserRepositorySQLAlchemy(UserRepository):
     session_maker: async_sessionmaker[AsyncSession]
+    replica_router: ReplicaRouter
 
-    def __init__(self, engine: AsyncEngine):
-        self.session_maker = async_sessionmaker(engine)
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession], replica_router: ReplicaRouter | None = None):
+        self.session_maker = session_maker
+        self.replica_router = replica_router or ReplicaRouter(session_maker)
 
     async def get_user_by_username(self, username: str) -> User:
-        async with self.session_maker() as session:
+        async with self.replica_router.read_session(username) as session:
             query = sa.select(UserModel).where(UserModel.username == username)
             user_model = await session.scalar(query)
             if not user_model:
@@ -58,12 +106,93 @@ class UserRepositorySQLAlchemy(UserRepository):
             return user_model.to_user()
 
     async def add_user(self, user: UserAuth) -> User:
+        added_user = User(id=str(uuid4()), username=user.username, password_hash=user.password)
         async with self.session_maker() as session:
-            user_model = UserModel(username=user.username, password_hash=user.password)
-            session.add(user_model)
             try:
+                await session.execute(sa.insert(UserModel).values(**added_user.model_dump()))
                 await session.commit()
-                await session.refresh(user_model)
-                return user_model.to_user()
+                self.replica_router.record_write(added_user.username)
+                return added_user
             except IntegrityError:
                 raise ConstraintViolationError
+
+    async def stream_usernames(self) -> AsyncIterator[str]:
+        # Stays on the primary: a lagging replica would leave recently registered users out of the
+        # username filter, and their logins would fail until its next reload
+        async with self.session_maker() as session:
+            query = sa.select(UserModel.username).execution_options(yield_per=USERNAME_STREAM_BATCH_SIZE)
+            async for username in await session.stream_scalars(query):
+                yield username
+
+    async def update_password_hash(self, user_id: str, password_hash: str) -> User:
+        async with self.session_maker() as session:
+            query = (sa.update(UserModel).where(UserModel.id == user_id)
+                     .values(password_hash=password_hash).returning(UserModel))
+            user_model = await session.scalar(query)
+            if user_model is None:
+                raise NotFoundError
+            user = user_model.to_user()
+            await session.commit()
+            self.replica_router.record_write(user.username)
+            return user
+
+    async def count_users_by_password_hash_cost(self) -> dict[int, int]:
+        async with self.replica_router.read_session() as session:
+            cost = sa.func.substr(UserModel.password_hash, 5, 2)
+            query = (sa.select(cost, sa.func.count())
+                     .where(UserModel.password_hash.like(BCRYPT_HASH_PATTERN))
+                     .group_by(cost))
+            rows = await session.execute(query)
+            return {int(cost): count for cost, count in rows if cost.isdigit()}
+
+
+class UserRepositoryInMemory(UserRepository):
+    """
+    Keeps users in dicts indexed by ID and by username.
+
+    No method awaits between reading and writing the indexes,
+    so every call is atomic with respect to other coroutines.
+    """
+    def __init__(self, users: list[User] | None = None):
+        self._users_by_id: dict[str, User] = {}
+        self._ids_by_username: dict[str, str] = {}
+        for user in users or []:
+            self._users_by_id[user.id] = user
+            self._ids_by_username[user.username] = user.id
+
+    async def get_user_by_username(self, username: str) -> User:
+        user_id = self._ids_by_username.get(username)
+        if user_id is None:
+            raise NotFoundError
+        return self._users_by_id[user_id]
+
+    async def add_user(self, user: UserAuth) -> User:
+        if user.username in self._ids_by_username:
+            raise ConstraintViolationError
+        added_user = User(id=str(uuid4()), username=user.username, password_hash=user.password)
+        self._users_by_id[added_user.id] = added_user
+        self._ids_by_username[added_user.username] = added_user.id
+        return added_user
+
+    async def stream_usernames(self) -> AsyncIterator[str]:
+        for username in list(self._ids_by_username):
+            yield username
+
+    async def update_password_hash(self, user_id: str, password_hash: str) -> User:
+        user = self._users_by_id.get(user_id)
+        if user is None:
+            raise NotFoundError
+        updated_user = user.model_copy(update={"password_hash": password_hash})
+        self._users_by_id[user_id] = updated_user
+        return updated_user
+
+    async def count_users_by_password_hash_cost(self) -> dict[int, int]:
+        counts = {}
+        for user in self._users_by_id.values():
+            cost = user.password_hash[4:6]
+            if user.password_hash.startswith("$2") and user.password_hash[3:4] == "$" and cost.isdigit():
+                counts[int(cost)] = counts.get(int(cost), 0) + 1
+        return counts
+
+    def has_user_id(self, user_id: str) -> bool:
+        return user_id in self._users_by_id
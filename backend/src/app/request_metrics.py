@@ -0,0 +1,179 @@
+import math
+from bisect import bisect_left
+from contextvars import ContextVar, Token
+from typing import Iterator
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = tuple[str, ...]
+
+
+class RequestStats:
+    """
+    Accumulates what a single request spent its time on.
+
+    An instance is bound to the request's context by the metrics middleware; the engine event hooks,
+    the connection pool and the password manager add to whichever instance is current.
+    """
+    db_queries: int
+    db_seconds: float
+    db_connection_wait_seconds: float
+    password_hash_calls: int
+    password_hash_seconds: float
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.db_connection_wait_seconds = 0.0
+        self.password_hash_calls = 0
+        self.password_hash_seconds = 0.0
+
+
+_current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+def bind_request_stats(stats: RequestStats) -> Token:
+    return _current_request_stats.set(stats)
+
+
+def unbind_request_stats(token: Token) -> None:
+    _current_request_stats.reset(token)
+
+
+def get_current_request_stats() -> RequestStats | None:
+    return _current_request_stats.get()
+
+
+def record_db_query(seconds: float) -> None:
+    stats = _current_request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += seconds
+
+
+def record_db_connection_wait(seconds: float) -> None:
+    stats = _current_request_stats.get()
+    if stats is not None:
+        stats.db_connection_wait_seconds += seconds
+
+
+def record_password_hash(seconds: float) -> None:
+    stats = _current_request_stats.get()
+    if stats is not None:
+        stats.password_hash_calls += 1
+        stats.password_hash_seconds += seconds
+
+
+class Histogram:
+    buckets: tuple[float, ...]
+    bucket_counts: list[int]
+    count: int
+    sum: float
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> Iterator[tuple[float, int]]:
+        total = 0
+        for bound, bucket_count in zip((*self.buckets, math.inf), self.bucket_counts):
+            total += bucket_count
+            yield bound, total
+
+
+class RequestMetrics:
+    """
+    Per-process registry of request metrics, rendered in the Prometheus text exposition format.
+
+    Everything is updated from the event loop only, so no locking is needed.
+    """
+    request_durations: dict[LabelValues, Histogram]
+    db_queries: dict[LabelValues, Histogram]
+    db_seconds: dict[LabelValues, float]
+    db_connection_wait_seconds: dict[LabelValues, float]
+    password_hash_seconds: dict[LabelValues, Histogram]
+
+    def __init__(self):
+        self.request_durations = {}
+        self.db_queries = {}
+        self.db_seconds = {}
+        self.db_connection_wait_seconds = {}
+        self.password_hash_seconds = {}
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float,
+                        stats: RequestStats) -> None:
+        duration_labels = (method, route, str(status_code))
+        if duration_labels not in self.request_durations:
+            self.request_durations[duration_labels] = Histogram(LATENCY_BUCKETS)
+        self.request_durations[duration_labels].observe(duration)
+
+        route_labels = (method, route)
+        if route_labels not in self.db_queries:
+            self.db_queries[route_labels] = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_queries[route_labels].observe(stats.db_queries)
+        self.db_seconds[route_labels] = self.db_seconds.get(route_labels, 0.0) + stats.db_seconds
+        self.db_connection_wait_seconds[route_labels] = (self.db_connection_wait_seconds.get(route_labels, 0.0)
+                                                         + stats.db_connection_wait_seconds)
+        if stats.password_hash_calls:
+            if route_labels not in self.password_hash_seconds:
+                self.password_hash_seconds[route_labels] = Histogram(LATENCY_BUCKETS)
+            self.password_hash_seconds[route_labels].observe(stats.password_hash_seconds)
+
+    def render(self) -> str:
+        route_label_names = ("method", "route")
+        lines = []
+        _render_histograms(lines, "http_request_duration_seconds", "HTTP request latency by route.",
+                           ("method", "route", "status"), self.request_durations)
+        _render_histograms(lines, "db_queries_per_request", "Database queries executed per request.",
+                           route_label_names, self.db_queries)
+        _render_counters(lines, "db_query_seconds_total", "Time spent executing database queries.",
+                         route_label_names, self.db_seconds)
+        _render_counters(lines, "db_connection_wait_seconds_total", "Time spent waiting for a pooled connection.",
+                         route_label_names, self.db_connection_wait_seconds)
+        _render_histograms(lines, "password_hash_seconds", "Time a request spent hashing or checking passwords.",
+                           route_label_names, self.password_hash_seconds)
+        return "\n".join(lines) + "\n"
+
+
+def _render_histograms(lines: list[str], name: str, help_text: str, label_names: tuple[str, ...],
+                       histograms: dict[LabelValues, Histogram]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label_values, histogram in histograms.items():
+        labels = _format_labels(label_names, label_values)
+        for bound, total in histogram.cumulative_counts():
+            bucket_labels = _format_labels((*label_names, "le"), (*label_values, _format_value(bound)))
+            lines.append(f"{name}_bucket{bucket_labels} {total}")
+        lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _render_counters(lines: list[str], name: str, help_text: str, label_names: tuple[str, ...],
+                     counters: dict[LabelValues, float]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for label_values, value in counters.items():
+        lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: LabelValues) -> str:
+    pairs = (f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, label_values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
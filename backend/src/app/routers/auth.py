@@ -1,25 +1,46 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 
-from app.dependencies import get_user_service, get_user
-from app.schemas.user import UserAuth, UserResponse, User
-from app.services.exceptions import RegistrationError
+from app.dependencies import (get_user_service, get_user, get_current_user, get_token_manager, limit_registration_rate,
+                              make_overloaded_exception)
+from app.schemas.token import TokenResponse
+from app.schemas.user import UserAuth, UserResponse, User, UserIdentity
+from app.services.exceptions import OverloadedError, RegistrationError
 from app.services.users import UserService
+from app.services.utils.token_manager import TokenManager
+
+from .etags import is_etag_matching, make_not_modified_response, make_weak_etag
+from .json_responses import dump_user, make_json_response
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/register")
+@router.post("/register", response_model=UserResponse, dependencies=[Depends(limit_registration_rate)],
+             responses={429: {"description": "Too many registrations from this client"},
+                        503: {"description": "Too many password operations are queued"}})
 async def register_user(user_to_register: UserAuth,
-                        user_service: Annotated[UserService, Depends(get_user_service)]) -> UserResponse:
+                        user_service: Annotated[UserService, Depends(get_user_service)]) -> Response:
     try:
         registered_user = await user_service.register_and_get_user(user_to_register)
-        return UserResponse.from_user(registered_user)
+        return make_json_response(dump_user(registered_user))
     except RegistrationError:
         raise HTTPException(422, detail="Username already taken")
+    except OverloadedError as error:
+        raise make_overloaded_exception(error)
+
+
+@router.post("/token")
+async def issue_token(user: Annotated[User, Depends(get_user)],
+                      token_manager: Annotated[TokenManager, Depends(get_token_manager)]) -> TokenResponse:
+    return TokenResponse(access_token=token_manager.issue_token(user), expires_in=token_manager.ttl_seconds)
 
 
-@router.get("/get-user-info")
-async def get_user_info(user: Annotated[User, Depends(get_user)]) -> UserResponse:
-    return UserResponse.from_user(user)
+@router.get("/get-user-info", response_model=UserResponse,
+            responses={304: {"description": "The user info has not changed since the given ETag"}})
+async def get_user_info(user: Annotated[UserIdentity, Depends(get_current_user)],
+                        if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    etag = make_weak_etag("user", user.id, user.username)
+    if is_etag_matching(if_none_match, etag):
+        return make_not_modified_response(etag)
+    return make_json_response(dump_user(user), headers={"ETag": etag})
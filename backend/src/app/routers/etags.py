@@ -0,0 +1,24 @@
+import hashlib
+
+from fastapi import Response
+
+
+def make_weak_etag(*parts: object) -> str:
+    digest = hashlib.sha256(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def is_etag_matching(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of the ETag against the If-None-Match header, as required for conditional GET.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque_tag for candidate in if_none_match.split(","))
+
+
+def make_not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
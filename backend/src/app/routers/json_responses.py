@@ -0,0 +1,45 @@
+from typing import Any
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.schemas.task import Task, TaskPage, TaskRecord, TaskResponse
+from app.schemas.user import UserIdentity, UserResponse
+
+# Domain objects come from the services already validated, so they are serialized to bytes directly,
+# in one pass, restricted to the fields of the response model that documents the route.
+# This skips building the response model and FastAPI's validation and re-encoding of it.
+TASK_RESPONSE_FIELDS = set(TaskResponse.model_fields)
+USER_RESPONSE_FIELDS = set(UserResponse.model_fields)
+
+_task_adapter = TypeAdapter(Task)
+_tasks_adapter = TypeAdapter(list[Task])
+_task_page_adapter = TypeAdapter(TaskPage)
+_user_adapter = TypeAdapter(UserIdentity)
+_task_record_adapter = TypeAdapter(TaskRecord)
+
+
+def dump_task(task: Task) -> bytes:
+    return _task_adapter.dump_json(task, include=TASK_RESPONSE_FIELDS)
+
+
+def dump_tasks(tasks: list[Task]) -> bytes:
+    return _tasks_adapter.dump_json(tasks, include={"__all__": TASK_RESPONSE_FIELDS})
+
+
+def dump_task_page(task_page: TaskPage) -> bytes:
+    return _task_page_adapter.dump_json(task_page,
+                                        include={"tasks": {"__all__": TASK_RESPONSE_FIELDS}, "next_cursor": True})
+
+
+def dump_task_record(record: TaskRecord) -> bytes:
+    # A record holds exactly the fields of TaskResponse
+    return _task_record_adapter.dump_json(record)
+
+
+def dump_user(user: UserIdentity) -> bytes:
+    return _user_adapter.dump_json(user, include=USER_RESPONSE_FIELDS)
+
+
+def make_json_response(content: bytes, status_code: int = 200, headers: dict[str, Any] | None = None) -> Response:
+    return Response(content, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,70 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.container import Container
+from app.dependencies import get_container, get_request_metrics
+from app.repositories.sqlalchemy_db.engine import get_pool_stats
+from app.request_metrics import RequestMetrics
+from app.schemas.metrics import (AdmissionStats, DbPoolStats, PasswordHashStats, ReplicaRouterStats, TaskCacheStats,
+                                 UsernameFilterStats)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+async def get_request_metrics_text(request_metrics: Annotated[RequestMetrics, Depends(get_request_metrics)]):
+    return PlainTextResponse(request_metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats(container: Annotated[Container, Depends(get_container)]) -> DbPoolStats:
+    pool_stats = get_pool_stats(container.engine) if container.engine is not None else None
+    if pool_stats is None:
+        raise HTTPException(404, detail="The connection pool does not report metrics")
+    return pool_stats
+
+
+@router.get("/db-replicas")
+async def get_db_replica_stats(container: Annotated[Container, Depends(get_container)]) -> ReplicaRouterStats:
+    if container.replica_router is None or not container.replica_router.replicas:
+        raise HTTPException(404, detail="No read replicas are configured")
+    return container.replica_router.get_stats()
+
+
+@router.get("/task-cache")
+async def get_task_cache_stats(container: Annotated[Container, Depends(get_container)]) -> TaskCacheStats:
+    if container.task_cache is None:
+        raise HTTPException(404, detail="The task cache is disabled")
+    return container.task_cache.get_stats()
+
+
+@router.get("/password-hashes")
+async def get_password_hash_stats(container: Annotated[Container, Depends(get_container)]) -> PasswordHashStats:
+    current_cost = container.config.bcrypt_rounds
+    users_by_cost = await container.user_repo.count_users_by_password_hash_cost()
+    return PasswordHashStats(current_cost=current_cost,
+                             users_by_cost=users_by_cost,
+                             users_on_stale_cost=sum(count for cost, count in users_by_cost.items()
+                                                     if cost != current_cost))
+
+
+@router.get("/username-filter")
+async def get_username_filter_stats(container: Annotated[Container, Depends(get_container)]) -> UsernameFilterStats:
+    if container.username_filter is None:
+        raise HTTPException(404, detail="The username filter is disabled")
+    return container.username_filter.get_stats()
+
+
+@router.get("/admission")
+async def get_admission_stats(container: Annotated[Container, Depends(get_container)]) -> AdmissionStats:
+    register_rate_limiter = container.register_rate_limiter
+    basic_auth_rate_limiter = container.basic_auth_rate_limiter
+    return AdmissionStats(
+        password_manager=container.password_manager.get_stats(),
+        register_rate_limit=register_rate_limiter.get_stats() if register_rate_limiter is not None else None,
+        basic_auth_rate_limit=basic_auth_rate_limiter.get_stats() if basic_auth_rate_limiter is not None else None
+    )
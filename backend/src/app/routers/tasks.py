@@ -0,0 +1,144 @@
+from typing import Annotated, AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from app.dependencies import get_current_user, get_task_service
+from app.schemas.task import (Task, TaskCreate, TaskPageResponse, TaskResponse, TaskBatchCreate, TaskBatchIds,
+                              TaskBatchCompleteStatus, TaskBatchItemResult)
+from app.schemas.user import UserIdentity
+from app.services.exceptions import InvalidCursorError, TaskNotFoundError, UserNotFoundError
+from app.services.tasks import TaskService
+
+from .etags import is_etag_matching, make_not_modified_response, make_weak_etag
+from .json_responses import dump_task, dump_task_page, dump_task_record, dump_tasks, make_json_response
+
+router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+MAX_PAGE_SIZE = 100
+MAX_SEARCH_QUERY_LENGTH = 200
+# Export lines sent per body chunk, so that a large export is not one ASGI message per task
+EXPORT_CHUNK_LINES = 500
+
+
+async def get_user_task(task_id: str,
+                        user: Annotated[UserIdentity, Depends(get_current_user)],
+                        task_service: Annotated[TaskService, Depends(get_task_service)]) -> Task:
+    try:
+        return await task_service.get_user_task(user, task_id)
+    except TaskNotFoundError:
+        raise HTTPException(404, detail="Task not found")
+
+
+@router.get("", response_model=TaskPageResponse,
+            responses={304: {"description": "The task list has not changed since the given ETag"}})
+async def get_tasks(user: Annotated[UserIdentity, Depends(get_current_user)],
+                    task_service: Annotated[TaskService, Depends(get_task_service)],
+                    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 50,
+                    cursor: str | None = None,
+                    is_completed: bool | None = None,
+                    if_none_match: Annotated[str | None, Header()] = None) -> Response:
+    # Checked before the ETag, so a malformed cursor is answered with 400 rather than 304
+    if cursor is not None:
+        try:
+            task_service.validate_cursor(cursor)
+        except InvalidCursorError:
+            raise HTTPException(400, detail="Invalid cursor")
+    tasks_version = await task_service.get_user_tasks_version(user)
+    etag = make_weak_etag("tasks", user.id, tasks_version)
+    if is_etag_matching(if_none_match, etag):
+        return make_not_modified_response(etag)
+    task_page = await task_service.get_user_tasks(user, limit, cursor, is_completed)
+    # The ETag sent with the body is built from the version the page was read at, so a body
+    # is never labeled with a newer version than its own (which would answer 304 to it from then on)
+    etag = make_weak_etag("tasks", user.id, task_page.tasks_version)
+    return make_json_response(dump_task_page(task_page), headers={"ETag": etag})
+
+
+@router.get("/search", response_model=TaskPageResponse)
+async def search_tasks(user: Annotated[UserIdentity, Depends(get_current_user)],
+                       task_service: Annotated[TaskService, Depends(get_task_service)],
+                       q: Annotated[str, Query(min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH)],
+                       limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 50,
+                       cursor: str | None = None) -> Response:
+    try:
+        task_page = await task_service.search_user_tasks(user, q, limit, cursor)
+    except InvalidCursorError:
+        raise HTTPException(400, detail="Invalid cursor")
+    return make_json_response(dump_task_page(task_page))
+
+
+@router.get("/export", response_class=StreamingResponse,
+            responses={200: {"content": {"application/x-ndjson": {}},
+                             "description": "One TaskResponse JSON object per line"}})
+async def export_tasks(user: Annotated[UserIdentity, Depends(get_current_user)],
+                       task_service: Annotated[TaskService, Depends(get_task_service)]) -> StreamingResponse:
+    async def generate_lines() -> AsyncIterator[bytes]:
+        lines = []
+        async for record in task_service.export_user_tasks(user):
+            lines.append(dump_task_record(record))
+            if len(lines) == EXPORT_CHUNK_LINES:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+
+@router.post("", response_model=TaskResponse)
+async def add_task(task_to_add: TaskCreate,
+                   user: Annotated[UserIdentity, Depends(get_current_user)],
+                   task_service: Annotated[TaskService, Depends(get_task_service)]) -> Response:
+    try:
+        added_task = await task_service.add_task(Task(content=task_to_add.content, owner_id=user.id))
+        return make_json_response(dump_task(added_task))
+    except UserNotFoundError:
+        raise HTTPException(401)
+
+
+@router.post("/batch", response_model=list[TaskResponse])
+async def add_tasks(tasks_to_add: TaskBatchCreate,
+                    user: Annotated[UserIdentity, Depends(get_current_user)],
+                    task_service: Annotated[TaskService, Depends(get_task_service)]) -> Response:
+    try:
+        added_tasks = await task_service.add_tasks([Task(content=task.content, owner_id=user.id)
+                                                    for task in tasks_to_add.tasks])
+        return make_json_response(dump_tasks(added_tasks))
+    except UserNotFoundError:
+        raise HTTPException(401)
+
+
+@router.post("/batch-change-complete-status")
+async def set_complete_status(batch: TaskBatchCompleteStatus,
+                              user: Annotated[UserIdentity, Depends(get_current_user)],
+                              task_service: Annotated[TaskService, Depends(get_task_service)]
+                              ) -> list[TaskBatchItemResult]:
+    return await task_service.set_complete_status(user, batch.ids, batch.is_completed)
+
+
+@router.post("/batch-delete")
+async def delete_tasks(batch: TaskBatchIds,
+                       user: Annotated[UserIdentity, Depends(get_current_user)],
+                       task_service: Annotated[TaskService, Depends(get_task_service)]) -> list[TaskBatchItemResult]:
+    return await task_service.delete_tasks(user, batch.ids)
+
+
+@router.patch("/{task_id}/change-complete-status", response_model=TaskResponse)
+async def change_complete_status(task: Annotated[Task, Depends(get_user_task)],
+                                 task_service: Annotated[TaskService, Depends(get_task_service)]) -> Response:
+    try:
+        updated_task = await task_service.change_complete_status(task)
+        return make_json_response(dump_task(updated_task))
+    except TaskNotFoundError:
+        raise HTTPException(404, detail="Task not found")
+
+
+@router.delete("/{task_id}", status_code=204)
+async def delete_task(task: Annotated[Task, Depends(get_user_task)],
+                      task_service: Annotated[TaskService, Depends(get_task_service)]) -> Response:
+    try:
+        await task_service.delete_task(task)
+        return Response(status_code=204)
+    except TaskNotFoundError:
+        raise HTTPException(404, detail="Task not found")
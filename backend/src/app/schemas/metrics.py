@@ -0,0 +1,78 @@
+from pydantic import BaseModel
+
+
+class DbPoolStats(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    timeouts: int
+    total_checkout_wait_seconds: float
+    max_checkout_wait_seconds: float
+
+
+class TaskCacheStats(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+
+class PasswordHashStats(BaseModel):
+    current_cost: int
+    users_by_cost: dict[int, int]
+    users_on_stale_cost: int
+
+
+class UsernameFilterStats(BaseModel):
+    capacity: int
+    size_bits: int
+    hash_count: int
+    items: int
+    negatives: int
+    positives: int
+    false_positives: int
+    expected_false_positive_rate: float
+
+
+class PasswordManagerPoolStats(BaseModel):
+    max_concurrency: int
+    max_queue: int | None
+    in_flight: int
+    queued: int
+    max_queued: int
+    admitted: int
+    completed: int
+    shed: int
+
+
+class RateLimiterStats(BaseModel):
+    rate_per_second: float
+    burst: int
+    clients: int
+    admitted: int
+    limited: int
+
+
+class AdmissionStats(BaseModel):
+    password_manager: PasswordManagerPoolStats
+    register_rate_limit: RateLimiterStats | None
+    basic_auth_rate_limit: RateLimiterStats | None
+
+
+class ReplicaStats(BaseModel):
+    name: str
+    healthy: bool
+    reads: int
+    failed_checks: int
+
+
+class ReplicaRouterStats(BaseModel):
+    primary_reads: int
+    pinned_reads: int
+    pinned_keys: int
+    replicas: list[ReplicaStats]
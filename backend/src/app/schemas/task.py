@@ -1,10 +1,18 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field
+
+
+TaskKey = tuple[bool, str]
+
+MAX_BATCH_SIZE = 500
 
 
 class Task(BaseModel):
-    id: str
+    id: str | None = None
     content: str
-    is_completed: bool
+    is_completed: bool = False
     owner_id: str
 
 
@@ -20,3 +28,58 @@ class TaskResponse(BaseModel):
             content=task.content,
             is_completed=task.is_completed
         )
+
+
+@dataclass(slots=True, frozen=True)
+class TaskRecord:
+    """
+    Compact read-only view of a task for bulk listings: the fields of TaskResponse and nothing else,
+    built without validation from rows the database already vouches for.
+    """
+    id: str
+    content: str
+    is_completed: bool
+
+    @classmethod
+    def from_task(cls, task: Task) -> "TaskRecord":
+        return cls(task.id, task.content, task.is_completed)
+
+
+class TaskCreate(BaseModel):
+    content: str
+
+
+class TaskPage(BaseModel):
+    tasks: list[Task]
+    next_cursor: str | None
+    # Version of the task list the tasks were read at, for listings that have one
+    tasks_version: int | None = None
+
+
+class TaskPageResponse(BaseModel):
+    tasks: list[TaskResponse]
+    next_cursor: str | None
+
+    @classmethod
+    def from_task_page(cls, task_page: TaskPage) -> "TaskPageResponse":
+        return cls(
+            tasks=[TaskResponse.from_task(task) for task in task_page.tasks],
+            next_cursor=task_page.next_cursor
+        )
+
+
+class TaskBatchCreate(BaseModel):
+    tasks: Annotated[list[TaskCreate], Field(min_length=1, max_length=MAX_BATCH_SIZE)]
+
+
+class TaskBatchIds(BaseModel):
+    ids: Annotated[list[str], Field(min_length=1, max_length=MAX_BATCH_SIZE)]
+
+
+class TaskBatchCompleteStatus(TaskBatchIds):
+    is_completed: bool = True
+
+
+class TaskBatchItemResult(BaseModel):
+    id: str
+    status: Literal["ok", "not_found"]
@@ -1,9 +1,12 @@
 from pydantic import BaseModel
 
 
-class User(BaseModel):
+class UserIdentity(BaseModel):
     id: str
     username: str
+
+
+class User(UserIdentity):
     password_hash: str
     
 
@@ -17,5 +20,5 @@ class UserResponse(BaseModel):
     username: str
     
     @classmethod
-    def from_user(cls, user: User) -> "UserResponse":
-        return UserResponse(id=user.id, username=user.username)
\ No newline at end of file
+    def from_user(cls, user: UserIdentity) -> "UserResponse":
+        return UserResponse(id=user.id, username=user.username)
@@ -0,0 +1,81 @@
+import logging
+import os
+import secrets
+from typing import Any
+
+import uvicorn
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+APP_FACTORY = "app.app:create_app"
+
+
+def get_worker_count(config: Config) -> int:
+    return config.server_workers or os.cpu_count() or 1
+
+
+def get_uvicorn_options(config: Config) -> dict[str, Any]:
+    return {
+        "factory": True,
+        "host": config.server_host,
+        "port": config.server_port,
+        "workers": get_worker_count(config),
+        "loop": config.server_loop,
+        "http": config.server_http,
+        "backlog": config.server_backlog,
+        "timeout_keep_alive": config.server_keep_alive_seconds,
+        "timeout_graceful_shutdown": config.server_graceful_shutdown_seconds,
+        "limit_concurrency": config.server_limit_concurrency,
+        "proxy_headers": True,
+        "forwarded_allow_ips": config.server_forwarded_allow_ips,
+    }
+
+
+def get_multi_worker_warnings(config: Config) -> list[str]:
+    warnings = []
+    if config.repository_backend == "memory":
+        warnings.append("REPOSITORY_BACKEND=memory keeps separate data in every worker")
+    if config.task_cache_backend != "none":
+        warnings.append(f"TASK_CACHE_BACKEND={config.task_cache_backend} is invalidated only within one worker, "
+                        "so it is turned off")
+    if config.db_replica_urls:
+        warnings.append("a user's reads stay on the primary after their writes only in the worker that made them, "
+                        "so requests served by other workers may read from a replica that has not caught up")
+    if config.username_filter_enabled:
+        warnings.append("the username filter learns about users registered by other workers only on reload, "
+                        "so it is turned off")
+    if config.register_rate_limit_per_second is not None or config.basic_auth_rate_limit_per_second is not None:
+        warnings.append("rate limits are counted per worker, so a client may get up to workers times the limit")
+    return warnings
+
+
+def get_multi_worker_environment(config: Config) -> dict[str, str]:
+    # Workers read their config from the environment they inherit
+    environment = {}
+    if config.task_cache_backend != "none":
+        # Both cache backends keep their entries and invalidations in the process ("shared" runs on
+        # SharedCacheClientLocal), so a write in one worker would leave stale pages in the others
+        environment["TASK_CACHE_BACKEND"] = "none"
+    if config.username_filter_enabled:
+        # The filter only knows the users registered in its own process until it reloads, so users
+        # registered by another worker would get 401 with correct credentials in the meantime
+        environment["USERNAME_FILTER_ENABLED"] = "false"
+    if "secret_key" not in config.model_fields_set:
+        # Tokens issued by one worker must validate in the others, so they need one shared key
+        # instead of a random one each
+        environment["SECRET_KEY"] = secrets.token_urlsafe(32)
+    return environment
+
+
+def run(config: Config) -> None:
+    workers = get_worker_count(config)
+    if workers > 1:
+        for warning in get_multi_worker_warnings(config):
+            logger.warning("With %d workers, %s", workers, warning)
+        environment = get_multi_worker_environment(config)
+        if "SECRET_KEY" in environment:
+            logger.warning("SECRET_KEY is not set; generated one shared by the workers until restart")
+        os.environ.update(environment)
+    uvicorn.run(APP_FACTORY, **get_uvicorn_options(config))
@@ -12,3 +12,19 @@ class UserNotFoundError(Exception):
 
 class TaskNotFoundError(Exception):
     pass
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class OverloadedError(Exception):
+    retry_after: float
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
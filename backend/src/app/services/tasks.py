@@ -1,7 +1,15 @@
+import base64
+import binascii
+import json
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
-from app.schemas.task import Task
-from app.schemas.user import User
+from app.repositories.exceptions import ConstraintViolationError, NotFoundError
+from app.repositories.tasks import TaskRepository
+from app.schemas.task import Task, TaskBatchItemResult, TaskKey, TaskPage, TaskRecord
+from app.schemas.user import UserIdentity
+
+from .exceptions import InvalidCursorError, TaskNotFoundError, UserNotFoundError
 
 
 class TaskService(ABC):
@@ -22,7 +30,7 @@ class TaskService(ABC):
         pass
 
     @abstractmethod
-    def change_complete_status(self, task: Task) -> None:
+    def change_complete_status(self, task: Task) -> Task:
         """
         Changes the given task`s complete status to opposite.
         Throws an exception when the task does not exist in repository.
@@ -32,21 +40,159 @@ class TaskService(ABC):
 
         Raises:
             TaskNotFoundError: When the task does not exist in the repository.
+
+        Returns:
+            Task: The updated Task object.
+        """
+        pass
+
+    @abstractmethod
+    def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        """
+        Adds all the given Task objects to the repository at once.
+
+        Args:
+            tasks (list[Task]): The Task objects to be added. Each object should contain a valid owner_id.
+
+        Raises:
+            UserNotFoundError: If an owner id specified in the tasks does not exist in the repository.
+                               No task is added in this case.
+
+        Returns:
+            list[Task]: The Task objects with the repository-generated IDs, in the same order.
+        """
+        pass
+
+    @abstractmethod
+    def set_complete_status(self, user: UserIdentity, task_ids: list[str],
+                            is_completed: bool) -> list[TaskBatchItemResult]:
+        """
+        Sets the complete status of the given user`s tasks at once.
+
+        Args:
+            user (UserIdentity)
+            task_ids (list[str]): IDs of the tasks to be updated.
+            is_completed (bool): The new complete status.
+
+        Returns:
+            list[TaskBatchItemResult]: A result for every given ID, in the same order;
+                                       tasks that do not exist or belong to another user are "not_found".
+        """
+        pass
+
+    @abstractmethod
+    def delete_tasks(self, user: UserIdentity, task_ids: list[str]) -> list[TaskBatchItemResult]:
+        """
+        Deletes the given user`s tasks at once.
+
+        Args:
+            user (UserIdentity)
+            task_ids (list[str]): IDs of the tasks to be deleted.
+
+        Returns:
+            list[TaskBatchItemResult]: A result for every given ID, in the same order;
+                                       tasks that do not exist or belong to another user are "not_found".
+        """
+        pass
+
+    @abstractmethod
+    def get_user_task(self, user: UserIdentity, task_id: str) -> Task:
+        """
+        Retrieves the task with the given ID if it belongs to the given user.
+
+        Args:
+            user (UserIdentity)
+            task_id (str): The task`s ID.
+
+        Raises:
+            TaskNotFoundError: If the task does not exist or belongs to another user.
+
+        Returns:
+            Task: The user`s task.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_tasks(self, user: UserIdentity, limit: int, cursor: str | None = None,
+                       is_completed: bool | None = None) -> TaskPage:
+        """
+        Retrieves a page of the tasks that belong to the given user, uncompleted tasks first.
+        Returns an empty page if the user does not exist in the repository.
+
+        Args:
+            user (UserIdentity)
+            limit (int): The maximum number of tasks on the page.
+            cursor (str | None): The next_cursor of the previous page, or None for the first page.
+            is_completed (bool | None): If given, only tasks with this complete status are returned.
+                                        Must be the same for all pages.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+
+        Returns:
+            TaskPage: The user`s tasks, an opaque cursor of the next page (None on the last page)
+                      and the version of the task list the tasks were read at.
+        """
+
+    @abstractmethod
+    def search_user_tasks(self, user: UserIdentity, query: str, limit: int, cursor: str | None = None) -> TaskPage:
+        """
+        Retrieves a page of the given user`s tasks whose content contains every word of the query,
+        best matches first.
+
+        Args:
+            user (UserIdentity)
+            query (str): Free text to search for.
+            limit (int): The maximum number of tasks on the page.
+            cursor (str | None): The next_cursor of the previous page, or None for the first page.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+
+        Returns:
+            TaskPage: The matching tasks and an opaque cursor of the next page (None on the last page).
+        """
+        pass
+
+    @abstractmethod
+    def validate_cursor(self, cursor: str) -> None:
+        """
+        Checks a cursor of get_user_tasks without reading any tasks.
+
+        Args:
+            cursor (str): The next_cursor of a previous page.
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_tasks_version(self, user: UserIdentity) -> int:
+        """
+        Returns the version of the user`s task list, which changes whenever any of the user`s tasks changes.
+
+        Args:
+            user (UserIdentity)
+
+        Returns:
+            int: The current version.
         """
         pass
 
     @abstractmethod
-    def get_user_tasks(self, user: User) -> list[Task]:
+    def export_user_tasks(self, user: UserIdentity) -> AsyncIterator[TaskRecord]:
         """
-        Retrieves all the tasks that belong to the given user.
-        Returns an empty list if the user does not exist in the repository.
+        Yields all the tasks that belong to the given user as they are read from the repository,
+        so that any number of tasks can be exported in constant memory.
 
         Args:
-            user (User)
+            user (UserIdentity)
 
         Returns:
-            list[Task]: The user`s tasks.
+            AsyncIterator[TaskRecord]: The user`s tasks.
         """
+        pass
 
     @abstractmethod
     def delete_task(self, task: Task) -> None:
@@ -60,3 +206,120 @@ class TaskService(ABC):
            TaskNotFoundError: If the task with the given ID does not exist in the repository.
        """
         pass
+
+
+class TaskServiceImpl(TaskService):
+    task_repo: TaskRepository
+
+    def __init__(self, task_repo: TaskRepository):
+        self.task_repo = task_repo
+
+    async def add_task(self, task: Task) -> Task:
+        try:
+            return await self.task_repo.add_task(task)
+        except ConstraintViolationError:
+            raise UserNotFoundError
+
+    async def change_complete_status(self, task: Task) -> Task:
+        updated_task = task.model_copy(update={"is_completed": not task.is_completed})
+        try:
+            await self.task_repo.update_task(updated_task)
+        except NotFoundError:
+            raise TaskNotFoundError
+        return updated_task
+
+    async def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        try:
+            return await self.task_repo.add_tasks(tasks)
+        except ConstraintViolationError:
+            raise UserNotFoundError
+
+    async def set_complete_status(self, user: UserIdentity, task_ids: list[str],
+                                  is_completed: bool) -> list[TaskBatchItemResult]:
+        unique_task_ids = list(dict.fromkeys(task_ids))
+        updated_ids = await self.task_repo.set_tasks_complete_status(user.id, unique_task_ids, is_completed)
+        return _make_batch_results(task_ids, set(updated_ids))
+
+    async def delete_tasks(self, user: UserIdentity, task_ids: list[str]) -> list[TaskBatchItemResult]:
+        unique_task_ids = list(dict.fromkeys(task_ids))
+        deleted_ids = await self.task_repo.delete_tasks_by_ids(user.id, unique_task_ids)
+        return _make_batch_results(task_ids, set(deleted_ids))
+
+    async def get_user_task(self, user: UserIdentity, task_id: str) -> Task:
+        try:
+            task = await self.task_repo.get_task_by_id(task_id)
+        except NotFoundError:
+            raise TaskNotFoundError
+        if task.owner_id != user.id:
+            raise TaskNotFoundError
+        return task
+
+    async def get_user_tasks(self, user: UserIdentity, limit: int, cursor: str | None = None,
+                             is_completed: bool | None = None) -> TaskPage:
+        after = _decode_cursor(cursor) if cursor is not None else None
+        tasks_version, tasks = await self.task_repo.get_versioned_tasks_by_owner_id(
+            user.id, is_completed=is_completed, after=after, limit=limit + 1
+        )
+        if len(tasks) <= limit:
+            return TaskPage(tasks=tasks, next_cursor=None, tasks_version=tasks_version)
+        tasks = tasks[:limit]
+        return TaskPage(tasks=tasks, next_cursor=_encode_cursor((tasks[-1].is_completed, tasks[-1].id)),
+                        tasks_version=tasks_version)
+
+    async def search_user_tasks(self, user: UserIdentity, query: str, limit: int,
+                                cursor: str | None = None) -> TaskPage:
+        # Results are ordered by rank, which has no stable key to seek from, so the cursor holds an offset
+        offset = _decode_offset_cursor(cursor) if cursor is not None else 0
+        tasks = await self.task_repo.search_tasks_by_owner_id(user.id, query, offset=offset, limit=limit + 1)
+        if len(tasks) <= limit:
+            return TaskPage(tasks=tasks, next_cursor=None)
+        return TaskPage(tasks=tasks[:limit], next_cursor=_encode_offset_cursor(offset + limit))
+
+    def validate_cursor(self, cursor: str) -> None:
+        _decode_cursor(cursor)
+
+    async def get_user_tasks_version(self, user: UserIdentity) -> int:
+        return await self.task_repo.get_tasks_version(user.id)
+
+    async def export_user_tasks(self, user: UserIdentity) -> AsyncIterator[TaskRecord]:
+        async for record in self.task_repo.stream_tasks_by_owner_id(user.id):
+            yield record
+
+    async def delete_task(self, task: Task) -> None:
+        try:
+            await self.task_repo.delete_task_by_id(task.id)
+        except NotFoundError:
+            raise TaskNotFoundError
+
+
+def _make_batch_results(task_ids: list[str], found_ids: set[str]) -> list[TaskBatchItemResult]:
+    return [TaskBatchItemResult(id=task_id, status="ok" if task_id in found_ids else "not_found")
+            for task_id in task_ids]
+
+
+def _encode_cursor(key: TaskKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> TaskKey:
+    try:
+        is_completed, task_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError
+    if not isinstance(is_completed, bool) or not isinstance(task_id, str):
+        raise InvalidCursorError
+    return is_completed, task_id
+
+
+def _encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset}).encode("utf-8")).decode("ascii")
+
+
+def _decode_offset_cursor(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor))["offset"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursorError
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise InvalidCursorError
+    return offset
@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
-from uuid import uuid4
 
 from app.repositories.users import UserRepository
 from app.repositories.exceptions import ConstraintViolationError, NotFoundError
 from app.schemas.user import User, UserAuth
 
-from .utils.password_manager import PasswordManager
+from .utils.credential_cache import CredentialCache
+from .utils.password_manager import AsyncPasswordManager
+from .utils.username_filter import UsernameFilter
 from .exceptions import AuthenticationError, RegistrationError
 
 
@@ -47,14 +48,33 @@ class UserService(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_recently_authenticated_user(self, user: UserAuth) -> User | None:
+        """
+        Returns the user if the same credentials were authenticated recently enough to be
+        accepted without a password check, otherwise None.
+
+        Args:
+            user (UserAuth): An object representing the user's credentials.
+
+        Returns:
+            User | None: The user object the credentials were last verified against, or None.
+        """
+        pass
+
 
 class UserServiceImpl(UserService):
     user_repo: UserRepository
-    password_manager: PasswordManager
+    password_manager: AsyncPasswordManager
+    credential_cache: CredentialCache | None
+    username_filter: UsernameFilter | None
 
-    def __init__(self, user_repo: UserRepository, password_manager: PasswordManager):
+    def __init__(self, user_repo: UserRepository, password_manager: AsyncPasswordManager,
+                 credential_cache: CredentialCache | None = None, username_filter: UsernameFilter | None = None):
         self.user_repo = user_repo
         self.password_manager = password_manager
+        self.credential_cache = credential_cache
+        self.username_filter = username_filter
 
     async def register_and_get_user(self, user: UserAuth) -> User:
         try:
@@ -63,42 +83,64 @@ class UserServiceImpl(UserService):
             raise RegistrationError
     
     async def _try_to_register_and_get_user(self, user: UserAuth) -> User:
-        user.password = self.password_manager.generate_password_hash(user.password)
+        if await self._is_username_taken(user.username):
+            raise RegistrationError
+        user.password = await self.password_manager.generate_password_hash(user.password)
         registered_user = await self.user_repo.add_user(user)
+        if self.username_filter is not None:
+            self.username_filter.add(registered_user.username)
         return registered_user
 
+    async def _is_username_taken(self, username: str) -> bool:
+        # Checked before hashing so that duplicate registrations do not cost a bcrypt hash;
+        # the unique constraint still decides races between concurrent registrations.
+        if self.username_filter is None or not self.username_filter.might_contain(username):
+            return False
+        try:
+            await self.user_repo.get_user_by_username(username)
+            return True
+        except NotFoundError:
+            self.username_filter.record_false_positive()
+            return False
+
     async def authenticate_and_get_user(self, user: UserAuth) -> User:
         try:
             return await self._try_to_authenticate_and_get_user(user)
         except NotFoundError:
             raise AuthenticationError
     
+    def get_recently_authenticated_user(self, user: UserAuth) -> User | None:
+        if self.credential_cache is None:
+            return None
+        return self.credential_cache.get(user)
+
     async def _try_to_authenticate_and_get_user(self, user: UserAuth) -> User:
-        user_from_repo = await self.user_repo.get_user_by_username(user.username)
-        if not self.password_manager.is_password_matching_hash(
+        if self.credential_cache is not None:
+            cached_user = self.credential_cache.get(user)
+            if cached_user is not None:
+                return cached_user
+        if self.username_filter is not None and not self.username_filter.might_contain(user.username):
+            raise AuthenticationError
+        try:
+            user_from_repo = await self.user_repo.get_user_by_username(user.username)
+        except NotFoundError:
+            if self.username_filter is not None:
+                self.username_filter.record_false_positive()
+            raise
+        if not await self.password_manager.is_password_matching_hash(
             user.password, user_from_repo.password_hash
         ):
             raise AuthenticationError
+        if self.password_manager.needs_rehash(user_from_repo.password_hash):
+            user_from_repo = await self._rehash_password(user, user_from_repo)
+        if self.credential_cache is not None:
+            self.credential_cache.put(user, user_from_repo)
         return user_from_repo
 
-
-# TODO: Move UserServiceMock to tests after making an API
-class UserServiceMock(UserService):
-    repo: list[User] = []
-    
-    def register_and_get_user(self, user: UserAuth) -> User:
-        if user.username in [u.username for u in UserServiceMock.repo]:
-            raise RegistrationError
-        user.password += "hashed"
-        reg_user = User(id=str(uuid4()), username=user.username, password_hash=user.password)
-        UserServiceMock.repo.append(reg_user)
-        return reg_user
-    
-    def authenticate_and_get_user(self, user: UserAuth) -> User:
-        if user.username not in [u.username for u in UserServiceMock.repo]:
-            raise AuthenticationError
-        user_from_repo = list(filter(lambda u: u.username == user.username, UserServiceMock.repo)).pop()
-        if user_from_repo.password_hash != user.password + "hashed":
-            raise AuthenticationError
-        return user_from_repo
-        
+    async def _rehash_password(self, user: UserAuth, user_from_repo: User) -> User:
+        # The raw password is only known right after a successful check,
+        # so this is the one place a hash with an outdated work factor can be upgraded.
+        password_hash = await self.password_manager.generate_password_hash(user.password)
+        if self.credential_cache is not None:
+            self.credential_cache.invalidate_username(user.username)
+        return await self.user_repo.update_password_hash(user_from_repo.id, password_hash)
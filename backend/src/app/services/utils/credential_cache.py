@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.schemas.user import User, UserAuth
+
+
+class CredentialCache:
+    """
+    In-process LRU cache of recently verified credentials with a time-to-live.
+
+    Entries are keyed by an HMAC digest of the username and password, so the plaintext
+    password is never kept in memory. Every entry stores the password hash it was verified
+    against; all entries of a username are evicted when a different hash is seen for it.
+    """
+    max_size: int
+    ttl_seconds: float
+
+    def __init__(self, secret_key: bytes, max_size: int, ttl_seconds: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._secret_key = secret_key
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[User, float]] = OrderedDict()
+        self._keys_by_username: dict[str, set[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user: UserAuth) -> User | None:
+        key = self._make_key(user)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        cached_user, expires_at = entry
+        if expires_at <= self._clock():
+            self._remove(key, cached_user.username)
+            return None
+        self._entries.move_to_end(key)
+        return cached_user
+
+    def put(self, user: UserAuth, verified_user: User) -> None:
+        keys = self._keys_by_username.get(verified_user.username, set())
+        if any(self._entries[k][0].password_hash != verified_user.password_hash for k in keys):
+            self.invalidate_username(verified_user.username)
+        key = self._make_key(user)
+        self._entries[key] = (verified_user, self._clock() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        self._keys_by_username.setdefault(verified_user.username, set()).add(key)
+        while len(self._entries) > self.max_size:
+            evicted_key, (evicted_user, _) = self._entries.popitem(last=False)
+            self._discard_key(evicted_key, evicted_user.username)
+
+    def invalidate_username(self, username: str) -> None:
+        for key in self._keys_by_username.pop(username, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_username.clear()
+
+    def _make_key(self, user: UserAuth) -> bytes:
+        message = f"{len(user.username)}:{user.username}{user.password}".encode("utf-8")
+        return hmac.new(self._secret_key, message, hashlib.sha256).digest()
+
+    def _remove(self, key: bytes, username: str) -> None:
+        self._entries.pop(key, None)
+        self._discard_key(key, username)
+
+    def _discard_key(self, key: bytes, username: str) -> None:
+        keys = self._keys_by_username.get(username)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_username[username]
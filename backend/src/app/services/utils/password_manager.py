@@ -1,7 +1,21 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal, TypeVar
 
 import bcrypt
 
+from app.request_metrics import record_password_hash
+from app.schemas.metrics import PasswordManagerPoolStats
+from app.services.exceptions import OverloadedError
+
+
+T = TypeVar("T")
+
+# Weight of the latest operation in the moving average used to estimate queue drain time
+AVERAGE_SMOOTHING = 0.2
+
 
 class PasswordManager(ABC):
     @abstractmethod
@@ -12,8 +26,39 @@ class PasswordManager(ABC):
     def generate_password_hash(self, raw_password: str) -> str:
         pass
 
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        pass
+
+
+class AsyncPasswordManager(ABC):
+    @abstractmethod
+    async def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def generate_password_hash(self, raw_password: str) -> str:
+        pass
+
+    @abstractmethod
+    def needs_rehash(self, password_hash: str) -> bool:
+        pass
+
+
+def get_bcrypt_cost(password_hash: str) -> int | None:
+    """Reads the work factor from a "$2b$12$..." bcrypt hash, or returns None for anything else."""
+    parts = password_hash.split("$", 3)
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
 
 class PasswordManagerBcrypt(PasswordManager):
+    rounds: int
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
     def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
         raw_password_bytes = raw_password.encode("utf-8")
         password_hash_bytes = password_hash.encode("utf-8")
@@ -21,6 +66,100 @@ class PasswordManagerBcrypt(PasswordManager):
 
     def generate_password_hash(self, raw_password: str) -> str:
         raw_password_bytes = raw_password.encode("utf-8")
-        salt = bcrypt.gensalt()
+        salt = bcrypt.gensalt(self.rounds)
         password_hash = bcrypt.hashpw(raw_password_bytes, salt)
         return password_hash.decode("utf-8")
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return get_bcrypt_cost(password_hash) != self.rounds
+
+
+class PasswordManagerPool(AsyncPasswordManager):
+    """
+    Runs a blocking PasswordManager in an executor so that hashing never blocks the event loop.
+
+    At most max_concurrency operations are submitted to the executor at once;
+    the rest wait in a queue whose depth is reported by get_stats(). Once max_queue operations
+    are waiting, further ones are shed with OverloadedError instead of queueing behind them;
+    its retry_after estimates how long the current queue takes to drain.
+    """
+    password_manager: PasswordManager
+    executor: Executor
+    max_concurrency: int
+    max_queue: int | None
+
+    def __init__(self, password_manager: PasswordManager, executor: Executor, max_concurrency: int,
+                 max_queue: int | None = None):
+        self.password_manager = password_manager
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._queued = 0
+        self._max_queued = 0
+        self._admitted = 0
+        self._completed = 0
+        self._shed = 0
+        self._average_seconds = 0.0
+
+    async def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
+        return await self._run(self.password_manager.is_password_matching_hash, raw_password, password_hash)
+
+    async def generate_password_hash(self, raw_password: str) -> str:
+        return await self._run(self.password_manager.generate_password_hash, raw_password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return self.password_manager.needs_rehash(password_hash)
+
+    def get_stats(self) -> PasswordManagerPoolStats:
+        return PasswordManagerPoolStats(max_concurrency=self.max_concurrency,
+                                        max_queue=self.max_queue,
+                                        in_flight=self._in_flight,
+                                        queued=self._queued,
+                                        max_queued=self._max_queued,
+                                        admitted=self._admitted,
+                                        completed=self._completed,
+                                        shed=self._shed)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self.max_queue is not None and self._semaphore.locked() and self._queued >= self.max_queue:
+            self._shed += 1
+            raise OverloadedError(retry_after=self._estimate_queue_drain_seconds())
+        self._admitted += 1
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            record_password_hash(elapsed)
+            self._average_seconds += (elapsed - self._average_seconds) * AVERAGE_SMOOTHING
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
+
+    def _estimate_queue_drain_seconds(self) -> float:
+        return (self._queued + self._in_flight) * self._average_seconds / self.max_concurrency
+
+
+def create_password_manager_pool(password_manager: PasswordManager,
+                                 executor_type: Literal["thread", "process"],
+                                 workers: int,
+                                 max_concurrency: int,
+                                 max_queue: int | None = None) -> PasswordManagerPool:
+    if executor_type == "process":
+        executor = ProcessPoolExecutor(max_workers=workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-manager")
+    return PasswordManagerPool(password_manager, executor, max_concurrency, max_queue)
@@ -0,0 +1,54 @@
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.schemas.metrics import RateLimiterStats
+
+
+class RateLimiter:
+    """
+    Per-client token buckets: each client may spend burst requests at once and then
+    rate_per_second on average.
+
+    acquire() answers immediately, so a limited client costs nothing but a dictionary lookup.
+    Only the max_clients most recently seen clients are tracked; a forgotten client starts
+    again with a full bucket, which is what an idle client would have had anyway.
+    """
+    rate_per_second: float
+    burst: int
+    max_clients: int
+
+    def __init__(self, rate_per_second: float, burst: int, max_clients: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+        self._clock = clock
+        # client key -> (tokens left, time they were counted)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._admitted = 0
+        self._limited = 0
+
+    def acquire(self, key: str) -> float:
+        """Takes a token for the client; returns 0 if it got one, otherwise the seconds until it will."""
+        now = self._clock()
+        tokens, counted_at = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - counted_at) * self.rate_per_second)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+            self._admitted += 1
+        else:
+            wait = (1 - tokens) / self.rate_per_second
+            self._limited += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def get_stats(self) -> RateLimiterStats:
+        return RateLimiterStats(rate_per_second=self.rate_per_second,
+                                burst=self.burst,
+                                clients=len(self._buckets),
+                                admitted=self._admitted,
+                                limited=self._limited)
@@ -0,0 +1,90 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from app.schemas.user import UserIdentity
+from app.services.exceptions import InvalidTokenError
+
+
+class TokenManager(ABC):
+    ttl_seconds: int
+
+    @abstractmethod
+    def issue_token(self, user: UserIdentity) -> str:
+        """
+        Issues a signed token that identifies the given user until it expires.
+
+        Args:
+            user (UserIdentity): The authenticated user.
+
+        Returns:
+            str: The token to be sent back in the "Authorization: Bearer" header.
+        """
+        pass
+
+    @abstractmethod
+    def validate_token(self, token: str) -> UserIdentity:
+        """
+        Checks the token`s signature and expiration time without touching any repository.
+
+        Args:
+            token (str): A token issued by issue_token.
+
+        Raises:
+            InvalidTokenError: If the token is malformed, has a wrong signature or is expired.
+
+        Returns:
+            UserIdentity: The identity of the user the token was issued to.
+        """
+        pass
+
+
+class TokenManagerHMAC(TokenManager):
+    """
+    Stateless tokens in the form "<base64url payload>.<base64url HMAC-SHA256 of the payload>".
+    """
+    def __init__(self, secret_key: bytes, ttl_seconds: int, clock: Callable[[], float] = time.time):
+        self.ttl_seconds = ttl_seconds
+        self._secret_key = secret_key
+        self._clock = clock
+
+    def issue_token(self, user: UserIdentity) -> str:
+        payload = {"sub": user.id, "name": user.username, "exp": int(self._clock()) + self.ttl_seconds}
+        payload_bytes = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encoded_payload = _b64encode(payload_bytes)
+        return f"{encoded_payload}.{_b64encode(self._sign(encoded_payload))}"
+
+    def validate_token(self, token: str) -> UserIdentity:
+        encoded_payload, _, encoded_signature = token.partition(".")
+        try:
+            signature = _b64decode(encoded_signature)
+            expected_signature = self._sign(encoded_payload)
+        except (binascii.Error, ValueError):
+            raise InvalidTokenError
+        if not hmac.compare_digest(signature, expected_signature):
+            raise InvalidTokenError
+        try:
+            payload = json.loads(_b64decode(encoded_payload))
+            user = UserIdentity(id=payload["sub"], username=payload["name"])
+            expires_at = int(payload["exp"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise InvalidTokenError
+        if expires_at <= self._clock():
+            raise InvalidTokenError
+        return user
+
+    def _sign(self, encoded_payload: str) -> bytes:
+        return hmac.new(self._secret_key, encoded_payload.encode("ascii"), hashlib.sha256).digest()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
@@ -0,0 +1,108 @@
+import hashlib
+import math
+from typing import AsyncIterator
+
+from app.schemas.metrics import UsernameFilterStats
+
+
+class UsernameFilter:
+    """
+    Bloom filter of existing usernames.
+
+    might_contain() never returns False for a username that was added, so a negative answer lets
+    a login be rejected without a database query. A positive answer only means "maybe": the caller
+    checks the repository and reports a miss with record_false_positive(). Until the first reload()
+    the filter knows nothing and answers "maybe" for every username.
+
+    The filter only knows the usernames it was loaded with and the ones registered through
+    this process, so it is reloaded periodically when several workers share a database.
+    It is sized for capacity usernames; beyond that the false-positive rate grows,
+    which get_stats() reports as expected_false_positive_rate.
+    """
+    capacity: int
+    false_positive_rate: float
+    size_bits: int
+    hash_count: int
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = max(capacity, 1)
+        self.false_positive_rate = false_positive_rate
+        self.size_bits = max(8, math.ceil(-self.capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+        self._items = 0
+        self._added_during_reload: list[str] | None = None
+        self._loaded = False
+        self._negatives = 0
+        self._positives = 0
+        self._false_positives = 0
+
+    def __len__(self) -> int:
+        return self._items
+
+    def add(self, username: str) -> None:
+        self._set_bits(self._bits, username)
+        self._items += 1
+        if self._added_during_reload is not None:
+            self._added_during_reload.append(username)
+
+    async def reload(self, usernames: AsyncIterator[str]) -> None:
+        """
+        Rebuilds the filter from the given usernames, e.g. streamed from the repository.
+        The old contents keep answering until the new ones are complete; usernames added
+        in the meantime are carried over, since the stream may have been read before they existed.
+        """
+        self._added_during_reload = []
+        try:
+            bits = bytearray(len(self._bits))
+            items = 0
+            async for username in usernames:
+                self._set_bits(bits, username)
+                items += 1
+            for username in self._added_during_reload:
+                self._set_bits(bits, username)
+                items += 1
+            self._bits = bits
+            self._items = items
+            self._loaded = True
+        finally:
+            self._added_during_reload = None
+
+    def might_contain(self, username: str) -> bool:
+        if not self._loaded:
+            return True
+        for index in self._get_indexes(username):
+            if not self._bits[index >> 3] & (1 << (index & 7)):
+                self._negatives += 1
+                return False
+        self._positives += 1
+        return True
+
+    def record_false_positive(self) -> None:
+        if self._loaded:
+            self._false_positives += 1
+
+    def get_stats(self) -> UsernameFilterStats:
+        return UsernameFilterStats(capacity=self.capacity,
+                                   size_bits=self.size_bits,
+                                   hash_count=self.hash_count,
+                                   items=self._items,
+                                   negatives=self._negatives,
+                                   positives=self._positives,
+                                   false_positives=self._false_positives,
+                                   expected_false_positive_rate=self._get_expected_false_positive_rate())
+
+    def _set_bits(self, bits: bytearray, username: str) -> None:
+        for index in self._get_indexes(username):
+            bits[index >> 3] |= 1 << (index & 7)
+
+    def _get_indexes(self, username: str) -> list[int]:
+        # Double hashing: k indexes derived from two independent 64-bit halves of one digest
+        digest = hashlib.blake2b(username.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size_bits for i in range(self.hash_count)]
+
+    def _get_expected_false_positive_rate(self) -> float:
+        return (1 - math.exp(-self.hash_count * self._items / self.size_bits)) ** self.hash_count
+
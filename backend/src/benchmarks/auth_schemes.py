@@ -0,0 +1,63 @@
+"""
+Compares the per-request cost of authenticating with HTTP Basic credentials
+(repository lookup + bcrypt, with and without the credential cache) and with a bearer token.
+
+Usage (from backend/src):
+    python -m benchmarks.auth_schemes [--iterations 200]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.users import UserRepositorySQLAlchemy
+from app.schemas.user import UserAuth
+from app.services.users import UserServiceImpl
+from app.services.utils.credential_cache import CredentialCache
+from app.services.utils.password_manager import PasswordManagerBcrypt, PasswordManagerPool
+from app.services.utils.token_manager import TokenManagerHMAC
+
+from .common import measure, measure_async, print_results
+
+
+async def main(iterations: int) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(), "auth_schemes.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    password_manager = PasswordManagerPool(PasswordManagerBcrypt(), ThreadPoolExecutor(1), max_concurrency=1)
+    user_repo = UserRepositorySQLAlchemy(async_sessionmaker(engine, expire_on_commit=False))
+    uncached_service = UserServiceImpl(user_repo, password_manager)
+    cached_service = UserServiceImpl(user_repo, password_manager,
+                                     CredentialCache(b"benchmark", max_size=1000, ttl_seconds=3600))
+    token_manager = TokenManagerHMAC(b"benchmark", ttl_seconds=3600)
+
+    user = await uncached_service.register_and_get_user(UserAuth(username="bench", password="bench"))
+    token = token_manager.issue_token(user)
+
+    def credentials() -> UserAuth:
+        return UserAuth(username="bench", password="bench")
+
+    results = [
+        await measure_async("basic", lambda: uncached_service.authenticate_and_get_user(credentials()), iterations),
+        await measure_async("basic_credential_cache",
+                            lambda: cached_service.authenticate_and_get_user(credentials()), iterations),
+        measure("bearer_token", lambda: token_manager.validate_token(token), iterations),
+    ]
+    print_results(results)
+
+    password_manager.shutdown()
+    await engine.dispose()
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
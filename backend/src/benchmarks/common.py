@@ -0,0 +1,83 @@
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Literal
+
+
+def summarize(name: str, durations: list[float]) -> dict:
+    durations = sorted(durations)
+    total = sum(durations)
+    return {
+        "name": name,
+        "iterations": len(durations),
+        "ops_per_second": round(len(durations) / total, 1) if total else None,
+        "mean_us": round(statistics.fmean(durations) * 1e6, 2),
+        "p50_us": round(percentile(durations, 50) * 1e6, 2),
+        "p95_us": round(percentile(durations, 95) * 1e6, 2),
+        "p99_us": round(percentile(durations, 99) * 1e6, 2),
+    }
+
+
+async def measure_async(name: str, func: Callable[[], Awaitable], iterations: int) -> dict:
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        durations.append(time.perf_counter() - started)
+    return summarize(name, durations)
+
+
+def measure(name: str, func: Callable[[], object], iterations: int) -> dict:
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return summarize(name, durations)
+
+
+def print_results(results: list[dict]) -> None:
+    print(json.dumps(results, indent=2))
+
+
+def write_baseline(path: str, results: list[dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+        file.write("\n")
+
+
+def compare_to_baseline(results: list[dict], path: str, key: str, checks: dict[str, Literal["lower", "higher"]],
+                        tolerance: float) -> list[str]:
+    """
+    Matches results to the baseline stored at path by their key field and returns a description of
+    every checked field that got worse by more than tolerance (relative). checks maps a field
+    to the direction that is better for it. Without a stored baseline nothing is reported.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        baseline_by_key = {result[key]: result for result in json.load(file)}
+    regressions = []
+    for result in results:
+        expected = baseline_by_key.get(result[key])
+        if expected is None:
+            continue
+        for field, better in checks.items():
+            sign = 1 if better == "lower" else -1
+            if sign * result[field] > sign * expected[field] * (1 + sign * tolerance):
+                regressions.append(f"{result[key]}: {field} {result[field]}, baseline {expected[field]}")
+    return regressions
+
+
+def report_regressions(regressions: list[str]) -> int:
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
@@ -0,0 +1,219 @@
+"""
+Drives the HTTP API end to end at a fixed concurrency and reports throughput and
+p50/p95/p99 latency per route as JSON.
+
+By default the app runs in-process behind an ASGI transport against a temporary SQLite
+database (or the in-memory repositories with --backend memory); pass --base-url to load
+a running server instead.
+
+The scenario runs --runs times and every figure reported is the median over the runs. Results can be
+compared with a stored baseline (recorded the same way) so that regressions show up between commits.
+The comparison looks at throughput, p50 latency and errors only: tail percentiles of a few hundred
+requests swing by several times between runs. Routes with fewer than MIN_GATED_REQUESTS requests
+per run (registration and token issuing, one per user) are only checked for errors.
+
+Usage (from backend/src):
+    python -m benchmarks.load_test [--backend sqlite|memory] [--concurrency 16] [--requests 500]
+                                   [--users 20] [--runs 3] [--base-url http://127.0.0.1:8000]
+                                   [--baseline benchmarks/baselines/load_test.json]
+                                   [--write-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from base64 import b64encode
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from app.app import create_app
+from app.config import Config
+from app.container import Container
+from app.repositories.sqlalchemy_db.models.base import Base
+
+from .common import compare_to_baseline, percentile, print_results, report_regressions, write_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "load_test.json")
+MIN_GATED_REQUESTS = 100
+MEDIAN_KEYS = ["requests_per_second", "p50_ms", "p95_ms", "p99_ms"]
+
+
+@dataclass
+class BenchUser:
+    username: str
+    password: str
+    token: str = ""
+    task_ids: list[str] = field(default_factory=list)
+
+    @property
+    def basic_headers(self) -> dict[str, str]:
+        credentials = b64encode(f"{self.username}:{self.password}".encode()).decode()
+        return {"Authorization": f"Basic {credentials}"}
+
+    @property
+    def bearer_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+async def run_route(name: str, send: Callable[[int], Awaitable[httpx.Response]],
+                    requests: int, concurrency: int) -> dict:
+    durations = []
+    errors = 0
+    next_index = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in next_index:
+            started = time.perf_counter()
+            response = await send(index)
+            durations.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    elapsed = time.perf_counter() - started
+
+    durations.sort()
+    return {
+        "route": name,
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(durations, 50) * 1e3, 3),
+        "p95_ms": round(percentile(durations, 95) * 1e3, 3),
+        "p99_ms": round(percentile(durations, 99) * 1e3, 3),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, requests: int, concurrency: int, users_count: int) -> list[dict]:
+    run_id = os.urandom(4).hex()
+    users = [BenchUser(username=f"bench_{run_id}_{i}", password=f"password_{i}") for i in range(users_count)]
+
+    def user_for(index: int) -> BenchUser:
+        return users[index % len(users)]
+
+    async def register(index: int) -> httpx.Response:
+        user = users[index]
+        return await client.post("/auth/register", json={"username": user.username, "password": user.password})
+
+    async def issue_token(index: int) -> httpx.Response:
+        user = users[index]
+        response = await client.post("/auth/token", headers=user.basic_headers)
+        user.token = response.json()["access_token"]
+        return response
+
+    async def get_user_info_bearer(index: int) -> httpx.Response:
+        return await client.get("/auth/get-user-info", headers=user_for(index).bearer_headers)
+
+    async def get_user_info_basic(index: int) -> httpx.Response:
+        return await client.get("/auth/get-user-info", headers=user_for(index).basic_headers)
+
+    async def add_task(index: int) -> httpx.Response:
+        user = user_for(index)
+        response = await client.post("/tasks", json={"content": f"task {index}"}, headers=user.bearer_headers)
+        user.task_ids.append(response.json()["id"])
+        return response
+
+    async def get_tasks(index: int) -> httpx.Response:
+        return await client.get("/tasks", params={"limit": 20}, headers=user_for(index).bearer_headers)
+
+    async def change_complete_status(index: int) -> httpx.Response:
+        user = user_for(index)
+        task_id = user.task_ids[index // len(users)]
+        return await client.patch(f"/tasks/{task_id}/change-complete-status", headers=user.bearer_headers)
+
+    async def delete_task(index: int) -> httpx.Response:
+        user = user_for(index)
+        task_id = user.task_ids[index // len(users)]
+        return await client.delete(f"/tasks/{task_id}", headers=user.bearer_headers)
+
+    return [
+        await run_route("POST /auth/register", register, users_count, concurrency),
+        await run_route("POST /auth/token", issue_token, users_count, concurrency),
+        await run_route("GET /auth/get-user-info (bearer)", get_user_info_bearer, requests, concurrency),
+        await run_route("GET /auth/get-user-info (basic)", get_user_info_basic, requests, concurrency),
+        await run_route("POST /tasks", add_task, requests, concurrency),
+        await run_route("GET /tasks", get_tasks, requests, concurrency),
+        await run_route("PATCH /tasks/{task_id}/change-complete-status", change_complete_status, requests, concurrency),
+        await run_route("DELETE /tasks/{task_id}", delete_task, requests, concurrency),
+    ]
+
+
+def combine_runs(runs: list[list[dict]]) -> list[dict]:
+    combined = []
+    for route_results in zip(*runs):
+        combined.append(route_results[0] | {
+            "runs": len(runs),
+            "errors": max(result["errors"] for result in route_results),
+        } | {key: round(statistics.median(result[key] for result in route_results), 3) for key in MEDIAN_KEYS})
+    return combined
+
+
+@asynccontextmanager
+async def create_client(backend: str, base_url: str | None) -> AsyncIterator[httpx.AsyncClient]:
+    if base_url is not None:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "load_test.db")
+    config = Config(sqlalchemy_db_url=f"sqlite+aiosqlite:///{db_path}",
+                    repository_backend="memory" if backend == "memory" else "sqlalchemy",
+                    # every simulated user comes from the same address
+                    register_rate_limit_per_second=None,
+                    basic_auth_rate_limit_per_second=None)
+    container = Container(config)
+    if container.engine is not None:
+        async with container.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await container.start()
+    # ASGITransport does not run the lifespan, so the container is started above and handed over here
+    app = create_app(config)
+    app.state.container = container
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test") as client:
+            yield client
+    finally:
+        await container.dispose()
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+
+async def main(args: argparse.Namespace) -> int:
+    async with create_client(args.backend, args.base_url) as client:
+        runs = [await run_scenario(client, args.requests, args.concurrency, args.users) for _ in range(args.runs)]
+    results = combine_runs(runs)
+    print_results(results)
+
+    if args.write_baseline:
+        write_baseline(args.baseline, results)
+        return 0
+    gated_results = [result for result in results if result["requests"] >= MIN_GATED_REQUESTS]
+    return report_regressions(
+        compare_to_baseline(results, args.baseline, "route", {"errors": "lower"}, 0)
+        + compare_to_baseline(gated_results, args.baseline, "route",
+                              {"requests_per_second": "higher", "p50_ms": "lower"}, args.tolerance)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--base-url", default=None, help="load a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per route")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="scenario runs to take the median of")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative drop in throughput or growth in p50 before failing")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,128 @@
+"""
+Microbenchmarks of the per-request hot path, run against the in-memory repositories:
+authentication with and without the credential cache, bcrypt verification at several
+cost factors and the model -> schema -> response conversions.
+
+Each case reports ops/sec plus the peak bytes allocated by a single call (tracemalloc).
+Results are compared with a stored baseline and the run exits non-zero when a case
+gets more than --tolerance slower at the median or allocates more than --tolerance extra.
+
+Usage (from backend/src):
+    python -m benchmarks.microbenchmarks [--iterations 200] [--list-size 10000]
+                                         [--baseline benchmarks/baselines/microbenchmarks.json]
+                                         [--write-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable
+
+import bcrypt
+
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.users import UserRepositoryInMemory
+from app.schemas.task import Task, TaskResponse
+from app.schemas.user import User, UserAuth, UserResponse
+from app.services.users import UserServiceImpl
+from app.services.utils.credential_cache import CredentialCache
+from app.services.utils.password_manager import PasswordManagerBcrypt, PasswordManagerPool
+
+from .common import compare_to_baseline, measure, measure_async, print_results, report_regressions, write_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "microbenchmarks.json")
+BCRYPT_COST_FACTORS = [4, 8, 10, 12]
+AUTH_BCRYPT_COST = 4
+
+
+def measure_allocations(func: Callable[[], object]) -> dict:
+    func()
+    tracemalloc.start()
+    try:
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_alloc_bytes": peak_bytes - start_bytes}
+
+
+async def measure_allocations_async(func: Callable[[], Awaitable]) -> dict:
+    await func()
+    tracemalloc.start()
+    try:
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        await func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_alloc_bytes": peak_bytes - start_bytes}
+
+
+async def main(iterations: int, list_size: int) -> list[dict]:
+    # Same cost as the stored hash, so authentication does not rehash it on every iteration
+    password_manager = PasswordManagerPool(PasswordManagerBcrypt(AUTH_BCRYPT_COST), ThreadPoolExecutor(1),
+                                           max_concurrency=1)
+    password_hash = bcrypt.hashpw(b"bench", bcrypt.gensalt(AUTH_BCRYPT_COST)).decode("utf-8")
+    user_repo = UserRepositoryInMemory([User(id="bench", username="bench", password_hash=password_hash)])
+    uncached_service = UserServiceImpl(user_repo, password_manager)
+    cached_service = UserServiceImpl(user_repo, password_manager,
+                                     CredentialCache(b"benchmark", max_size=1000, ttl_seconds=3600))
+
+    def authenticate_uncached() -> Awaitable:
+        return uncached_service.authenticate_and_get_user(UserAuth(username="bench", password="bench"))
+
+    def authenticate_cached() -> Awaitable:
+        return cached_service.authenticate_and_get_user(UserAuth(username="bench", password="bench"))
+
+    results = [
+        await measure_async(f"authenticate_bcrypt_{AUTH_BCRYPT_COST}", authenticate_uncached, iterations)
+        | await measure_allocations_async(authenticate_uncached),
+        await measure_async("authenticate_credential_cache", authenticate_cached, iterations)
+        | await measure_allocations_async(authenticate_cached),
+    ]
+
+    bcrypt_manager = PasswordManagerBcrypt()
+    for cost in BCRYPT_COST_FACTORS:
+        cost_hash = bcrypt.hashpw(b"bench", bcrypt.gensalt(cost)).decode("utf-8")
+        cost_iterations = max(3, iterations >> max(0, cost - AUTH_BCRYPT_COST - 2))
+        verify = lambda: bcrypt_manager.is_password_matching_hash("bench", cost_hash)
+        results.append(measure(f"bcrypt_verify_cost_{cost}", verify, cost_iterations) | measure_allocations(verify))
+
+    user_model = UserModel(id="bench", username="bench", password_hash=password_hash)
+    to_response = lambda: UserResponse.from_user(user_model.to_user())
+    results.append(measure("user_model_to_response", to_response, iterations * 50) | measure_allocations(to_response))
+
+    tasks = [Task(id=f"task_{i}", content=f"task number {i}", is_completed=i % 2 == 0, owner_id="bench")
+             for i in range(list_size)]
+    tasks_to_responses = lambda: [TaskResponse.from_task(task) for task in tasks]
+    results.append(measure(f"task_responses_{list_size}", tasks_to_responses, max(3, iterations // 10))
+                   | measure_allocations(tasks_to_responses))
+
+    password_manager.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--list-size", type=int, default=10_000)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative growth in p50 latency or allocations before failing")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args.iterations, args.list_size))
+    print_results(results)
+
+    if args.write_baseline:
+        write_baseline(args.baseline, results)
+        sys.exit(0)
+    # The median is compared rather than ops/sec: one descheduled call skews the mean
+    # of sub-microsecond cases far more than it moves p50.
+    sys.exit(report_regressions(compare_to_baseline(results, args.baseline, "name",
+                                                    {"p50_us": "lower", "peak_alloc_bytes": "lower"},
+                                                    args.tolerance)))
@@ -0,0 +1,89 @@
+"""
+Measures repository read throughput at different connection pool sizes under a fixed concurrency.
+
+Usage (from backend/src):
+    python -m benchmarks.pool_sizes [--db-url URL] [--concurrency 50] [--duration 5] [--pool-sizes 1 2 5 10 20]
+
+Without --db-url a temporary SQLite file is used.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.exceptions import ConstraintViolationError
+from app.repositories.sqlalchemy_db.engine import create_engine, get_pool_stats
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.users import UserRepositorySQLAlchemy
+from app.schemas.user import UserAuth
+
+from .common import print_results
+
+USERS = 100
+
+
+async def run(db_url: str, pool_size: int, concurrency: int, duration: float) -> dict:
+    engine = create_engine(Config(sqlalchemy_db_url=db_url, db_pool_size=pool_size, db_max_overflow=0))
+    user_repo = UserRepositorySQLAlchemy(async_sessionmaker(engine, expire_on_commit=False))
+    deadline = time.perf_counter() + duration
+    completed = 0
+
+    async def worker(worker_id: int) -> None:
+        nonlocal completed
+        i = worker_id
+        while time.perf_counter() < deadline:
+            await user_repo.get_user_by_username(f"user{i % USERS}")
+            completed += 1
+            i += concurrency
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stats = get_pool_stats(engine)
+    await engine.dispose()
+    return {
+        "pool_size": pool_size,
+        "concurrency": concurrency,
+        "requests_per_second": round(completed / elapsed, 1),
+        "mean_checkout_wait_ms": round(stats.total_checkout_wait_seconds / stats.checkouts * 1000, 3),
+        "max_checkout_wait_ms": round(stats.max_checkout_wait_seconds * 1000, 3),
+        "timeouts": stats.timeouts,
+    }
+
+
+async def prepare(db_url: str) -> None:
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    user_repo = UserRepositorySQLAlchemy(async_sessionmaker(engine, expire_on_commit=False))
+    for i in range(USERS):
+        try:
+            await user_repo.add_user(UserAuth(username=f"user{i}", password="hash"))
+        except ConstraintViolationError:
+            pass
+    await engine.dispose()
+
+
+async def main(db_url: str | None, pool_sizes: list[int], concurrency: int, duration: float) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "pool_sizes.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    await prepare(db_url)
+    print_results([await run(db_url, pool_size, concurrency, duration) for pool_size in pool_sizes])
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url")
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 5, 10, 20])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.pool_sizes, args.concurrency, args.duration))
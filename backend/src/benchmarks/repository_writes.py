@@ -0,0 +1,105 @@
+"""
+Compares single-row repository writes before and after moving to client-generated keys:
+the old ORM path (add + commit + refresh) against UserRepositorySQLAlchemy.add_user and
+TaskRepositorySQLAlchemy.add_task, reporting latency and statements executed per write.
+
+Usage (from backend/src):
+    python -m benchmarks.repository_writes [--db-url URL] [--iterations 1000]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+from typing import Awaitable, Callable
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+from app.repositories.users import UserRepositorySQLAlchemy
+from app.request_metrics import RequestStats, bind_request_stats, unbind_request_stats
+from app.schemas.task import Task
+from app.schemas.user import UserAuth
+
+from .common import measure_async, print_results
+
+
+async def measure_writes(name: str, func: Callable[[], Awaitable], iterations: int) -> dict:
+    stats = RequestStats()
+    token = bind_request_stats(stats)
+    try:
+        result = await measure_async(name, func, iterations)
+    finally:
+        unbind_request_stats(token)
+    return result | {"statements_per_write": round(stats.db_queries / iterations, 2)}
+
+
+async def main(db_url: str | None, iterations: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "repository_writes.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    user_repo = UserRepositorySQLAlchemy(session_maker)
+    task_repo = TaskRepositorySQLAlchemy(session_maker)
+    counter = itertools.count()
+
+    async def add_user_with_refresh() -> None:
+        async with session_maker() as session:
+            user_model = UserModel(username=f"refresh_{next(counter)}", password_hash="hash")
+            session.add(user_model)
+            await session.commit()
+            await session.refresh(user_model)
+            user_model.to_user()
+
+    async def add_user() -> None:
+        await user_repo.add_user(UserAuth(username=f"insert_{next(counter)}", password="hash"))
+
+    owner = await user_repo.add_user(UserAuth(username="owner", password="hash"))
+
+    async def add_task_with_refresh() -> None:
+        async with session_maker() as session:
+            task_model = TaskModel(content="task", is_completed=False, owner_id=owner.id)
+            session.add(task_model)
+            await session.flush()
+            # The version bump every task write makes, as in the repository
+            await session.execute(sa.update(UserModel)
+                                  .where(UserModel.id == owner.id)
+                                  .values(tasks_version=UserModel.tasks_version + 1))
+            await session.commit()
+            await session.refresh(task_model)
+            task_model.to_task()
+
+    async def add_task() -> None:
+        await task_repo.add_task(Task(content="task", owner_id=owner.id))
+
+    results = [
+        await measure_writes("add_user_orm_refresh", add_user_with_refresh, iterations),
+        await measure_writes("add_user_client_key", add_user, iterations),
+        await measure_writes("add_task_orm_refresh", add_task_with_refresh, iterations),
+        await measure_writes("add_task_client_key", add_task, iterations),
+    ]
+    print_results(results)
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.iterations))
@@ -0,0 +1,77 @@
+"""
+Compares the two ways a route can turn a domain object into a response body:
+- fastapi_path: build the response model (UserResponse.from_user, TaskResponse.from_task), let FastAPI
+  validate and serialize it through the return annotation and encode it with JSONResponse
+- direct_bytes: serialize the trusted domain object straight to JSON bytes (app/routers/json_responses.py)
+
+for one user (get-user-info), a 100-task page (GET /tasks) and a 10k-task list.
+
+Usage (from backend/src):
+    python -m benchmarks.response_serialization [--iterations 2000] [--list-size 10000]
+"""
+import argparse
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.routers.json_responses import dump_task_page, dump_tasks, dump_user, make_json_response
+from app.schemas.task import Task, TaskPage, TaskPageResponse, TaskResponse
+from app.schemas.user import User, UserResponse
+
+from .common import measure_async, print_results
+
+PAGE_SIZE = 100
+
+
+def make_fastapi_path(response_type: Any, to_response: Callable[[], Any]) -> Callable[[], Awaitable]:
+    field = create_response_field("response", response_type)
+
+    async def respond() -> bytes:
+        content = await serialize_response(field=field, response_content=to_response())
+        return JSONResponse(content).body
+
+    return respond
+
+
+def make_direct_path(dump: Callable[[], bytes]) -> Callable[[], Awaitable]:
+    async def respond() -> bytes:
+        return make_json_response(dump()).body
+
+    return respond
+
+
+async def main(iterations: int, list_size: int) -> None:
+    user = User(id="bench", username="bench", password_hash="hash")
+    tasks = [Task(id=f"task_{i}", content=f"task number {i}", is_completed=i % 2 == 0, owner_id="bench")
+             for i in range(list_size)]
+    task_page = TaskPage(tasks=tasks[:PAGE_SIZE], next_cursor="cursor")
+
+    cases = [
+        ("user", iterations,
+         make_fastapi_path(UserResponse, lambda: UserResponse.from_user(user)),
+         make_direct_path(lambda: dump_user(user))),
+        (f"task_page_{PAGE_SIZE}", iterations // 10,
+         make_fastapi_path(TaskPageResponse, lambda: TaskPageResponse.from_task_page(task_page)),
+         make_direct_path(lambda: dump_task_page(task_page))),
+        (f"task_list_{list_size}", max(3, iterations // 200),
+         make_fastapi_path(list[TaskResponse], lambda: [TaskResponse.from_task(task) for task in tasks]),
+         make_direct_path(lambda: dump_tasks(tasks))),
+    ]
+    results = []
+    for name, case_iterations, fastapi_path, direct_path in cases:
+        assert await fastapi_path() == await direct_path()
+        before = await measure_async(f"{name}_fastapi_path", fastapi_path, case_iterations)
+        after = await measure_async(f"{name}_direct_bytes", direct_path, case_iterations)
+        results += [before, after | {"speedup": round(before["p50_us"] / after["p50_us"], 1)}]
+    print_results(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--list-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations, args.list_size))
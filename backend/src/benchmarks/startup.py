@@ -0,0 +1,96 @@
+"""
+Measures cold start: importing app.app, create_app(), lifespan startup (config, container and
+engine creation) and the first request, each in a fresh interpreter so nothing is cached in-process.
+
+Reports the median and worst run of every phase. The run exits non-zero when the median total
+exceeds --target-ms, or when a phase gets more than --tolerance slower than the stored baseline.
+
+Usage (from backend/src):
+    python -m benchmarks.startup [--runs 10] [--db-url sqlite+aiosqlite://] [--target-ms 2000]
+                                 [--baseline benchmarks/baselines/startup.json]
+                                 [--write-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from .common import compare_to_baseline, report_regressions, write_baseline
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "startup.json")
+PHASES = ["import_ms", "create_app_ms", "startup_ms", "first_request_ms", "total_ms"]
+
+
+async def measure_cold_start(db_url: str) -> dict:
+    started = time.perf_counter()
+    from app.app import create_app
+    from app.config import Config
+    imported = time.perf_counter()
+
+    app = create_app(Config(sqlalchemy_db_url=db_url))
+    created = time.perf_counter()
+
+    import httpx
+    async with app.router.lifespan_context(app):
+        started_up = time.perf_counter()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+            await client.get("/metrics")
+        first_request = time.perf_counter()
+
+    return {
+        "import_ms": (imported - started) * 1e3,
+        "create_app_ms": (created - imported) * 1e3,
+        "startup_ms": (started_up - created) * 1e3,
+        "first_request_ms": (first_request - started_up) * 1e3,
+        "total_ms": (first_request - started) * 1e3,
+    }
+
+
+def run_cold_starts(runs: int, db_url: str) -> list[dict]:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.startup", "--child", "--db-url", db_url],
+                                check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output))
+    return [{"phase": phase,
+             "runs": runs,
+             "median_ms": round(statistics.median(sample[phase] for sample in samples), 2),
+             "max_ms": round(max(sample[phase] for sample in samples), 2)}
+            for phase in PHASES]
+
+
+def main(args: argparse.Namespace) -> int:
+    results = run_cold_starts(args.runs, args.db_url)
+    print(json.dumps(results, indent=2))
+
+    if args.write_baseline:
+        write_baseline(args.baseline, results)
+        return 0
+    regressions = []
+    total = next(result for result in results if result["phase"] == "total_ms")
+    if total["median_ms"] > args.target_ms:
+        regressions.append(f"total_ms: median {total['median_ms']} ms, target {args.target_ms} ms")
+    regressions += compare_to_baseline(results, args.baseline, "phase", {"median_ms": "lower"}, args.tolerance)
+    return report_regressions(regressions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--db-url", default="sqlite+aiosqlite://")
+    parser.add_argument("--target-ms", type=float, default=2000,
+                        help="upper bound for the median time from interpreter start-up to the first response")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--write-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative growth of a phase's median before failing")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(measure_cold_start(args.db_url))))
+        sys.exit(0)
+    sys.exit(main(args))
@@ -0,0 +1,73 @@
+"""
+Compares creating, completing and deleting N tasks one by one against the batch repository methods.
+
+Usage (from backend/src):
+    python -m benchmarks.task_batches [--db-url URL] [--items 500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+from app.schemas.task import Task
+
+from .common import print_results
+
+
+async def timed(name: str, items: int, coro) -> dict:
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    return {"name": name, "items": items, "total_ms": round(elapsed * 1000, 2),
+            "per_item_us": round(elapsed / items * 1e6, 2)}
+
+
+async def main(db_url: str | None, items: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "task_batches.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.insert(UserModel), [{"id": "bench", "username": "bench", "password_hash": "hash"}])
+    task_repo = TaskRepositorySQLAlchemy(async_sessionmaker(engine, expire_on_commit=False))
+    new_tasks = [Task(content=f"task {i}", owner_id="bench") for i in range(items)]
+
+    async def one_by_one() -> None:
+        tasks = [await task_repo.add_task(task) for task in new_tasks]
+        for task in tasks:
+            await task_repo.update_task(task.model_copy(update={"is_completed": True}))
+        for task in tasks:
+            await task_repo.delete_task_by_id(task.id)
+
+    async def batched() -> None:
+        tasks = await task_repo.add_tasks(new_tasks)
+        task_ids = [task.id for task in tasks]
+        await task_repo.set_tasks_complete_status("bench", task_ids, True)
+        await task_repo.delete_tasks_by_ids("bench", task_ids)
+
+    print_results([await timed("one_by_one", items, one_by_one()),
+                   await timed("batched", items, batched())])
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url")
+    parser.add_argument("--items", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.items))
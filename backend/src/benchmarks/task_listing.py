@@ -0,0 +1,109 @@
+"""
+Compares reading one owner's whole task list through ORM entities (select(TaskModel) -> to_task(),
+the export path before bulk reads) with TaskRepositorySQLAlchemy.stream_tasks_by_owner_id, which maps
+Core rows of the listed columns to TaskRecord, for 10k and 100k tasks.
+
+For each path it reports the time to materialize the list, the time to serialize it as export lines
+and the peak memory (tracemalloc) held by the materialized list.
+
+Usage (from backend/src):
+    python -m benchmarks.task_listing [--db-url URL] [--sizes 10000 100000] [--iterations 3]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+from typing import Awaitable, Callable
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import STREAM_BATCH_SIZE, TaskRepositorySQLAlchemy
+from app.routers.json_responses import dump_task, dump_task_record
+
+from .common import measure_async, print_results
+
+CHUNK_SIZE = 10_000
+
+
+async def measure_peak_memory(func: Callable[[], Awaitable]) -> dict:
+    tracemalloc.start()
+    try:
+        start_bytes, _ = tracemalloc.get_traced_memory()
+        await func()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_alloc_bytes": peak_bytes - start_bytes}
+
+
+async def main(db_url: str | None, sizes: list[int], iterations: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "task_listing.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.insert(UserModel), [
+            {"id": f"owner_{size}", "username": f"owner_{size}", "password_hash": "hash"} for size in sizes
+        ])
+        for size in sizes:
+            for start in range(0, size, CHUNK_SIZE):
+                await conn.execute(sa.insert(TaskModel), [
+                    {"id": f"task_{size}_{i:08d}", "content": f"task number {i}", "is_completed": i % 3 == 0,
+                     "owner_id": f"owner_{size}"}
+                    for i in range(start, min(start + CHUNK_SIZE, size))
+                ])
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    task_repo = TaskRepositorySQLAlchemy(session_maker)
+    results = []
+    for size in sizes:
+        owner_id = f"owner_{size}"
+
+        async def orm_tasks() -> list:
+            async with session_maker() as session:
+                query = (sa.select(TaskModel).where(TaskModel.owner_id == owner_id)
+                         .order_by(TaskModel.is_completed, TaskModel.id)
+                         .execution_options(yield_per=STREAM_BATCH_SIZE))
+                return [task_model.to_task() async for task_model in await session.stream_scalars(query)]
+
+        async def core_records() -> list:
+            return [record async for record in task_repo.stream_tasks_by_owner_id(owner_id)]
+
+        async def orm_export() -> None:
+            b"\n".join([dump_task(task) for task in await orm_tasks()])
+
+        async def core_export() -> None:
+            b"\n".join([dump_task_record(record) for record in await core_records()])
+
+        for name, func in [("orm_entities", orm_tasks), ("core_records", core_records),
+                           ("orm_entities_export", orm_export), ("core_records_export", core_export)]:
+            result = await measure_async(f"{name}_{size}", func, iterations)
+            result["us_per_row"] = round(result["p50_us"] / size, 3)
+            if not name.endswith("export"):
+                result |= await measure_peak_memory(func)
+                result["bytes_per_row"] = round(result["peak_alloc_bytes"] / size, 1)
+            results.append(result)
+    print_results(results)
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.sizes, args.iterations))
@@ -0,0 +1,77 @@
+"""
+Compares page latency of keyset pagination (TaskRepositorySQLAlchemy.get_tasks_by_owner_id with `after`)
+against LIMIT/OFFSET at increasing depths for a single heavy user.
+
+Usage (from backend/src):
+    python -m benchmarks.task_pagination [--db-url URL] [--tasks 100000] [--page-size 50] [--iterations 50]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+
+from .common import measure_async, print_results
+
+CHUNK_SIZE = 10_000
+
+
+async def main(db_url: str | None, tasks: int, page_size: int, iterations: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "task_pagination.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.insert(UserModel), [{"id": "heavy", "username": "heavy", "password_hash": "hash"}])
+        for start in range(0, tasks, CHUNK_SIZE):
+            await conn.execute(sa.insert(TaskModel), [
+                {"id": f"task{i:08d}", "content": f"task number {i}", "is_completed": False, "owner_id": "heavy"}
+                for i in range(start, min(start + CHUNK_SIZE, tasks))
+            ])
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    task_repo = TaskRepositorySQLAlchemy(session_maker)
+
+    async def offset_page(offset: int) -> None:
+        async with session_maker() as session:
+            query = (sa.select(TaskModel).where(TaskModel.owner_id == "heavy")
+                     .order_by(TaskModel.is_completed, TaskModel.id).offset(offset).limit(page_size))
+            [task_model.to_task() for task_model in await session.scalars(query)]
+
+    results = []
+    for depth in [0.0, 0.1, 0.5, 0.9]:
+        offset = int(tasks * depth)
+        after = (False, f"task{offset - 1:08d}") if offset else None
+        results.append(await measure_async(
+            f"keyset_depth_{offset}",
+            lambda: task_repo.get_tasks_by_owner_id("heavy", after=after, limit=page_size),
+            iterations
+        ))
+        results.append(await measure_async(f"offset_depth_{offset}", lambda: offset_page(offset), iterations))
+    print_results(results)
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.tasks, args.page_size, args.iterations))
@@ -0,0 +1,98 @@
+"""
+Benchmarks listing, filtering and counting a user's tasks with TaskRepositorySQLAlchemy
+and prints the query plans to show that they are served by ix_tasks_owner_id_is_completed_id.
+
+Usage (from backend/src):
+    python -m benchmarks.task_repository [--db-url URL] [--users 10000] [--tasks 1000000] [--iterations 200]
+
+Without --db-url a temporary SQLite file is used. An already seeded database is reused as is.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+
+from .common import measure_async, print_results
+
+CHUNK_SIZE = 10_000
+
+
+async def seed(engine: AsyncEngine, users: int, tasks: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if await conn.scalar(sa.select(sa.func.count()).select_from(TaskModel)):
+            return
+        await conn.execute(sa.insert(UserModel), [
+            {"id": f"user{i}", "username": f"user{i}", "password_hash": "hash"} for i in range(users)
+        ])
+        for start in range(0, tasks, CHUNK_SIZE):
+            await conn.execute(sa.insert(TaskModel), [
+                {"id": f"task{i:08d}", "content": f"task number {i}", "is_completed": i % 3 == 0,
+                 "owner_id": f"user{i % users}"}
+                for i in range(start, min(start + CHUNK_SIZE, tasks))
+            ])
+
+
+async def explain(engine: AsyncEngine, query: sa.Select) -> list[str]:
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    compiled = query.compile(engine.sync_engine, compile_kwargs={"literal_binds": True})
+    async with engine.connect() as conn:
+        rows = await conn.execute(sa.text(f"{prefix} {compiled}"))
+        return [" ".join(str(value) for value in row) for row in rows]
+
+
+async def main(db_url: str | None, users: int, tasks: int, iterations: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "task_repository.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    await seed(engine, users, tasks)
+    task_repo = TaskRepositorySQLAlchemy(async_sessionmaker(engine, expire_on_commit=False))
+
+    def random_owner() -> str:
+        return f"user{random.randrange(users)}"
+
+    results = [
+        await measure_async("list", lambda: task_repo.get_tasks_by_owner_id(random_owner()), iterations),
+        await measure_async("list_uncompleted",
+                            lambda: task_repo.get_tasks_by_owner_id(random_owner(), is_completed=False), iterations),
+        await measure_async("count", lambda: task_repo.count_tasks_by_owner_id(random_owner()), iterations),
+        await measure_async("count_completed",
+                            lambda: task_repo.count_tasks_by_owner_id(random_owner(), is_completed=True), iterations),
+    ]
+    print_results(results)
+
+    list_query = (sa.select(TaskModel).where(TaskModel.owner_id == "user0")
+                  .order_by(TaskModel.is_completed, TaskModel.id))
+    count_query = (sa.select(sa.func.count()).select_from(TaskModel)
+                   .where(TaskModel.owner_id == "user0", TaskModel.is_completed == sa.true()))
+    for name, query in [("list", list_query), ("count_completed", count_query)]:
+        print(f"{name} plan:")
+        for line in await explain(engine, query):
+            print(f"  {line}")
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.users, args.tasks, args.iterations))
@@ -0,0 +1,85 @@
+"""
+Benchmarks TaskRepositorySQLAlchemy.search_tasks_by_owner_id (FTS5 on SQLite, GIN on PostgreSQL)
+against an unindexed LIKE scan of the owner's tasks, for a typical and a heavy user.
+
+Usage (from backend/src):
+    python -m benchmarks.task_search [--db-url URL] [--users 10000] [--tasks 1000000] [--iterations 200]
+
+Without --db-url a temporary SQLite file is used.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+
+from .common import measure_async, print_results
+
+CHUNK_SIZE = 10_000
+WORDS = ["buy", "milk", "call", "mom", "read", "book", "walk", "dog", "pay", "rent", "fix", "bike", "clean",
+         "kitchen", "write", "report", "plan", "trip", "water", "plants", "book", "dentist", "renew", "passport"]
+HEAVY_USER_SHARE = 0.1
+
+
+async def main(db_url: str | None, users: int, tasks: int, iterations: int) -> None:
+    db_path = None
+    if db_url is None:
+        db_path = os.path.join(tempfile.mkdtemp(), "task_search.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    random.seed(0)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.insert(UserModel), [
+            {"id": f"user{i}", "username": f"user{i}", "password_hash": "hash"} for i in range(users)
+        ])
+        for start in range(0, tasks, CHUNK_SIZE):
+            await conn.execute(sa.insert(TaskModel), [
+                {"id": f"task{i:08d}", "content": " ".join(random.choices(WORDS, k=4)), "is_completed": False,
+                 "owner_id": "user0" if random.random() < HEAVY_USER_SHARE else f"user{random.randrange(users)}"}
+                for i in range(start, min(start + CHUNK_SIZE, tasks))
+            ])
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    task_repo = TaskRepositorySQLAlchemy(session_maker)
+
+    async def like_scan(owner_id: str) -> None:
+        async with session_maker() as session:
+            query = (sa.select(TaskModel)
+                     .where(TaskModel.owner_id == owner_id,
+                            TaskModel.content.ilike("%milk%"), TaskModel.content.ilike("%dog%"))
+                     .order_by(TaskModel.id).limit(20))
+            [task_model.to_task() for task_model in await session.scalars(query)]
+
+    results = []
+    for label, owner_id in [("typical_user", "user1"), ("heavy_user", "user0")]:
+        results.append(await measure_async(f"search_{label}",
+                                           lambda: task_repo.search_tasks_by_owner_id(owner_id, "milk dog", limit=20),
+                                           iterations))
+        results.append(await measure_async(f"like_scan_{label}", lambda: like_scan(owner_id), iterations))
+    print_results(results)
+
+    await engine.dispose()
+    if db_path is not None:
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db-url", default=None)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.db_url, args.users, args.tasks, args.iterations))
@@ -0,0 +1,174 @@
+"""
+Shows how throughput scales with the number of server workers: for each count, starts main.py
+against a fresh SQLite file, drives two routes for a fixed time and stops the server with SIGTERM.
+
+Both routes authenticate with a bearer token and spend their time in Python (routing, validation,
+serialization, the repository), which one process runs on one core at a time; bcrypt already runs
+outside the GIL in the password executor, so it is left out. The load generator needs cores too:
+on a box with N cores, compare up to about N / 2 workers, or raise --client-processes.
+
+Usage (from backend/src):
+    python -m benchmarks.worker_scaling [--workers 1 2 4] [--duration 10] [--concurrency 32]
+                                        [--client-processes 1] [--users 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+
+from .common import percentile
+
+ROUTES = {
+    "GET /auth/get-user-info": "/auth/get-user-info",
+    "GET /tasks": "/tasks?limit=20",
+}
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+async def create_schema(db_url: str) -> None:
+    engine = create_engine(Config(sqlalchemy_db_url=db_url))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+def start_server(db_url: str, port: int, workers: int) -> subprocess.Popen:
+    env = os.environ | {
+        "SQLALCHEMY_DB_URL": db_url,
+        "SECRET_KEY": "worker-scaling-benchmark",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        # Every request comes from the same address and the task cache would hide the repository
+        "REGISTER_RATE_LIMIT_PER_SECOND": "1000000",
+        "BASIC_AUTH_RATE_LIMIT_PER_SECOND": "1000000",
+        "TASK_CACHE_BACKEND": "none",
+        "BCRYPT_ROUNDS": "4",
+    }
+    return subprocess.Popen([sys.executable, "main.py"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=60)
+
+
+async def wait_until_ready(base_url: str) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while True:
+            try:
+                await client.get("/metrics")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+async def create_users(base_url: str, users: int) -> list[str]:
+    tokens = []
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for i in range(users):
+            credentials = (f"scaling_{i}", f"password_{i}")
+            await client.post("/auth/register", json={"username": credentials[0], "password": credentials[1]})
+            response = await client.post("/auth/token", auth=credentials)
+            token = response.json()["access_token"]
+            await client.post("/tasks/batch", json={"tasks": [{"content": f"task {j}"} for j in range(20)]},
+                              headers={"Authorization": f"Bearer {token}"})
+            tokens.append(token)
+    return tokens
+
+
+async def drive(base_url: str, path: str, tokens: list[str], duration: float, concurrency: int) -> dict:
+    durations = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        nonlocal errors
+        headers = {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            durations.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return {"durations": durations, "errors": errors}
+
+
+def drive_in_process(base_url: str, path: str, tokens: list[str], duration: float, concurrency: int) -> dict:
+    return asyncio.run(drive(base_url, path, tokens, duration, concurrency))
+
+
+def measure_route(base_url: str, path: str, tokens: list[str], duration: float, concurrency: int,
+                  client_processes: int) -> dict:
+    with ProcessPoolExecutor(client_processes) as executor:
+        futures = [executor.submit(drive_in_process, base_url, path, tokens, duration,
+                                   max(1, concurrency // client_processes))
+                   for _ in range(client_processes)]
+        parts = [future.result() for future in futures]
+    durations = sorted(duration for part in parts for duration in part["durations"])
+    return {
+        "requests_per_second": round(len(durations) / duration, 1),
+        "errors": sum(part["errors"] for part in parts),
+        "p50_ms": round(percentile(durations, 50) * 1e3, 3),
+        "p99_ms": round(percentile(durations, 99) * 1e3, 3),
+    }
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main(args: argparse.Namespace) -> list[dict]:
+    results = []
+    single_worker_rps = {}
+    for workers in args.workers:
+        db_path = os.path.join(tempfile.mkdtemp(), "worker_scaling.db")
+        db_url = f"sqlite+aiosqlite:///{db_path}"
+        asyncio.run(create_schema(db_url))
+        port = get_free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(db_url, port, workers)
+        try:
+            asyncio.run(wait_until_ready(base_url))
+            tokens = asyncio.run(create_users(base_url, args.users))
+            for route, path in ROUTES.items():
+                result = measure_route(base_url, path, tokens, args.duration, args.concurrency, args.client_processes)
+                single_worker_rps.setdefault(route, result["requests_per_second"])
+                results.append({"workers": workers, "route": route} | result
+                               | {"speedup": round(result["requests_per_second"] / single_worker_rps[route], 2)})
+        finally:
+            stop_server(server)
+            os.remove(db_path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per route and worker count")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--client-processes", type=int, default=1)
+    parser.add_argument("--users", type=int, default=20)
+    print(json.dumps(main(parser.parse_args()), indent=2))
@@ -1,7 +1,9 @@
-import uvicorn
+import logging
 
-from app import app
+from app.config import Config
+from app.server import run
 
 
 if __name__ == "__main__":
-    uvicorn.run(app)
+    logging.basicConfig(level=logging.INFO)
+    run(Config())
@@ -7,14 +7,15 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-from app.config import config as app_config
+from app.config import Config
 from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
 from app.repositories.sqlalchemy_db.models.base import Base
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option("sqlalchemy.url", app_config.sqlalchemy_db_url)
+config.set_main_option("sqlalchemy.url", Config().sqlalchemy_db_url)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -33,6 +34,13 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # The FTS5 index of tasks and its shadow tables are created by raw DDL, not by the metadata
+    if type_ == "table":
+        return not name.startswith("tasks_fts")
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -49,6 +57,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -58,7 +67,7 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,53 @@
+"""Added full-text search over tasks.content
+
+Revision ID: 8f2c4a1d7e90
+Revises: 5d0a8e6f13c7
+Create Date: 2026-10-18 18:02:44.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2c4a1d7e90'
+down_revision: Union[str, None] = '5d0a8e6f13c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("CREATE VIRTUAL TABLE tasks_fts "
+                   "USING fts5(content, owner_id, content='tasks', content_rowid='rowid')")
+        op.execute("CREATE TRIGGER tasks_fts_after_insert AFTER INSERT ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(rowid, content, owner_id) VALUES (new.rowid, new.content, new.owner_id); "
+                   "END")
+        op.execute("CREATE TRIGGER tasks_fts_after_delete AFTER DELETE ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(tasks_fts, rowid, content, owner_id) "
+                   "VALUES ('delete', old.rowid, old.content, old.owner_id); "
+                   "END")
+        op.execute("CREATE TRIGGER tasks_fts_after_update AFTER UPDATE OF content, owner_id ON tasks BEGIN "
+                   "INSERT INTO tasks_fts(tasks_fts, rowid, content, owner_id) "
+                   "VALUES ('delete', old.rowid, old.content, old.owner_id); "
+                   "INSERT INTO tasks_fts(rowid, content, owner_id) VALUES (new.rowid, new.content, new.owner_id); "
+                   "END")
+        op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    elif dialect == "postgresql":
+        op.create_index('ix_tasks_content_tsv', 'tasks',
+                        [sa.text("to_tsvector('simple'::regconfig, content)")],
+                        postgresql_using='gin')
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER tasks_fts_after_update")
+        op.execute("DROP TRIGGER tasks_fts_after_delete")
+        op.execute("DROP TRIGGER tasks_fts_after_insert")
+        op.execute("DROP TABLE tasks_fts")
+    elif dialect == "postgresql":
+        op.drop_index('ix_tasks_content_tsv', table_name='tasks')
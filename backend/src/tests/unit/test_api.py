@@ -1,33 +1,49 @@
+import json
 from base64 import b64encode
 from uuid import uuid4
 
 from fastapi.testclient import TestClient
 
-from app.app import app
-from app.dependencies import get_user_service
+from app.app import create_app
+from app.repositories.tasks import TaskRepositoryInMemory
+from app.repositories.users import UserRepositoryInMemory
+from app.dependencies import (get_user_service, get_token_manager, get_task_service, get_register_rate_limiter,
+                              get_basic_auth_rate_limiter)
+from app.routers.tasks import EXPORT_CHUNK_LINES
+from app.schemas.task import Task
 from app.schemas.user import User, UserAuth
-from app.services.exceptions import RegistrationError, AuthenticationError
-from app.services.users import UserService
+from app.services.exceptions import RegistrationError, AuthenticationError, OverloadedError
+from app.services.tasks import TaskService, TaskServiceImpl
+from app.services.users import UserService, UserServiceImpl
+from app.services.utils.credential_cache import CredentialCache
+from app.services.utils.rate_limiter import RateLimiter
+from app.services.utils.token_manager import TokenManager, TokenManagerHMAC
+from tests.unit.test_user_service import PasswordManagerMock, UserRepositoryMock
+
+
+TEST_USERS = [
+    User(id="test_id_1", username="JohnDoe", password_hash="johndoehashed"),
+    User(id="test_id_2", username="JaneDoe", password_hash="janedoehashed"),
+    User(id="test_id_3", username="Bipki", password_hash="bipkihashed")
+]
+# Enough tasks for the export to span several body chunks, the last one partial
+EXPORT_TASK_COUNT = 2 * EXPORT_CHUNK_LINES + 1
 
 
 class UserServiceMock(UserService):
     repo: list[User]
 
     def __init__(self):
-        self.repo = [
-            User(id="test_id_1", username="JohnDoe", password_hash="johndoehashed"),
-            User(id="test_id_2", username="JaneDoe", password_hash="janedoehashed"),
-            User(id="test_id_3", username="Bipki", password_hash="bipkihashed")
-        ]
+        self.repo = TEST_USERS
 
-    def register_and_get_user(self, user: UserAuth) -> User:
+    async def register_and_get_user(self, user: UserAuth) -> User:
         if user.username in [u.username for u in self.repo]:
             raise RegistrationError
         user.password += "hashed"
         reg_user = User(id=str(uuid4()), username=user.username, password_hash=user.password)
         return reg_user
 
-    def authenticate_and_get_user(self, user: UserAuth) -> User:
+    async def authenticate_and_get_user(self, user: UserAuth) -> User:
         if user.username not in [u.username for u in self.repo]:
             raise AuthenticationError
         user_from_repo = list(filter(lambda u: u.username == user.username, self.repo)).pop()
@@ -35,12 +51,49 @@ class UserServiceMock(UserService):
             raise AuthenticationError
         return user_from_repo
 
+    def get_recently_authenticated_user(self, user: UserAuth) -> User | None:
+        return None
+
 
 def get_mock_user_service() -> UserService:
     return UserServiceMock()
 
 
+def get_test_token_manager() -> TokenManager:
+    return TokenManagerHMAC(b"test_secret", ttl_seconds=3600)
+
+
+class UserServiceOverloadedMock(UserService):
+    async def register_and_get_user(self, user: UserAuth) -> User:
+        raise OverloadedError(retry_after=2.5)
+
+    async def authenticate_and_get_user(self, user: UserAuth) -> User:
+        raise OverloadedError(retry_after=0.1)
+
+    def get_recently_authenticated_user(self, user: UserAuth) -> User | None:
+        return None
+
+
+def get_no_rate_limiter() -> RateLimiter | None:
+    return None
+
+
+def get_mock_task_service() -> TaskService:
+    return task_service
+
+
+task_service = TaskServiceImpl(TaskRepositoryInMemory(
+    UserRepositoryInMemory(TEST_USERS),
+    [Task(id=f"task_{i}", content=f"task {i}", is_completed=i % 2 == 0, owner_id="test_id_1") for i in range(1, 6)]
+    + [Task(id=f"export_{i:04d}", content=f"export {i}", is_completed=False, owner_id="test_id_3")
+       for i in range(EXPORT_TASK_COUNT)]
+))
+app = create_app()
 app.dependency_overrides[get_user_service] = get_mock_user_service
+app.dependency_overrides[get_task_service] = get_mock_task_service
+app.dependency_overrides[get_token_manager] = get_test_token_manager
+app.dependency_overrides[get_register_rate_limiter] = get_no_rate_limiter
+app.dependency_overrides[get_basic_auth_rate_limiter] = get_no_rate_limiter
 test_client = TestClient(app)
 
 
@@ -73,3 +126,230 @@ class TestAuthentication:
         encoded_credentials = b64encode(b"who:bebra").decode()
         response = test_client.get("/auth/get-user-info", headers={"Authorization": f"Basic {encoded_credentials}"})
         assert response.status_code == 401
+
+    def test_not_modified(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        response = test_client.get("/auth/get-user-info", headers=headers)
+        not_modified = test_client.get("/auth/get-user-info", headers={**headers, "If-None-Match": response.headers["ETag"]})
+        assert all([response.headers["ETag"].startswith('W/"'),
+                    not_modified.status_code == 304,
+                    not_modified.headers["ETag"] == response.headers["ETag"]])
+
+
+class TestToken:
+
+    def test_issue_and_use_token(self):
+        encoded_credentials = b64encode(b"JohnDoe:johndoe").decode()
+        token_response = test_client.post("/auth/token", headers={"Authorization": f"Basic {encoded_credentials}"})
+        access_token = token_response.json().get("access_token")
+        response = test_client.get("/auth/get-user-info", headers={"Authorization": f"Bearer {access_token}"})
+        assert all([token_response.status_code == 200,
+                    response.status_code == 200,
+                    response.json() == {"id": "test_id_1", "username": "JohnDoe"}])
+
+    def test_issue_with_incorrect_password(self):
+        encoded_credentials = b64encode(b"JohnDoe:bebra").decode()
+        response = test_client.post("/auth/token", headers={"Authorization": f"Basic {encoded_credentials}"})
+        assert response.status_code == 401
+
+    def test_invalid_token(self):
+        response = test_client.get("/auth/get-user-info", headers={"Authorization": "Bearer bebra"})
+        assert response.status_code == 401
+
+    def test_no_credentials(self):
+        response = test_client.get("/auth/get-user-info")
+        assert response.status_code == 401
+
+
+def basic_auth_headers(username: str, password: str) -> dict[str, str]:
+    encoded_credentials = b64encode(f"{username}:{password}".encode()).decode()
+    return {"Authorization": f"Basic {encoded_credentials}"}
+
+
+class TestTasks:
+
+    def test_get_tasks_pages(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        first_page = test_client.get("/tasks", params={"limit": 2}, headers=headers)
+        second_page = test_client.get("/tasks", params={"limit": 2, "cursor": first_page.json()["next_cursor"]},
+                                      headers=headers)
+        assert all([first_page.status_code == 200,
+                    len(first_page.json()["tasks"]) == 2,
+                    first_page.json()["tasks"][0].keys() == {"id", "content", "is_completed"},
+                    second_page.status_code == 200,
+                    first_page.json()["tasks"] != second_page.json()["tasks"]])
+
+    def test_get_tasks_not_modified_until_changed(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        response = test_client.get("/tasks", headers=headers)
+        conditional_headers = {**headers, "If-None-Match": response.headers["ETag"]}
+        not_modified = test_client.get("/tasks", headers=conditional_headers)
+        added = test_client.post("/tasks", json={"content": "bebra"}, headers=headers)
+        modified = test_client.get("/tasks", headers=conditional_headers)
+        test_client.delete(f"/tasks/{added.json()['id']}", headers=headers)
+        assert all([response.status_code == 200,
+                    not_modified.status_code == 304,
+                    not_modified.content == b"",
+                    modified.status_code == 200,
+                    modified.headers["ETag"] != response.headers["ETag"]])
+
+    def test_export(self):
+        response = test_client.get("/tasks/export", headers=basic_auth_headers("JohnDoe", "johndoe"))
+        lines = response.text.splitlines()
+        assert all([response.status_code == 200,
+                    response.headers["content-type"] == "application/x-ndjson",
+                    len(lines) > 0,
+                    json.loads(lines[0]).keys() == {"id", "content", "is_completed"}])
+
+    def test_export_in_chunks(self):
+        response = test_client.get("/tasks/export", headers=basic_auth_headers("Bipki", "bipki"))
+        lines = response.text.splitlines()
+        assert all([response.status_code == 200,
+                    response.text.endswith("\n"),
+                    len(lines) == EXPORT_TASK_COUNT,
+                    json.loads(lines[-1]) == {"id": f"export_{EXPORT_TASK_COUNT - 1:04d}",
+                                              "content": f"export {EXPORT_TASK_COUNT - 1}",
+                                              "is_completed": False}])
+
+    def test_get_tasks_invalid_cursor(self):
+        response = test_client.get("/tasks", params={"cursor": "bebra"}, headers=basic_auth_headers("JohnDoe", "johndoe"))
+        assert response.status_code == 400
+
+    def test_get_tasks_invalid_cursor_with_current_etag(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        etag = test_client.get("/tasks", headers=headers).headers["ETag"]
+        response = test_client.get("/tasks", params={"cursor": "bebra"}, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 400
+
+    def test_get_tasks_unauthorized(self):
+        response = test_client.get("/tasks")
+        assert response.status_code == 401
+
+    def test_add_change_and_delete(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        added = test_client.post("/tasks", json={"content": "bebra"}, headers=headers)
+        task_id = added.json()["id"]
+        changed = test_client.patch(f"/tasks/{task_id}/change-complete-status", headers=headers)
+        deleted = test_client.delete(f"/tasks/{task_id}", headers=headers)
+        deleted_again = test_client.delete(f"/tasks/{task_id}", headers=headers)
+        assert all([added.status_code == 200,
+                    added.json()["is_completed"] is False,
+                    changed.status_code == 200,
+                    changed.json()["is_completed"] is True,
+                    deleted.status_code == 204,
+                    deleted_again.status_code == 404])
+
+    def test_other_users_task_is_not_found(self):
+        response = test_client.delete("/tasks/task_1", headers=basic_auth_headers("JaneDoe", "janedoe"))
+        assert response.status_code == 404
+
+
+class TestTaskSearch:
+
+    def test_search(self):
+        response = test_client.get("/tasks/search", params={"q": "task", "limit": 2},
+                                   headers=basic_auth_headers("JohnDoe", "johndoe"))
+        assert all([response.status_code == 200,
+                    len(response.json()["tasks"]) == 2,
+                    response.json()["next_cursor"] is not None])
+
+    def test_empty_query(self):
+        response = test_client.get("/tasks/search", params={"q": ""}, headers=basic_auth_headers("JohnDoe", "johndoe"))
+        assert response.status_code == 422
+
+
+class TestTaskBatches:
+
+    def test_create_complete_delete(self):
+        headers = basic_auth_headers("JohnDoe", "johndoe")
+        created = test_client.post("/tasks/batch", json={"tasks": [{"content": "a"}, {"content": "b"}]}, headers=headers)
+        ids = [task["id"] for task in created.json()]
+        completed = test_client.post("/tasks/batch-change-complete-status", json={"ids": ids + ["nope"]},
+                                     headers=headers)
+        deleted = test_client.post("/tasks/batch-delete", json={"ids": ids}, headers=headers)
+        assert all([created.status_code == 200,
+                    len(ids) == 2,
+                    [r["status"] for r in completed.json()] == ["ok", "ok", "not_found"],
+                    [r["status"] for r in deleted.json()] == ["ok", "ok"]])
+
+    def test_too_many_items(self):
+        response = test_client.post("/tasks/batch-delete", json={"ids": [str(i) for i in range(501)]},
+                                    headers=basic_auth_headers("JohnDoe", "johndoe"))
+        assert response.status_code == 422
+
+
+class TestMetrics:
+
+    def test_request_metrics(self):
+        test_client.get("/tasks", headers=basic_auth_headers("JohnDoe", "johndoe"))
+        response = test_client.get("/metrics")
+        assert all([response.status_code == 200,
+                    response.headers["content-type"].startswith("text/plain; version=0.0.4"),
+                    'http_request_duration_seconds_count{method="GET",route="/tasks",status="200"}' in response.text])
+
+
+class TestAdmissionControl:
+
+    def test_registration_rate_limited(self):
+        rate_limiter = RateLimiter(rate_per_second=0.1, burst=1)
+        app.dependency_overrides[get_register_rate_limiter] = lambda: rate_limiter
+        try:
+            first = test_client.post("/auth/register", json={"username": "limited1", "password": "password"})
+            second = test_client.post("/auth/register", json={"username": "limited2", "password": "password"})
+        finally:
+            app.dependency_overrides[get_register_rate_limiter] = get_no_rate_limiter
+        assert all([first.status_code == 200,
+                    second.status_code == 429,
+                    1 <= int(second.headers["Retry-After"]) <= 10])
+
+    def test_basic_auth_rate_limited(self):
+        rate_limiter = RateLimiter(rate_per_second=1, burst=1)
+        app.dependency_overrides[get_basic_auth_rate_limiter] = lambda: rate_limiter
+        try:
+            first = test_client.get("/auth/get-user-info", headers=basic_auth_headers("JohnDoe", "johndoe"))
+            second = test_client.post("/auth/token", headers=basic_auth_headers("JohnDoe", "johndoe"))
+        finally:
+            app.dependency_overrides[get_basic_auth_rate_limiter] = get_no_rate_limiter
+        assert all([first.status_code == 200,
+                    second.status_code == 429,
+                    "Retry-After" in second.headers])
+
+    def test_cached_basic_auth_is_not_rate_limited(self):
+        user_service = UserServiceImpl(UserRepositoryMock(), PasswordManagerMock(),
+                                       CredentialCache(b"test_secret", max_size=100, ttl_seconds=60))
+        rate_limiter = RateLimiter(rate_per_second=1, burst=1)
+        app.dependency_overrides[get_user_service] = lambda: user_service
+        app.dependency_overrides[get_basic_auth_rate_limiter] = lambda: rate_limiter
+        try:
+            responses = [test_client.get("/tasks", headers=basic_auth_headers("JohnDoe", "johndoe"))
+                         for _ in range(5)]
+            wrong_password = test_client.get("/tasks", headers=basic_auth_headers("JohnDoe", "wrong"))
+        finally:
+            app.dependency_overrides[get_user_service] = get_mock_user_service
+            app.dependency_overrides[get_basic_auth_rate_limiter] = get_no_rate_limiter
+        assert all([all(response.status_code == 200 for response in responses),
+                    wrong_password.status_code == 429])
+
+    def test_overloaded(self):
+        app.dependency_overrides[get_user_service] = UserServiceOverloadedMock
+        try:
+            registration = test_client.post("/auth/register", json={"username": "shed", "password": "password"})
+            authentication = test_client.get("/auth/get-user-info", headers=basic_auth_headers("JohnDoe", "johndoe"))
+        finally:
+            app.dependency_overrides[get_user_service] = get_mock_user_service
+        assert all([registration.status_code == 503,
+                    registration.headers["Retry-After"] == "3",
+                    authentication.status_code == 503,
+                    authentication.headers["Retry-After"] == "1"])
+
+
+class TestOpenApi:
+
+    def test_routes_document_response_models(self):
+        paths = app.openapi()["paths"]
+        schemas = {(path, method): operation["responses"]["200"]["content"]["application/json"]["schema"]
+                   for path, method in [("/tasks", "get"), ("/tasks", "post"), ("/auth/get-user-info", "get")]
+                   for operation in [paths[path][method]]}
+        assert all([schemas["/tasks", "get"] == {"$ref": "#/components/schemas/TaskPageResponse"},
+                    schemas["/tasks", "post"] == {"$ref": "#/components/schemas/TaskResponse"},
+                    schemas["/auth/get-user-info", "get"] == {"$ref": "#/components/schemas/UserResponse"}])
@@ -0,0 +1,25 @@
+import logging
+
+from app.app import create_app
+from app.config import Config
+
+
+async def start_and_stop(config: Config) -> None:
+    app = create_app(config)
+    async with app.router.lifespan_context(app):
+        pass
+
+
+class TestSecretKeyWarning:
+    async def test_missing_secret_key_is_reported(self, caplog, monkeypatch):
+        monkeypatch.delenv("SECRET_KEY", raising=False)
+        with caplog.at_level(logging.WARNING, logger="app.app"):
+            await start_and_stop(Config(sqlalchemy_db_url="sqlite+aiosqlite://"))
+
+        assert any("SECRET_KEY" in message for message in caplog.messages)
+
+    async def test_set_secret_key_is_not_reported(self, caplog):
+        with caplog.at_level(logging.WARNING, logger="app.app"):
+            await start_and_stop(Config(sqlalchemy_db_url="sqlite+aiosqlite://", secret_key="key"))
+
+        assert not any("SECRET_KEY" in message for message in caplog.messages)
@@ -0,0 +1,21 @@
+from app.config import Config
+
+
+class TestConfigFromEnvironment:
+    def test_none_disables_optional_limits(self, monkeypatch):
+        monkeypatch.setenv("REGISTER_RATE_LIMIT_PER_SECOND", "none")
+        monkeypatch.setenv("BASIC_AUTH_RATE_LIMIT_PER_SECOND", "none")
+        monkeypatch.setenv("PASSWORD_MAX_QUEUE", "none")
+        config = Config(sqlalchemy_db_url="sqlite+aiosqlite://")
+
+        assert all([config.register_rate_limit_per_second is None,
+                    config.basic_auth_rate_limit_per_second is None,
+                    config.password_max_queue is None])
+
+    def test_values_are_parsed(self, monkeypatch):
+        monkeypatch.setenv("REGISTER_RATE_LIMIT_PER_SECOND", "2.5")
+        monkeypatch.setenv("PASSWORD_MAX_QUEUE", "8")
+        config = Config(sqlalchemy_db_url="sqlite+aiosqlite://")
+
+        assert all([config.register_rate_limit_per_second == 2.5,
+                    config.password_max_queue == 8])
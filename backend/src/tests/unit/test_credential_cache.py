@@ -0,0 +1,67 @@
+from app.schemas.user import User, UserAuth
+from app.services.utils.credential_cache import CredentialCache
+
+
+class FakeClock:
+    now: float
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_user(username: str = "JohnDoe", password_hash: str = "johndoehashed") -> User:
+    return User(id=f"{username}_id", username=username, password_hash=password_hash)
+
+
+class TestGet:
+    def test_hit(self):
+        cache = CredentialCache(b"secret", max_size=10, ttl_seconds=60)
+        cache.put(UserAuth(username="JohnDoe", password="johndoe"), make_user())
+
+        assert cache.get(UserAuth(username="JohnDoe", password="johndoe")) == make_user()
+
+    def test_wrong_password_misses(self):
+        cache = CredentialCache(b"secret", max_size=10, ttl_seconds=60)
+        cache.put(UserAuth(username="JohnDoe", password="johndoe"), make_user())
+
+        assert cache.get(UserAuth(username="JohnDoe", password="JohnDoe")) is None
+
+    def test_expired(self):
+        clock = FakeClock()
+        cache = CredentialCache(b"secret", max_size=10, ttl_seconds=60, clock=clock)
+        cache.put(UserAuth(username="JohnDoe", password="johndoe"), make_user())
+        clock.now = 61
+
+        assert all([cache.get(UserAuth(username="JohnDoe", password="johndoe")) is None,
+                    len(cache) == 0])
+
+
+class TestEviction:
+    def test_size_cap_evicts_least_recently_used(self):
+        cache = CredentialCache(b"secret", max_size=2, ttl_seconds=60)
+        cache.put(UserAuth(username="a", password="a"), make_user("a"))
+        cache.put(UserAuth(username="b", password="b"), make_user("b"))
+        cache.get(UserAuth(username="a", password="a"))
+        cache.put(UserAuth(username="c", password="c"), make_user("c"))
+
+        assert all([len(cache) == 2,
+                    cache.get(UserAuth(username="a", password="a")) is not None,
+                    cache.get(UserAuth(username="b", password="b")) is None])
+
+    def test_changed_password_hash_evicts_old_entries(self):
+        cache = CredentialCache(b"secret", max_size=10, ttl_seconds=60)
+        cache.put(UserAuth(username="JohnDoe", password="old"), make_user(password_hash="oldhashed"))
+        cache.put(UserAuth(username="JohnDoe", password="new"), make_user(password_hash="newhashed"))
+
+        assert all([cache.get(UserAuth(username="JohnDoe", password="old")) is None,
+                    cache.get(UserAuth(username="JohnDoe", password="new")) is not None])
+
+    def test_invalidate_username(self):
+        cache = CredentialCache(b"secret", max_size=10, ttl_seconds=60)
+        cache.put(UserAuth(username="JohnDoe", password="johndoe"), make_user())
+        cache.invalidate_username("JohnDoe")
+
+        assert cache.get(UserAuth(username="JohnDoe", password="johndoe")) is None
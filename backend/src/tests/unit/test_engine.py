@@ -0,0 +1,71 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.pool import StaticPool
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import InstrumentedAsyncQueuePool, create_engine, get_pool_stats
+from app.request_metrics import RequestStats, bind_request_stats, unbind_request_stats
+
+
+@pytest.fixture(scope="module", autouse=True)
+def teardown():
+    yield
+    if os.path.exists("test_engine.db"):
+        os.remove("test_engine.db")
+
+
+class TestCreateEngine:
+    async def test_pool_settings(self):
+        engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite:///test_engine.db",
+                                      db_pool_size=2, db_max_overflow=1, db_pool_timeout=5))
+        pool = engine.pool
+
+        assert all([isinstance(pool, InstrumentedAsyncQueuePool),
+                    pool.size() == 2,
+                    pool._max_overflow == 1,
+                    pool.timeout() == 5])
+        await engine.dispose()
+
+    async def test_in_memory_sqlite_keeps_static_pool(self):
+        engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite://"))
+
+        assert all([isinstance(engine.pool, StaticPool),
+                    get_pool_stats(engine) is None])
+        await engine.dispose()
+
+
+class TestQueryTimer:
+    async def test_failed_queries_are_recorded(self):
+        engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite://"))
+        stats = RequestStats()
+        token = bind_request_stats(stats)
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(sa.exc.OperationalError):
+                    await conn.execute(sa.text("SELECT * FROM missing_table"))
+                await conn.execute(sa.text("SELECT 1"))
+        finally:
+            unbind_request_stats(token)
+
+        assert all([stats.db_queries == 2,
+                    0 < stats.db_seconds < 60])
+        await engine.dispose()
+
+
+class TestPoolStats:
+    async def test_checkouts_are_counted(self):
+        engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite:///test_engine.db",
+                                      db_pool_size=2, db_max_overflow=0))
+        async with engine.connect() as conn:
+            await conn.execute(sa.text("SELECT 1"))
+            stats_during = get_pool_stats(engine)
+        stats_after = get_pool_stats(engine)
+
+        assert all([stats_during.checked_out == 1,
+                    stats_after.checked_out == 0,
+                    stats_after.idle == 1,
+                    stats_after.checkouts == 1,
+                    stats_after.timeouts == 0])
+        await engine.dispose()
@@ -0,0 +1,38 @@
+import json
+
+from app.routers.json_responses import (dump_task, dump_task_page, dump_task_record, dump_tasks, dump_user,
+                                        make_json_response)
+from app.schemas.task import Task, TaskPage, TaskPageResponse, TaskRecord, TaskResponse
+from app.schemas.user import User, UserResponse
+
+TEST_TASKS = [Task(id=f"task_{i}", content=f"задача \"{i}\"", is_completed=i % 2 == 0, owner_id="owner")
+              for i in range(3)]
+
+
+class TestDump:
+    # The response models the routes document, built the way FastAPI would, are the reference for the bytes
+    def test_matches_response_models(self):
+        task_page = TaskPage(tasks=TEST_TASKS, next_cursor="cursor", tasks_version=3)
+
+        assert all([json.loads(dump_task(TEST_TASKS[0])) == TaskResponse.from_task(TEST_TASKS[0]).model_dump(),
+                    json.loads(dump_tasks(TEST_TASKS)) == [TaskResponse.from_task(task).model_dump()
+                                                           for task in TEST_TASKS],
+                    json.loads(dump_task_page(task_page)) == TaskPageResponse.from_task_page(task_page).model_dump()])
+
+    def test_record_matches_task(self):
+        assert all(dump_task_record(TaskRecord.from_task(task)) == dump_task(task) for task in TEST_TASKS)
+
+    def test_private_fields_are_left_out(self):
+        user = User(id="user_id", username="JohnDoe", password_hash="johndoehashed")
+
+        assert all([json.loads(dump_user(user)) == UserResponse.from_user(user).model_dump(),
+                    b"johndoehashed" not in dump_user(user),
+                    b"owner" not in dump_tasks(TEST_TASKS)])
+
+    def test_json_response(self):
+        response = make_json_response(dump_user(User(id="user_id", username="JohnDoe", password_hash="hash")),
+                                      headers={"ETag": 'W/"etag"'})
+
+        assert all([response.media_type == "application/json",
+                    response.headers["ETag"] == 'W/"etag"',
+                    json.loads(response.body) == {"id": "user_id", "username": "JohnDoe"}])
@@ -1,6 +1,12 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
-from app.services.utils.password_manager import PasswordManagerBcrypt
+from app.services.exceptions import OverloadedError
+from app.services.utils.password_manager import (PasswordManager, PasswordManagerBcrypt, PasswordManagerPool,
+                                                 get_bcrypt_cost)
 
 
 class TestIsPasswordMatchingHash:
@@ -28,3 +34,86 @@ class TestGeneratePasswordHash:
         assert all([password_hash_1 != password_hash_2,
                     isinstance(password_hash_1, str),
                     isinstance(password_hash_2, str)])
+
+    def test_configured_cost(self):
+        password_manager = PasswordManagerBcrypt(rounds=5)
+        password_hash = password_manager.generate_password_hash("somepassw")
+
+        assert all([get_bcrypt_cost(password_hash) == 5,
+                    password_manager.is_password_matching_hash("somepassw", password_hash)])
+
+
+class TestNeedsRehash:
+    def test_stale_cost(self):
+        password_hash = PasswordManagerBcrypt(rounds=4).generate_password_hash("somepassw")
+
+        assert all([not PasswordManagerBcrypt(rounds=4).needs_rehash(password_hash),
+                    PasswordManagerBcrypt(rounds=5).needs_rehash(password_hash)])
+
+    def test_not_bcrypt_hash(self):
+        assert all([get_bcrypt_cost("somepasswhashed") is None,
+                    PasswordManagerBcrypt(rounds=4).needs_rehash("somepasswhashed")])
+
+
+class PasswordManagerSlowMock(PasswordManager):
+    def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
+        time.sleep(0.05)
+        return f"{raw_password}hashed" == password_hash
+
+    def generate_password_hash(self, raw_password: str) -> str:
+        time.sleep(0.05)
+        return f"{raw_password}hashed"
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return False
+
+
+class TestPasswordManagerPool:
+    async def test_delegates(self):
+        pool = PasswordManagerPool(PasswordManagerSlowMock(), ThreadPoolExecutor(2), max_concurrency=2)
+        password_hash = await pool.generate_password_hash("somepassw")
+
+        assert all([password_hash == "somepasswhashed",
+                    await pool.is_password_matching_hash("somepassw", password_hash),
+                    not await pool.is_password_matching_hash("Somepassw", password_hash)])
+        pool.shutdown()
+
+    async def test_concurrency_is_capped(self):
+        pool = PasswordManagerPool(PasswordManagerSlowMock(), ThreadPoolExecutor(4), max_concurrency=1)
+        tasks = [asyncio.create_task(pool.generate_password_hash("somepassw")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        stats_during = pool.get_stats()
+        await asyncio.gather(*tasks)
+        stats_after = pool.get_stats()
+
+        assert all([stats_during.in_flight == 1,
+                    stats_during.queued == 2,
+                    stats_after.in_flight == 0,
+                    stats_after.queued == 0,
+                    stats_after.max_queued == 2,
+                    stats_after.completed == 3])
+        pool.shutdown()
+
+    async def test_excess_load_is_shed(self):
+        pool = PasswordManagerPool(PasswordManagerSlowMock(), ThreadPoolExecutor(1), max_concurrency=1, max_queue=1)
+        tasks = [asyncio.create_task(pool.generate_password_hash("somepassw")) for _ in range(3)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        stats = pool.get_stats()
+
+        assert all([results[:2] == ["somepasswhashed", "somepasswhashed"],
+                    isinstance(results[2], OverloadedError),
+                    stats.admitted == 2,
+                    stats.completed == 2,
+                    stats.shed == 1])
+        pool.shutdown()
+
+    async def test_event_loop_is_not_blocked(self):
+        pool = PasswordManagerPool(PasswordManagerBcrypt(), ThreadPoolExecutor(1), max_concurrency=1)
+        hashing = asyncio.create_task(pool.generate_password_hash("somepassw"))
+        started = time.perf_counter()
+        await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+        await hashing
+
+        assert elapsed < 0.01
+        pool.shutdown()
@@ -0,0 +1,49 @@
+from app.services.utils.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    now: float
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestRateLimiter:
+    def test_burst_then_limited(self):
+        rate_limiter = RateLimiter(rate_per_second=2, burst=3, clock=FakeClock())
+        waits = [rate_limiter.acquire("client") for _ in range(4)]
+        stats = rate_limiter.get_stats()
+
+        assert all([waits[:3] == [0, 0, 0],
+                    waits[3] == 0.5,
+                    stats.admitted == 3,
+                    stats.limited == 1])
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        rate_limiter = RateLimiter(rate_per_second=2, burst=1, clock=clock)
+        rate_limiter.acquire("client")
+        limited_wait = rate_limiter.acquire("client")
+        clock.now = 0.5
+
+        assert all([limited_wait > 0,
+                    rate_limiter.acquire("client") == 0])
+
+    def test_clients_are_independent(self):
+        rate_limiter = RateLimiter(rate_per_second=1, burst=1, clock=FakeClock())
+        rate_limiter.acquire("first")
+
+        assert all([rate_limiter.acquire("first") > 0,
+                    rate_limiter.acquire("second") == 0])
+
+    def test_least_recently_seen_clients_are_forgotten(self):
+        rate_limiter = RateLimiter(rate_per_second=1, burst=1, max_clients=2, clock=FakeClock())
+        for key in ["first", "second", "third"]:
+            rate_limiter.acquire(key)
+
+        assert all([rate_limiter.get_stats().clients == 2,
+                    rate_limiter.acquire("first") == 0,
+                    rate_limiter.acquire("third") > 0])
@@ -0,0 +1,144 @@
+import os
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.repositories.exceptions import NotFoundError
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.sqlalchemy_db.replicas import Replica, ReplicaRouter
+from app.repositories.tasks import TaskRepositorySQLAlchemy
+from app.repositories.users import UserRepositorySQLAlchemy
+from app.schemas.task import Task
+from app.schemas.user import UserAuth
+
+DB_FILES = ["test_primary.db", "test_replica_1.db", "test_replica_2.db"]
+
+
+class FakeClock:
+    now: float
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="module", autouse=True)
+def teardown():
+    yield
+    for db_file in DB_FILES:
+        if os.path.exists(db_file):
+            os.remove(db_file)
+
+
+@pytest.fixture
+async def engines() -> list[AsyncEngine]:
+    # Replication is not simulated: the replicas hold different users, which shows where a read went
+    engines = []
+    for db_file in DB_FILES:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_file}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(sa.insert(UserModel).values(id=db_file, username=db_file, password_hash="hash"))
+        engines.append(engine)
+    yield engines
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def replica_router(engines, clock) -> ReplicaRouter:
+    primary_engine, *replica_engines = engines
+    return ReplicaRouter(async_sessionmaker(primary_engine, expire_on_commit=False),
+                         [Replica(engine) for engine in replica_engines],
+                         read_your_writes_seconds=5, clock=clock)
+
+
+async def read_db_file(replica_router: ReplicaRouter, key: str | None = None) -> str:
+    async with replica_router.read_session(key) as session:
+        return await session.scalar(sa.select(UserModel.username).where(UserModel.username.like("test_%.db")))
+
+
+class TestReplicaRouter:
+    async def test_reads_round_robin(self, replica_router: ReplicaRouter):
+        db_files = [await read_db_file(replica_router) for _ in range(4)]
+
+        assert all([db_files == ["test_replica_1.db", "test_replica_2.db"] * 2,
+                    [replica.reads for replica in replica_router.get_stats().replicas] == [2, 2]])
+
+    async def test_unhealthy_replica_is_skipped(self, replica_router: ReplicaRouter):
+        await replica_router.replicas[0].engine.dispose()
+        replica_router.replicas[0].engine = create_async_engine("sqlite+aiosqlite:///missing_dir/replica.db")
+        await replica_router.check_health()
+        db_files = [await read_db_file(replica_router) for _ in range(3)]
+        stats = replica_router.get_stats()
+
+        assert all([db_files == ["test_replica_2.db"] * 3,
+                    not stats.replicas[0].healthy,
+                    stats.replicas[0].failed_checks == 1])
+
+    async def test_primary_when_no_replica_is_healthy(self, replica_router: ReplicaRouter):
+        for replica in replica_router.replicas:
+            replica.healthy = False
+
+        assert all([await read_db_file(replica_router) == "test_primary.db",
+                    replica_router.get_stats().primary_reads == 1])
+
+    async def test_reads_pinned_to_primary_after_write(self, replica_router: ReplicaRouter, clock: FakeClock):
+        replica_router.record_write("user")
+        pinned = await read_db_file(replica_router, "user")
+        other_user = await read_db_file(replica_router, "other_user")
+        clock.now = 6
+        after_window = await read_db_file(replica_router, "user")
+
+        assert all([pinned == "test_primary.db",
+                    other_user.startswith("test_replica"),
+                    after_window.startswith("test_replica"),
+                    replica_router.get_stats().pinned_reads == 1,
+                    replica_router.get_stats().pinned_keys == 0])
+
+
+class TestRepositoriesWithReplicas:
+    async def test_user_reads_own_registration(self, replica_router: ReplicaRouter, clock: FakeClock):
+        user_repo = UserRepositorySQLAlchemy(replica_router.primary, replica_router)
+        await user_repo.add_user(UserAuth(username="JohnDoe", password="hash"))
+        user = await user_repo.get_user_by_username("JohnDoe")
+        clock.now = 6
+
+        # The replicas never received the user, so once the window ends the read misses
+        with pytest.raises(NotFoundError):
+            await user_repo.get_user_by_username("JohnDoe")
+        assert user.username == "JohnDoe"
+
+    async def test_owner_reads_own_tasks(self, replica_router: ReplicaRouter, clock: FakeClock):
+        task_repo = TaskRepositorySQLAlchemy(replica_router.primary, replica_router)
+        await task_repo.add_task(Task(content="task", owner_id="test_primary.db"))
+        pinned_tasks = await task_repo.get_tasks_by_owner_id("test_primary.db")
+        clock.now = 6
+
+        assert all([len(pinned_tasks) == 1,
+                    await task_repo.get_tasks_by_owner_id("test_primary.db") == []])
+
+    async def test_username_filter_source_reads_primary(self, replica_router: ReplicaRouter, clock: FakeClock):
+        user_repo = UserRepositorySQLAlchemy(replica_router.primary, replica_router)
+        await user_repo.add_user(UserAuth(username="JohnDoe", password="hash"))
+        clock.now = 6
+
+        assert {username async for username in user_repo.stream_usernames()} == {"test_primary.db", "JohnDoe"}
+
+    async def test_tasks_version_reads_primary(self, replica_router: ReplicaRouter, clock: FakeClock):
+        task_repo = TaskRepositorySQLAlchemy(replica_router.primary, replica_router)
+        await task_repo.add_task(Task(content="task", owner_id="test_primary.db"))
+        clock.now = 6
+
+        assert all([await task_repo.get_tasks_version("test_primary.db") == 1,
+                    await task_repo.get_versioned_tasks_by_owner_id("test_primary.db") == (0, [])])
@@ -0,0 +1,70 @@
+import sqlalchemy as sa
+
+from app.config import Config
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.request_metrics import (Histogram, RequestMetrics, RequestStats, bind_request_stats, record_db_query,
+                                 record_password_hash, unbind_request_stats)
+
+
+class TestHistogram:
+    def test_observe(self):
+        histogram = Histogram((1.0, 2.0))
+        for value in [0.5, 1.0, 1.5, 3.0]:
+            histogram.observe(value)
+
+        assert all([list(histogram.cumulative_counts()) == [(1.0, 2), (2.0, 3), (float("inf"), 4)],
+                    histogram.count == 4,
+                    histogram.sum == 6.0])
+
+
+class TestRequestStats:
+    def test_records_only_while_bound(self):
+        stats = RequestStats()
+        record_db_query(1.0)
+        token = bind_request_stats(stats)
+        record_db_query(0.25)
+        record_password_hash(0.5)
+        unbind_request_stats(token)
+        record_password_hash(1.0)
+
+        assert all([stats.db_queries == 1,
+                    stats.db_seconds == 0.25,
+                    stats.password_hash_calls == 1,
+                    stats.password_hash_seconds == 0.5])
+
+    async def test_engine_queries_are_recorded(self):
+        engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite://"))
+        stats = RequestStats()
+        token = bind_request_stats(stats)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(sa.text("SELECT 1"))
+                await conn.execute(sa.text("SELECT 2"))
+        finally:
+            unbind_request_stats(token)
+            await engine.dispose()
+
+        assert all([stats.db_queries == 2, stats.db_seconds > 0])
+
+
+class TestRequestMetrics:
+    def test_render(self):
+        metrics = RequestMetrics()
+        stats = RequestStats()
+        stats.db_queries = 3
+        stats.db_seconds = 0.5
+        stats.password_hash_calls = 1
+        stats.password_hash_seconds = 0.25
+        metrics.observe_request("GET", "/tasks", 200, 0.75, stats)
+        metrics.observe_request("GET", "/tasks", 200, 0.25, RequestStats())
+
+        text = metrics.render()
+
+        assert all([
+            'http_request_duration_seconds_bucket{method="GET",route="/tasks",status="200",le="+Inf"} 2' in text,
+            'http_request_duration_seconds_sum{method="GET",route="/tasks",status="200"} 1.0' in text,
+            'db_queries_per_request_bucket{method="GET",route="/tasks",le="3.0"} 2' in text,
+            'db_query_seconds_total{method="GET",route="/tasks"} 0.5' in text,
+            'password_hash_seconds_count{method="GET",route="/tasks"} 1' in text,
+            "# TYPE db_connection_wait_seconds_total counter" in text
+        ])
@@ -0,0 +1,65 @@
+import os
+
+from app.config import Config
+from app.server import get_multi_worker_environment, get_multi_worker_warnings, get_uvicorn_options
+
+
+class TestUvicornOptions:
+    def test_options_from_config(self):
+        options = get_uvicorn_options(Config(sqlalchemy_db_url="sqlite+aiosqlite://", server_workers=3,
+                                             server_loop="uvloop", server_http="httptools", server_backlog=512,
+                                             server_keep_alive_seconds=75, server_graceful_shutdown_seconds=10))
+
+        assert all([options["factory"],
+                    options["workers"] == 3,
+                    options["loop"] == "uvloop",
+                    options["http"] == "httptools",
+                    options["backlog"] == 512,
+                    options["timeout_keep_alive"] == 75,
+                    options["timeout_graceful_shutdown"] == 10])
+
+    def test_zero_workers_means_one_per_core(self):
+        options = get_uvicorn_options(Config(sqlalchemy_db_url="sqlite+aiosqlite://", server_workers=0))
+
+        assert options["workers"] == (os.cpu_count() or 1)
+
+
+class TestMultiWorkerWarnings:
+    def test_process_local_state_is_reported(self):
+        warnings = get_multi_worker_warnings(Config(sqlalchemy_db_url="sqlite+aiosqlite://",
+                                                    task_cache_backend="memory", username_filter_enabled=True,
+                                                    db_replica_urls=["sqlite+aiosqlite://"]))
+
+        assert all([any("TASK_CACHE_BACKEND" in warning for warning in warnings),
+                    any("username filter" in warning for warning in warnings),
+                    any("replica" in warning for warning in warnings)])
+
+    def test_nothing_to_report(self):
+        warnings = get_multi_worker_warnings(Config(sqlalchemy_db_url="sqlite+aiosqlite://",
+                                                    task_cache_backend="none",
+                                                    register_rate_limit_per_second=None,
+                                                    basic_auth_rate_limit_per_second=None))
+
+        assert warnings == []
+
+
+class TestMultiWorkerEnvironment:
+    def test_process_local_task_cache_is_turned_off(self):
+        for backend in ["memory", "shared"]:
+            environment = get_multi_worker_environment(Config(sqlalchemy_db_url="sqlite+aiosqlite://",
+                                                              secret_key="key", task_cache_backend=backend))
+
+            assert environment == {"TASK_CACHE_BACKEND": "none"}
+
+    def test_username_filter_is_turned_off(self):
+        environment = get_multi_worker_environment(Config(sqlalchemy_db_url="sqlite+aiosqlite://",
+                                                          secret_key="key", task_cache_backend="none",
+                                                          username_filter_enabled=True))
+
+        assert environment == {"USERNAME_FILTER_ENABLED": "false"}
+
+    def test_shared_secret_key_is_generated(self):
+        environment = get_multi_worker_environment(Config(sqlalchemy_db_url="sqlite+aiosqlite://",
+                                                          task_cache_backend="none"))
+
+        assert list(environment) == ["SECRET_KEY"]
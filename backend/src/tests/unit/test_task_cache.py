@@ -0,0 +1,138 @@
+import pytest
+
+from app.repositories.cache import SharedCacheClientLocal, TaskCache, TaskCacheLRU, TaskCacheShared
+from app.repositories.tasks import TaskRepositoryCached
+from app.schemas.task import Task
+from tests.unit.test_task_service import TaskRepositoryMock
+
+
+class CountingTaskRepositoryMock(TaskRepositoryMock):
+    list_calls: int
+
+    def __init__(self):
+        super().__init__()
+        self.list_calls = 0
+
+    async def get_tasks_by_owner_id(self, *args, **kwargs) -> list[Task]:
+        self.list_calls += 1
+        return await super().get_tasks_by_owner_id(*args, **kwargs)
+
+
+@pytest.fixture(params=["memory", "shared"])
+def task_cache(request) -> TaskCache:
+    if request.param == "memory":
+        return TaskCacheLRU(max_entries=100, max_bytes=1024 * 1024, ttl_seconds=60)
+    return TaskCacheShared(SharedCacheClientLocal(max_entries=100), ttl_seconds=60)
+
+
+@pytest.fixture
+def task_repo() -> CountingTaskRepositoryMock:
+    return CountingTaskRepositoryMock()
+
+
+class TestTaskRepositoryCached:
+    async def test_hit(self, task_repo, task_cache):
+        cached_repo = TaskRepositoryCached(task_repo, task_cache)
+        first = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        second = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        stats = task_cache.get_stats()
+
+        assert all([first == second,
+                    task_repo.list_calls == 1,
+                    stats.hits == 1,
+                    stats.misses == 1])
+
+    async def test_different_params_are_different_entries(self, task_repo, task_cache):
+        cached_repo = TaskRepositoryCached(task_repo, task_cache)
+        all_tasks = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        completed_tasks = await cached_repo.get_tasks_by_owner_id("test_id_1", is_completed=True)
+
+        assert all([len(all_tasks) == 5,
+                    len(completed_tasks) == 2])
+
+    async def test_writes_invalidate_owner(self, task_repo, task_cache):
+        cached_repo = TaskRepositoryCached(task_repo, task_cache)
+        await cached_repo.get_tasks_by_owner_id("test_id_1")
+        await cached_repo.get_tasks_by_owner_id("test_id_2")
+        await cached_repo.add_task(Task(content="new", owner_id="test_id_1"))
+        after_add = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        await cached_repo.delete_task_by_id("task_1")
+        after_delete = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        await cached_repo.update_task(after_delete[0].model_copy(update={"content": "changed"}))
+        after_update = await cached_repo.get_tasks_by_owner_id("test_id_1")
+        await cached_repo.get_tasks_by_owner_id("test_id_2")
+
+        assert all([len(after_add) == 6,
+                    len(after_delete) == 5,
+                    after_update[0].content == "changed",
+                    task_repo.list_calls == 5])
+
+    async def test_write_by_another_process_is_not_served_from_cache(self, task_repo, task_cache):
+        cached_repo = TaskRepositoryCached(task_repo, task_cache)
+        first_version, _ = await cached_repo.get_versioned_tasks_by_owner_id("test_id_1")
+        # Written around the cache, as another worker would
+        await task_repo.add_task(Task(content="new", owner_id="test_id_1"))
+        second_version, tasks = await cached_repo.get_versioned_tasks_by_owner_id("test_id_1")
+
+        assert all([second_version != first_version,
+                    second_version == await task_repo.get_tasks_version("test_id_1"),
+                    len(tasks) == 6,
+                    task_repo.list_calls == 2])
+
+    async def test_tasks_of_another_version_are_not_cached(self, task_repo, task_cache):
+        cached_repo = TaskRepositoryCached(task_repo, task_cache)
+        read_version = task_repo.get_tasks_version
+
+        async def get_tasks_version(owner_id: str) -> int:
+            # The version is read just before a write lands
+            task_repo.get_tasks_version = read_version
+            version = await read_version(owner_id)
+            await task_repo.add_task(Task(content="new", owner_id=owner_id))
+            return version
+
+        task_repo.get_tasks_version = get_tasks_version
+        version, tasks = await cached_repo.get_versioned_tasks_by_owner_id("test_id_1")
+
+        assert all([version == await task_repo.get_tasks_version("test_id_1"),
+                    len(tasks) == 6,
+                    task_cache.get_stats().entries == 0])
+
+    async def test_list_loaded_during_invalidation_is_not_cached(self, task_repo, task_cache):
+        async def load() -> list[Task]:
+            await task_cache.invalidate_owner("test_id_1")
+            return [Task(id="stale", content="stale", owner_id="test_id_1")]
+
+        await task_cache.get_or_load("test_id_1", "key", load)
+        fresh = await task_cache.get_or_load("test_id_1", "key", lambda: task_repo.get_tasks_by_owner_id("test_id_1"))
+
+        assert all(task.id != "stale" for task in fresh)
+
+
+class TestTaskCacheLRU:
+    async def test_entry_limit_evicts_least_recently_used(self):
+        task_cache = TaskCacheLRU(max_entries=2, max_bytes=1024 * 1024, ttl_seconds=60)
+        for owner_id in ["a", "b", "a", "c"]:
+            await task_cache.get_or_load(owner_id, "key", _load_tasks(owner_id, 1))
+        await task_cache.get_or_load("a", "key", _load_tasks("a", 1))
+        stats = task_cache.get_stats()
+
+        assert all([stats.entries == 2,
+                    stats.evictions == 1,
+                    stats.hits == 2])
+
+    async def test_byte_limit(self):
+        task_cache = TaskCacheLRU(max_entries=100, max_bytes=1000, ttl_seconds=60)
+        await task_cache.get_or_load("a", "key", _load_tasks("a", 3))
+        await task_cache.get_or_load("b", "key", _load_tasks("b", 3))
+        await task_cache.get_or_load("c", "key", _load_tasks("c", 10))
+        stats = task_cache.get_stats()
+
+        assert all([stats.bytes <= 1000,
+                    stats.entries == 1,
+                    stats.evictions == 1])
+
+
+def _load_tasks(owner_id: str, count: int):
+    async def load() -> list[Task]:
+        return [Task(id=f"{owner_id}{i}", content="x" * 10, owner_id=owner_id) for i in range(count)]
+    return load
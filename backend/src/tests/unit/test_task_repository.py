@@ -0,0 +1,223 @@
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Config
+from app.repositories.exceptions import NotFoundError, ConstraintViolationError
+from app.repositories.sqlalchemy_db.engine import create_engine
+from app.repositories.sqlalchemy_db.models.base import Base
+from app.repositories.sqlalchemy_db.models.tasks import TaskModel
+from app.repositories.sqlalchemy_db.models.users import UserModel
+from app.repositories.tasks import TaskRepository, TaskRepositoryInMemory, TaskRepositorySQLAlchemy
+from app.repositories.users import UserRepositoryInMemory
+from app.schemas.task import Task, TaskRecord
+from app.schemas.user import User
+
+
+@pytest.fixture(scope="module", autouse=True)
+def teardown():
+    yield
+    if os.path.exists("test_tasks.db"):
+        os.remove("test_tasks.db")
+
+
+TEST_USERS = [User(id="test_id_1", username="JohnDoe", password_hash="johndoehashed"),
+              User(id="test_id_2", username="JaneDoe", password_hash="janedoehashed")]
+
+TEST_TASKS = [Task(id="task_1", content="buy milk", is_completed=False, owner_id="test_id_1"),
+              Task(id="task_2", content="walk the dog", is_completed=True, owner_id="test_id_1"),
+              Task(id="task_3", content="read a book", is_completed=False, owner_id="test_id_1"),
+              Task(id="task_4", content="call mom", is_completed=False, owner_id="test_id_2")]
+
+
+@pytest.fixture(params=["sqlalchemy", "memory"])
+async def task_repository(request) -> TaskRepository:
+    if request.param == "memory":
+        yield TaskRepositoryInMemory(UserRepositoryInMemory(TEST_USERS), TEST_TASKS)
+        return
+    engine = create_engine(Config(sqlalchemy_db_url="sqlite+aiosqlite:///test_tasks.db"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as session:
+        session.add_all([UserModel(**user.model_dump()) for user in TEST_USERS])
+        await session.flush()
+        session.add_all([TaskModel(**task.model_dump()) for task in TEST_TASKS])
+        await session.commit()
+    yield TaskRepositorySQLAlchemy(session_maker)
+    await engine.dispose()
+
+
+@pytest.fixture
+def test_tasks() -> list[Task]:
+    return TEST_TASKS
+
+
+class TestAddTask:
+    async def test_successful(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        task = await task_repository.add_task(Task(content="new", is_completed=False, owner_id="test_id_2"))
+        task_from_repo = await task_repository.get_task_by_id(task.id)
+
+        assert all([task.id is not None,
+                    task_from_repo == task])
+
+    async def test_not_existing_owner(self, task_repository: TaskRepository):
+        with pytest.raises(ConstraintViolationError):
+            await task_repository.add_task(Task(content="new", is_completed=False, owner_id="nobody"))
+
+
+class TestUpdateTask:
+    async def test_successful(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        updated_task = test_tasks[0].model_copy(update={"content": "buy bread", "is_completed": True})
+        await task_repository.update_task(updated_task)
+
+        assert await task_repository.get_task_by_id("task_1") == updated_task
+
+    async def test_not_existing(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        with pytest.raises(NotFoundError):
+            await task_repository.update_task(Task(id="nope", content="", is_completed=False, owner_id="test_id_1"))
+
+
+class TestDeleteTaskById:
+    async def test_successful(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        deleted_task = await task_repository.delete_task_by_id("task_1")
+
+        assert deleted_task == test_tasks[0]
+        with pytest.raises(NotFoundError):
+            await task_repository.get_task_by_id("task_1")
+
+    async def test_not_existing(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        with pytest.raises(NotFoundError):
+            await task_repository.delete_task_by_id("nope")
+
+
+class TestGetTasksByOwnerId:
+    async def test_ordered_by_complete_status_and_id(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        tasks = await task_repository.get_tasks_by_owner_id("test_id_1")
+
+        assert [task.id for task in tasks] == ["task_1", "task_3", "task_2"]
+
+    async def test_filter_by_complete_status(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        tasks = await task_repository.get_tasks_by_owner_id("test_id_1", is_completed=True)
+
+        assert [task.id for task in tasks] == ["task_2"]
+
+    async def test_not_existing_owner(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        assert await task_repository.get_tasks_by_owner_id("nobody") == []
+
+
+class TestCountTasksByOwnerId:
+    async def test_count(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        assert all([await task_repository.count_tasks_by_owner_id("test_id_1") == 3,
+                    await task_repository.count_tasks_by_owner_id("test_id_1", is_completed=False) == 2,
+                    await task_repository.count_tasks_by_owner_id("nobody") == 0])
+
+
+class TestGetTasksByOwnerIdPaginated:
+    async def test_pages(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        first_page = await task_repository.get_tasks_by_owner_id("test_id_1", limit=2)
+        second_page = await task_repository.get_tasks_by_owner_id(
+            "test_id_1", after=(first_page[-1].is_completed, first_page[-1].id), limit=2
+        )
+
+        assert all([[task.id for task in first_page] == ["task_1", "task_3"],
+                    [task.id for task in second_page] == ["task_2"]])
+
+    async def test_pages_filtered(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        tasks = await task_repository.get_tasks_by_owner_id("test_id_1", is_completed=False,
+                                                            after=(False, "task_1"), limit=2)
+
+        assert [task.id for task in tasks] == ["task_3"]
+
+
+class TestBatch:
+    async def test_add_tasks(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        tasks = await task_repository.add_tasks([Task(content=f"new {i}", owner_id="test_id_2") for i in range(3)])
+
+        assert all([len({task.id for task in tasks}) == 3,
+                    await task_repository.count_tasks_by_owner_id("test_id_2") == 4])
+
+    async def test_add_tasks_is_atomic(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        with pytest.raises(ConstraintViolationError):
+            await task_repository.add_tasks([Task(content="new", owner_id="test_id_2"),
+                                             Task(content="new", owner_id="nobody")])
+
+        assert await task_repository.count_tasks_by_owner_id("test_id_2") == 1
+
+    async def test_set_tasks_complete_status(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        updated_ids = await task_repository.set_tasks_complete_status("test_id_1", ["task_1", "task_3", "task_4"], True)
+
+        assert all([sorted(updated_ids) == ["task_1", "task_3"],
+                    await task_repository.count_tasks_by_owner_id("test_id_1", is_completed=True) == 3,
+                    not (await task_repository.get_task_by_id("task_4")).is_completed])
+
+    async def test_delete_tasks_by_ids(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        deleted_ids = await task_repository.delete_tasks_by_ids("test_id_1", ["task_1", "task_4", "nope"])
+
+        assert all([deleted_ids == ["task_1"],
+                    await task_repository.count_tasks_by_owner_id("test_id_1") == 2,
+                    await task_repository.count_tasks_by_owner_id("test_id_2") == 1])
+
+
+class TestStreamTasksByOwnerId:
+    async def test_same_order_as_get(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        streamed_records = [record async for record in task_repository.stream_tasks_by_owner_id("test_id_1")]
+
+        assert streamed_records == [TaskRecord.from_task(task)
+                                    for task in await task_repository.get_tasks_by_owner_id("test_id_1")]
+
+
+class TestGetTasksVersion:
+    async def test_writes_bump_version(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        versions = [await task_repository.get_tasks_version("test_id_1")]
+        task = await task_repository.add_task(Task(content="new", owner_id="test_id_1"))
+        versions.append(await task_repository.get_tasks_version("test_id_1"))
+        await task_repository.update_task(task.model_copy(update={"is_completed": True}))
+        versions.append(await task_repository.get_tasks_version("test_id_1"))
+        await task_repository.set_tasks_complete_status("test_id_1", [task.id], False)
+        versions.append(await task_repository.get_tasks_version("test_id_1"))
+        await task_repository.delete_task_by_id(task.id)
+        versions.append(await task_repository.get_tasks_version("test_id_1"))
+
+        assert all([versions == [0, 1, 2, 3, 4],
+                    await task_repository.get_tasks_version("test_id_2") == 0])
+
+    async def test_no_op_batch_keeps_version(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        await task_repository.delete_tasks_by_ids("test_id_1", ["nope"])
+
+        assert await task_repository.get_tasks_version("test_id_1") == 0
+
+
+class TestSearchTasks:
+    async def test_matches_all_words(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        task = await task_repository.add_task(Task(content="Buy milk, then buy bread", owner_id="test_id_1"))
+        tasks = await task_repository.search_tasks_by_owner_id("test_id_1", "BUY milk")
+
+        assert {t.id for t in tasks} == {task.id, "task_1"}
+
+    async def test_scoped_to_owner(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        assert all([await task_repository.search_tasks_by_owner_id("test_id_2", "milk") == [],
+                    [t.id for t in await task_repository.search_tasks_by_owner_id("test_id_2", "mom")] == ["task_4"]])
+
+    async def test_follows_updates_and_deletes(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        await task_repository.update_task(Task(id="task_1", content="buy eggs", owner_id="test_id_1"))
+        await task_repository.delete_task_by_id("task_3")
+
+        assert all([await task_repository.search_tasks_by_owner_id("test_id_1", "milk") == [],
+                    [t.id for t in await task_repository.search_tasks_by_owner_id("test_id_1", "eggs")] == ["task_1"],
+                    await task_repository.search_tasks_by_owner_id("test_id_1", "book") == []])
+
+    async def test_pagination(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        await task_repository.add_tasks([Task(content=f"note {i}", owner_id="test_id_1") for i in range(5)])
+        first_page = await task_repository.search_tasks_by_owner_id("test_id_1", "note", limit=3)
+        second_page = await task_repository.search_tasks_by_owner_id("test_id_1", "note", offset=3, limit=3)
+
+        assert all([len(first_page) == 3,
+                    len(second_page) == 2,
+                    not {t.id for t in first_page} & {t.id for t in second_page}])
+
+    async def test_query_syntax_is_literal(self, task_repository: TaskRepository, test_tasks: list[Task]):
+        assert all([await task_repository.search_tasks_by_owner_id("test_id_1", '" OR *') == [],
+                    [t.id for t in await task_repository.search_tasks_by_owner_id("test_id_1", "dog AND")] == []])
@@ -0,0 +1,213 @@
+from typing import AsyncIterator
+from uuid import uuid4
+
+import pytest
+
+from app.repositories.exceptions import ConstraintViolationError, NotFoundError
+from app.repositories.tasks import TaskRepository
+from app.schemas.task import Task, TaskKey, TaskRecord
+from app.schemas.user import UserIdentity
+from app.services.exceptions import InvalidCursorError, TaskNotFoundError, UserNotFoundError
+from app.services.tasks import TaskService, TaskServiceImpl
+
+
+class TaskRepositoryMock(TaskRepository):
+    owner_ids: list[str]
+    tasks: list[Task]
+
+    def __init__(self):
+        self.owner_ids = ["test_id_1", "test_id_2"]
+        self.tasks = [
+            Task(id=f"task_{i}", content=f"task {i}", is_completed=i % 2 == 0, owner_id="test_id_1")
+            for i in range(1, 6)
+        ]
+
+    async def add_task(self, task: Task) -> Task:
+        if task.owner_id not in self.owner_ids:
+            raise ConstraintViolationError
+        added_task = task.model_copy(update={"id": str(uuid4())})
+        self.tasks.append(added_task)
+        return added_task
+
+    async def add_tasks(self, tasks: list[Task]) -> list[Task]:
+        if any(task.owner_id not in self.owner_ids for task in tasks):
+            raise ConstraintViolationError
+        return [await self.add_task(task) for task in tasks]
+
+    async def set_tasks_complete_status(self, owner_id: str, task_ids: list[str], is_completed: bool) -> list[str]:
+        updated_ids = []
+        for i, task in enumerate(self.tasks):
+            if task.owner_id == owner_id and task.id in task_ids:
+                self.tasks[i] = task.model_copy(update={"is_completed": is_completed})
+                updated_ids.append(task.id)
+        return updated_ids
+
+    async def delete_tasks_by_ids(self, owner_id: str, task_ids: list[str]) -> list[str]:
+        deleted_ids = [t.id for t in self.tasks if t.owner_id == owner_id and t.id in task_ids]
+        self.tasks = [t for t in self.tasks if t.id not in deleted_ids]
+        return deleted_ids
+
+    async def update_task(self, updated_task: Task) -> None:
+        for i, task in enumerate(self.tasks):
+            if task.id == updated_task.id:
+                self.tasks[i] = updated_task
+                return
+        raise NotFoundError
+
+    async def delete_task_by_id(self, task_id: str) -> Task:
+        task = await self.get_task_by_id(task_id)
+        self.tasks.remove(task)
+        return task
+
+    async def get_task_by_id(self, task_id: str) -> Task:
+        try:
+            return [t for t in self.tasks if t.id == task_id].pop()
+        except IndexError:
+            raise NotFoundError
+
+    async def get_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                    after: TaskKey | None = None, limit: int | None = None) -> list[Task]:
+        tasks = sorted((t for t in self.tasks if t.owner_id == owner_id), key=lambda t: (t.is_completed, t.id))
+        tasks = [t for t in tasks if is_completed is None or t.is_completed == is_completed]
+        tasks = [t for t in tasks if after is None or (t.is_completed, t.id) > after]
+        return tasks[:limit]
+
+    async def get_versioned_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None,
+                                              after: TaskKey | None = None,
+                                              limit: int | None = None) -> tuple[int, list[Task]]:
+        return (await self.get_tasks_version(owner_id),
+                await self.get_tasks_by_owner_id(owner_id, is_completed, after, limit))
+
+    async def stream_tasks_by_owner_id(self, owner_id: str) -> AsyncIterator[TaskRecord]:
+        for task in await self.get_tasks_by_owner_id(owner_id):
+            yield TaskRecord.from_task(task)
+
+    async def count_tasks_by_owner_id(self, owner_id: str, is_completed: bool | None = None) -> int:
+        return len(await self.get_tasks_by_owner_id(owner_id, is_completed))
+
+    async def get_tasks_version(self, owner_id: str) -> int:
+        return hash(tuple((t.id, t.content, t.is_completed) for t in self.tasks if t.owner_id == owner_id))
+
+    async def search_tasks_by_owner_id(self, owner_id: str, query: str, offset: int = 0,
+                                       limit: int | None = None) -> list[Task]:
+        tasks = [t for t in self.tasks
+                 if t.owner_id == owner_id and all(word in t.content.split() for word in query.lower().split())]
+        end = None if limit is None else offset + limit
+        return tasks[offset:end]
+
+
+@pytest.fixture
+def task_service() -> TaskService:
+    return TaskServiceImpl(TaskRepositoryMock())
+
+
+@pytest.fixture
+def user() -> UserIdentity:
+    return UserIdentity(id="test_id_1", username="JohnDoe")
+
+
+class TestAddTask:
+    async def test_successful(self, task_service):
+        task = await task_service.add_task(Task(content="new", owner_id="test_id_2"))
+
+        assert all([task.id is not None,
+                    task.content == "new",
+                    not task.is_completed])
+
+    async def test_not_existing_owner(self, task_service):
+        with pytest.raises(UserNotFoundError):
+            await task_service.add_task(Task(content="new", owner_id="nobody"))
+
+
+class TestChangeCompleteStatus:
+    async def test_successful(self, task_service, user):
+        task = await task_service.get_user_task(user, "task_1")
+        updated_task = await task_service.change_complete_status(task)
+
+        assert all([updated_task.is_completed != task.is_completed,
+                    await task_service.get_user_task(user, "task_1") == updated_task])
+
+    async def test_not_existing(self, task_service):
+        with pytest.raises(TaskNotFoundError):
+            await task_service.change_complete_status(Task(id="nope", content="", owner_id="test_id_1"))
+
+
+class TestGetUserTask:
+    async def test_other_owner(self, task_service):
+        with pytest.raises(TaskNotFoundError):
+            await task_service.get_user_task(UserIdentity(id="test_id_2", username="JaneDoe"), "task_1")
+
+
+class TestGetUserTasks:
+    async def test_walk_all_pages(self, task_service, user):
+        task_ids = []
+        cursor = None
+        pages = 0
+        while True:
+            task_page = await task_service.get_user_tasks(user, limit=2, cursor=cursor)
+            task_ids += [task.id for task in task_page.tasks]
+            pages += 1
+            cursor = task_page.next_cursor
+            if cursor is None:
+                break
+
+        assert all([task_ids == ["task_1", "task_3", "task_5", "task_2", "task_4"],
+                    pages == 3])
+
+    async def test_exact_last_page_has_no_cursor(self, task_service, user):
+        task_page = await task_service.get_user_tasks(user, limit=5)
+
+        assert all([len(task_page.tasks) == 5,
+                    task_page.next_cursor is None])
+
+    async def test_filtered(self, task_service, user):
+        task_page = await task_service.get_user_tasks(user, limit=10, is_completed=True)
+
+        assert [task.id for task in task_page.tasks] == ["task_2", "task_4"]
+
+    @pytest.mark.parametrize("cursor", ["garbage", "bnVsbA==", "WzEsMl0="])
+    async def test_invalid_cursor(self, task_service, user, cursor):
+        with pytest.raises(InvalidCursorError):
+            await task_service.get_user_tasks(user, limit=2, cursor=cursor)
+        with pytest.raises(InvalidCursorError):
+            task_service.validate_cursor(cursor)
+
+
+class TestDeleteTask:
+    async def test_successful(self, task_service, user):
+        task = await task_service.get_user_task(user, "task_1")
+        await task_service.delete_task(task)
+
+        with pytest.raises(TaskNotFoundError):
+            await task_service.get_user_task(user, "task_1")
+
+
+class TestBatch:
+    async def test_add_tasks_with_not_existing_owner(self, task_service):
+        with pytest.raises(UserNotFoundError):
+            await task_service.add_tasks([Task(content="a", owner_id="test_id_1"), Task(content="b", owner_id="nobody")])
+
+    async def test_set_complete_status(self, task_service, user):
+        results = await task_service.set_complete_status(user, ["task_1", "nope", "task_1"], is_completed=True)
+
+        assert all([[(r.id, r.status) for r in results] == [("task_1", "ok"), ("nope", "not_found"), ("task_1", "ok")],
+                    (await task_service.get_user_task(user, "task_1")).is_completed])
+
+    async def test_delete_tasks_of_other_user(self, task_service):
+        results = await task_service.delete_tasks(UserIdentity(id="test_id_2", username="JaneDoe"), ["task_1"])
+
+        assert results[0].status == "not_found"
+
+
+class TestSearchUserTasks:
+    async def test_pages(self, task_service, user):
+        first_page = await task_service.search_user_tasks(user, "Task", limit=3)
+        second_page = await task_service.search_user_tasks(user, "Task", limit=3, cursor=first_page.next_cursor)
+
+        assert all([[t.id for t in first_page.tasks] == ["task_1", "task_2", "task_3"],
+                    [t.id for t in second_page.tasks] == ["task_4", "task_5"],
+                    second_page.next_cursor is None])
+
+    async def test_invalid_cursor(self, task_service, user):
+        with pytest.raises(InvalidCursorError):
+            await task_service.search_user_tasks(user, "task", limit=3, cursor="bm90LWpzb24")
@@ -0,0 +1,62 @@
+import pytest
+
+from app.schemas.user import UserIdentity
+from app.services.exceptions import InvalidTokenError
+from app.services.utils.token_manager import TokenManagerHMAC
+
+
+class FakeClock:
+    now: float
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def token_manager(clock) -> TokenManagerHMAC:
+    return TokenManagerHMAC(b"secret", ttl_seconds=60, clock=clock)
+
+
+class TestValidateToken:
+    def test_successful(self, token_manager):
+        user = UserIdentity(id="test_id_1", username="JohnDoe")
+        token = token_manager.issue_token(user)
+
+        assert token_manager.validate_token(token) == user
+
+    def test_expired(self, token_manager, clock):
+        token = token_manager.issue_token(UserIdentity(id="test_id_1", username="JohnDoe"))
+        clock.now += 61
+
+        with pytest.raises(InvalidTokenError):
+            token_manager.validate_token(token)
+
+    def test_tampered_payload(self, token_manager):
+        token = token_manager.issue_token(UserIdentity(id="test_id_1", username="JohnDoe"))
+        forged_payload = TokenManagerHMAC(b"secret", ttl_seconds=60).issue_token(
+            UserIdentity(id="test_id_2", username="JaneDoe")
+        ).split(".")[0]
+
+        with pytest.raises(InvalidTokenError):
+            token_manager.validate_token(f"{forged_payload}.{token.split('.')[1]}")
+
+    def test_other_secret(self, token_manager, clock):
+        token = TokenManagerHMAC(b"other", ttl_seconds=60, clock=clock).issue_token(
+            UserIdentity(id="test_id_1", username="JohnDoe")
+        )
+
+        with pytest.raises(InvalidTokenError):
+            token_manager.validate_token(token)
+
+    @pytest.mark.parametrize("token", ["", "garbage", "a.b", "тест.тест"])
+    def test_malformed(self, token_manager, token):
+        with pytest.raises(InvalidTokenError):
+            token_manager.validate_token(token)
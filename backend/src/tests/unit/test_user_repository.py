@@ -6,7 +6,7 @@ import sqlalchemy as sa
 
 from app.repositories.exceptions import NotFoundError, ConstraintViolationError
 from app.repositories.sqlalchemy_db.models.users import UserModel
-from app.repositories.users import UserRepository, UserRepositorySQLAlchemy
+from app.repositories.users import UserRepository, UserRepositoryInMemory, UserRepositorySQLAlchemy
 from app.repositories.sqlalchemy_db.models.base import Base
 from app.schemas.user import User, UserAuth
 
@@ -81,3 +81,70 @@ class TestAddUser:
 
         with pytest.raises(ConstraintViolationError):
             await user_repository.add_user(user_auth)
+
+
+class TestStreamUsernames:
+    async def test_stream(self, user_repository: UserRepository, test_user: User):
+        await user_repository.add_user(UserAuth(username="bob", password="bobhashed"))
+
+        assert sorted([username async for username in user_repository.stream_usernames()]) == ["JohnDoe", "bob"]
+
+
+class TestUpdatePasswordHash:
+    async def test_successful(self, user_repository: UserRepository, test_user: User):
+        user = await user_repository.update_password_hash(test_user.id, "newhash")
+
+        assert all([user.id == test_user.id,
+                    user.password_hash == "newhash",
+                    (await user_repository.get_user_by_username(test_user.username)).password_hash == "newhash"])
+
+    async def test_not_existing_user(self, user_repository: UserRepository):
+        with pytest.raises(NotFoundError):
+            await user_repository.update_password_hash("notexisting", "newhash")
+
+
+class TestCountUsersByPasswordHashCost:
+    async def test_count(self, user_repository: UserRepository, test_user: User):
+        for username, password_hash in [("a", "$2b$10$salt"), ("b", "$2b$12$salt"), ("c", "$2b$12$salt")]:
+            await user_repository.add_user(UserAuth(username=username, password=password_hash))
+
+        assert await user_repository.count_users_by_password_hash_cost() == {10: 1, 12: 2}
+
+
+class TestUserRepositoryInMemory:
+    async def test_get_user_by_username(self):
+        test_user = User(id="test_id_1", username="JohnDoe", password_hash="johndoehashed")
+        user_repository = UserRepositoryInMemory([test_user])
+
+        assert await user_repository.get_user_by_username("JohnDoe") == test_user
+        with pytest.raises(NotFoundError):
+            await user_repository.get_user_by_username("notexisting")
+
+    async def test_add_user(self):
+        user_repository = UserRepositoryInMemory()
+        user = await user_repository.add_user(UserAuth(username="bob", password="bobhashed"))
+
+        assert all([user.id is not None,
+                    user.password_hash == "bobhashed",
+                    await user_repository.get_user_by_username("bob") == user,
+                    user_repository.has_user_id(user.id)])
+        with pytest.raises(ConstraintViolationError):
+            await user_repository.add_user(UserAuth(username="bob", password="beb"))
+
+    async def test_stream_usernames(self):
+        user_repository = UserRepositoryInMemory([User(id="test_id_1", username="JohnDoe", password_hash="hash")])
+
+        assert [username async for username in user_repository.stream_usernames()] == ["JohnDoe"]
+
+    async def test_update_password_hash_and_count(self):
+        user_repository = UserRepositoryInMemory([
+            User(id="test_id_1", username="JohnDoe", password_hash="$2b$10$salt"),
+            User(id="test_id_2", username="JaneDoe", password_hash="janedoehashed")
+        ])
+        user = await user_repository.update_password_hash("test_id_1", "$2b$12$salt")
+
+        assert all([user.password_hash == "$2b$12$salt",
+                    await user_repository.get_user_by_username("JohnDoe") == user,
+                    await user_repository.count_users_by_password_hash_cost() == {12: 1}])
+        with pytest.raises(NotFoundError):
+            await user_repository.update_password_hash("notexisting", "newhash")
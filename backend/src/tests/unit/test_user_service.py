@@ -1,3 +1,4 @@
+from typing import AsyncIterator
 from uuid import uuid4
 
 import pytest
@@ -7,7 +8,9 @@ from app.schemas.user import User, UserAuth
 from app.services.exceptions import RegistrationError, AuthenticationError
 from app.services.users import UserService, UserServiceImpl
 from app.repositories.users import UserRepository
-from app.services.utils.password_manager import PasswordManager
+from app.services.utils.credential_cache import CredentialCache
+from app.services.utils.password_manager import AsyncPasswordManager
+from app.services.utils.username_filter import UsernameFilter
 
 
 class UserRepositoryMock(UserRepository):
@@ -20,26 +23,57 @@ class UserRepositoryMock(UserRepository):
             User(id="test_id_3", username="Bipki", password_hash="bipkihashed")
         ]
 
-    def get_user_by_username(self, username: str) -> User:
+    async def get_user_by_username(self, username: str) -> User:
         try:
             user = [u for u in self.users if u.username == username].pop()
             return user
         except IndexError:
             raise NotFoundError
 
-    def add_user(self, user: UserAuth) -> User:
+    async def add_user(self, user: UserAuth) -> User:
         if len([u for u in self.users if u.username == user.username]) > 0:
             raise ConstraintViolationError
         return User(id=str(uuid4()), username=user.username, password_hash=user.password)
 
+    async def update_password_hash(self, user_id: str, password_hash: str) -> User:
+        for i, user in enumerate(self.users):
+            if user.id == user_id:
+                self.users[i] = user.model_copy(update={"password_hash": password_hash})
+                return self.users[i]
+        raise NotFoundError
 
-class PasswordManagerMock(PasswordManager):
-    def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
+    async def count_users_by_password_hash_cost(self) -> dict[int, int]:
+        return {}
+
+    async def stream_usernames(self) -> AsyncIterator[str]:
+        for user in self.users:
+            yield user.username
+
+
+class PasswordManagerMock(AsyncPasswordManager):
+    hash_calls: int = 0
+
+    async def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
         return f"{raw_password}hashed" == password_hash
 
-    def generate_password_hash(self, raw_password: str) -> str:
+    async def generate_password_hash(self, raw_password: str) -> str:
+        self.hash_calls += 1
         return f"{raw_password}hashed"
 
+    def needs_rehash(self, password_hash: str) -> bool:
+        return False
+
+
+class PasswordManagerUpgradingMock(PasswordManagerMock):
+    async def is_password_matching_hash(self, raw_password: str, password_hash: str) -> bool:
+        return password_hash in (f"{raw_password}hashed", f"{raw_password}rehashed")
+
+    async def generate_password_hash(self, raw_password: str) -> str:
+        return f"{raw_password}rehashed"
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return not password_hash.endswith("rehashed")
+
 
 @pytest.fixture
 def user_service() -> UserService:
@@ -47,38 +81,138 @@ def user_service() -> UserService:
 
 
 class TestRegisterAndGetUser:
-    def test_successful_register(self, user_service):
+    async def test_successful_register(self, user_service):
         user_auth = UserAuth(username="David", password="passw")
-        user = user_service.register_and_get_user(user_auth)
+        user = await user_service.register_and_get_user(user_auth)
 
         assert all([user.id is not None,
                     user.username == "David",
                     user.password_hash == "passwhashed"])
 
-    def test_not_unique_username(self, user_service):
+    async def test_not_unique_username(self, user_service):
         user_auth = UserAuth(username="JohnDoe", password="passw")
 
         with pytest.raises(RegistrationError):
-            user_service.register_and_get_user(user_auth)
+            await user_service.register_and_get_user(user_auth)
 
 
 class TestAuthenticateAndGetUser:
-    def test_successful_auth(self, user_service):
+    async def test_successful_auth(self, user_service):
         user_auth = UserAuth(username="JohnDoe", password="johndoe")
-        user = user_service.authenticate_and_get_user(user_auth)
+        user = await user_service.authenticate_and_get_user(user_auth)
 
         assert all([user.id == "test_id_1",
                     user.username == "JohnDoe",
                     user.password_hash == "johndoehashed"])
 
-    def test_invalid_password(self, user_service):
+    async def test_invalid_password(self, user_service):
         user_auth = UserAuth(username="JohnDoe", password="wrongpassw")
 
         with pytest.raises(AuthenticationError):
-            user_service.authenticate_and_get_user(user_auth)
+            await user_service.authenticate_and_get_user(user_auth)
 
-    def test_invalid_username(self, user_service):
+    async def test_invalid_username(self, user_service):
         user_auth = UserAuth(username="nevermind", password="what")
 
         with pytest.raises(AuthenticationError):
-            user_service.authenticate_and_get_user(user_auth)
+            await user_service.authenticate_and_get_user(user_auth)
+
+
+class TestAuthenticateWithCredentialCache:
+    async def test_hit_skips_repository(self):
+        user_repo = UserRepositoryMock()
+        user_service = UserServiceImpl(user_repo, PasswordManagerMock(),
+                                       CredentialCache(b"secret", max_size=10, ttl_seconds=60))
+        user_auth = UserAuth(username="JohnDoe", password="johndoe")
+        await user_service.authenticate_and_get_user(user_auth)
+        user_repo.users = []
+        user = await user_service.authenticate_and_get_user(user_auth)
+
+        assert user.id == "test_id_1"
+
+    async def test_failed_authentication_is_not_cached(self):
+        user_service = UserServiceImpl(UserRepositoryMock(), PasswordManagerMock(),
+                                       CredentialCache(b"secret", max_size=10, ttl_seconds=60))
+        user_auth = UserAuth(username="JohnDoe", password="wrongpassw")
+
+        for _ in range(2):
+            with pytest.raises(AuthenticationError):
+                await user_service.authenticate_and_get_user(user_auth)
+
+    async def test_recently_authenticated_user(self):
+        user_service = UserServiceImpl(UserRepositoryMock(), PasswordManagerMock(),
+                                       CredentialCache(b"secret", max_size=10, ttl_seconds=60))
+        user_auth = UserAuth(username="JohnDoe", password="johndoe")
+        before = user_service.get_recently_authenticated_user(user_auth)
+        await user_service.authenticate_and_get_user(user_auth)
+        after = user_service.get_recently_authenticated_user(user_auth)
+
+        assert all([before is None,
+                    after.id == "test_id_1",
+                    user_service.get_recently_authenticated_user(UserAuth(username="JohnDoe",
+                                                                          password="wrongpassw")) is None])
+
+
+class TestRehashOnLogin:
+    async def test_stale_hash_is_rehashed(self):
+        user_repo = UserRepositoryMock()
+        user_service = UserServiceImpl(user_repo, PasswordManagerUpgradingMock())
+        user = await user_service.authenticate_and_get_user(UserAuth(username="JohnDoe", password="johndoe"))
+        user_from_repo = await user_repo.get_user_by_username("JohnDoe")
+
+        assert all([user.password_hash == "johndoerehashed",
+                    user_from_repo.password_hash == "johndoerehashed"])
+
+    async def test_failed_authentication_is_not_rehashed(self):
+        user_repo = UserRepositoryMock()
+        user_service = UserServiceImpl(user_repo, PasswordManagerUpgradingMock())
+
+        with pytest.raises(AuthenticationError):
+            await user_service.authenticate_and_get_user(UserAuth(username="JohnDoe", password="wrongpassw"))
+        assert (await user_repo.get_user_by_username("JohnDoe")).password_hash == "johndoehashed"
+
+
+@pytest.fixture
+async def username_filter() -> UsernameFilter:
+    username_filter = UsernameFilter(capacity=100, false_positive_rate=0.01)
+    await username_filter.reload(UserRepositoryMock().stream_usernames())
+    return username_filter
+
+
+class TestUsernameFilter:
+    async def test_unknown_username_skips_repository(self, username_filter):
+        user_repo = UserRepositoryMock()
+        user_service = UserServiceImpl(user_repo, PasswordManagerMock(), username_filter=username_filter)
+        user_repo.users.append(User(id="test_id_4", username="Ghost", password_hash="ghosthashed"))
+
+        with pytest.raises(AuthenticationError):
+            await user_service.authenticate_and_get_user(UserAuth(username="Ghost", password="ghost"))
+
+    async def test_known_username(self, username_filter):
+        user_service = UserServiceImpl(UserRepositoryMock(), PasswordManagerMock(), username_filter=username_filter)
+        user = await user_service.authenticate_and_get_user(UserAuth(username="JohnDoe", password="johndoe"))
+
+        assert user.id == "test_id_1"
+
+    async def test_taken_username_is_rejected_before_hashing(self, username_filter):
+        password_manager = PasswordManagerMock()
+        user_service = UserServiceImpl(UserRepositoryMock(), password_manager, username_filter=username_filter)
+
+        with pytest.raises(RegistrationError):
+            await user_service.register_and_get_user(UserAuth(username="JohnDoe", password="passw"))
+        assert password_manager.hash_calls == 0
+
+    async def test_registered_username_is_added(self, username_filter):
+        user_service = UserServiceImpl(UserRepositoryMock(), PasswordManagerMock(), username_filter=username_filter)
+        await user_service.register_and_get_user(UserAuth(username="David", password="passw"))
+
+        assert username_filter.might_contain("David")
+
+    async def test_false_positive_is_recorded(self, username_filter):
+        user_repo = UserRepositoryMock()
+        user_service = UserServiceImpl(user_repo, PasswordManagerMock(), username_filter=username_filter)
+        user_repo.users = []
+
+        with pytest.raises(AuthenticationError):
+            await user_service.authenticate_and_get_user(UserAuth(username="JohnDoe", password="johndoe"))
+        assert username_filter.get_stats().false_positives == 1
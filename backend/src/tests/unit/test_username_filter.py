@@ -0,0 +1,46 @@
+from typing import AsyncIterator
+
+from app.services.utils.username_filter import UsernameFilter
+
+
+async def iterate(usernames: list[str]) -> AsyncIterator[str]:
+    for username in usernames:
+        yield username
+
+
+class TestUsernameFilter:
+    async def test_no_false_negatives(self):
+        username_filter = UsernameFilter(capacity=1000, false_positive_rate=0.01)
+        usernames = [f"user{i}" for i in range(1000)]
+        await username_filter.reload(iterate(usernames))
+
+        assert all(username_filter.might_contain(username) for username in usernames)
+
+    async def test_false_positive_rate(self):
+        username_filter = UsernameFilter(capacity=1000, false_positive_rate=0.01)
+        await username_filter.reload(iterate([f"user{i}" for i in range(1000)]))
+        positives = sum(username_filter.might_contain(f"stranger{i}") for i in range(10_000))
+        stats = username_filter.get_stats()
+
+        assert all([positives < 300,
+                    stats.items == 1000,
+                    stats.negatives == 10_000 - positives,
+                    0.005 < stats.expected_false_positive_rate < 0.02])
+
+    def test_maybe_until_loaded(self):
+        username_filter = UsernameFilter(capacity=10, false_positive_rate=0.01)
+
+        assert username_filter.might_contain("anyone")
+
+    async def test_reload_keeps_usernames_added_meanwhile(self):
+        username_filter = UsernameFilter(capacity=10, false_positive_rate=0.01)
+
+        async def usernames() -> AsyncIterator[str]:
+            yield "old"
+            username_filter.add("registered_during_reload")
+
+        await username_filter.reload(usernames())
+
+        assert all([username_filter.might_contain("old"),
+                    username_filter.might_contain("registered_during_reload"),
+                    len(username_filter) == 2])